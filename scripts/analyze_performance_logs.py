@@ -1,133 +1,717 @@
 #!/usr/bin/env python3
 """
 Analyze performance logs and extract key metrics for training progress report.
+
+Usage:
+    python3 scripts/analyze_performance_logs.py [--start 2025-08-22] [--end 2025-11-03] [--no-records]
+        [--compact | --ndjson] [--output FILE]
+    python3 scripts/analyze_performance_logs.py --window 2025-09-01:2025-09-30 [--window ...]
+    python3 scripts/analyze_performance_logs.py --every-block-week
+    python3 scripts/analyze_performance_logs.py --rollup [4 5-1 ...] [--rebuild-rollups]
+
+Files are selected through a date-sorted manifest (performed/index.json entries, enriched with
+`timestamp`/`block`/`week` by scripts/build_performed_index.js; filenames are parsed as a
+fallback), so a date range is resolved by binary search and only logs inside it are opened.
+
+Logs are read one at a time, but each window keeps every per-set record it collects in memory
+until the report is written, so a wide range or --every-block-week grows with the number of
+sets logged. Pass --no-records to keep only the per-session totals on large histories.
+
+`--rollup` reports from per-block-week rollups persisted in .cache/analyze_rollups.json; only
+weeks with new, changed or deleted logs are recomputed on each run.
 """
 
+import argparse
+import bisect
+import io
 import json
 import os
+import re
+import sys
 from datetime import datetime
 from collections import defaultdict
 from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from log_ingest import ingest
+
+# <timestamp>_[workouts-]<block>-<week>_<title>.json, e.g.
+#   2025-09-01T13-14-40.971Z_2-4_Upper_Body_Strength_Mobility_perf2.json
+#   2026-01-05T123921_6-1_Upper_Body.json
+LOG_NAME = re.compile(
+    r'^(?P<date>\d{4}-\d{2}-\d{2})T(?P<h>\d{2})-?(?P<m>\d{2})-?(?P<s>\d{2})(?:\.(?P<frac>\d{1,6}))?Z?'
+    r'(?:_(?:workouts-)?(?P<block>\d+)-(?P<week>\d+)(?=_|\.))?'
+)
+
+
+class ManifestEntry(NamedTuple):
+    name: str
+    timestamp: datetime
+    block: Optional[int]
+    week: Optional[int]
+
+    @property
+    def block_week(self):
+        return f"{self.block}-{self.week}" if self.block is not None else 'unknown'
+
+
+def parse_log_name(filename):
+    """Return (timestamp, block, week) parsed from a performed log filename, or None."""
+    m = LOG_NAME.match(filename)
+    if not m:
+        return None
+    frac = (m.group('frac') or '0').ljust(6, '0')
+    timestamp = datetime.fromisoformat(
+        f"{m.group('date')}T{m.group('h')}:{m.group('m')}:{m.group('s')}.{frac}")
+    block = int(m.group('block')) if m.group('block') else None
+    week = int(m.group('week')) if m.group('week') else None
+    return timestamp, block, week
+
 
 def parse_timestamp(filename):
     """Extract timestamp from filename."""
-    # Handle both old and new formats
-    if filename.startswith('2025-'):
-        timestamp_str = filename.split('_')[0]
-        # Try different formats
-        for fmt in ['%Y-%m-%dT%H-%M-%S.%fZ', '%Y-%m-%dT%H%M%S']:
+    parsed = parse_log_name(filename)
+    return parsed[0] if parsed else None
+
+
+ARCHIVE_DIR = 'archive'
+
+
+def load_manifest(performed_dir, include_archive=False) -> List[ManifestEntry]:
+    """
+    Date-sorted manifest of performed logs.
+
+    Uses the `timestamp`/`block`/`week` fields of performed/index.json where present and parses
+    the filename for anything the manifest is missing (e.g. logs added since it was built).
+    Only the directory listing is read; no log files are opened.
+
+    With `include_archive`, logs in performed/archive/ are added as `archive/<name>` unless a
+    top-level log has the same timestamp (the archived perf-1 original of a migrated session).
+    """
+    known = {}
+    try:
+        with open(Path(performed_dir) / 'index.json', 'r', encoding='utf-8') as f:
+            for entry in json.load(f).get('files', []):
+                if isinstance(entry, dict) and entry.get('timestamp'):
+                    known[entry.get('name')] = entry
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    manifest = []
+    for filename in os.listdir(performed_dir):
+        if not filename.endswith('.json') or filename == 'index.json':
+            continue
+        entry = known.get(filename)
+        if entry:
             try:
-                return datetime.strptime(timestamp_str, fmt)
-            except ValueError:
+                timestamp = datetime.fromisoformat(entry['timestamp'].rstrip('Z'))
+                manifest.append(ManifestEntry(filename, timestamp, entry.get('block'), entry.get('week')))
                 continue
-    return None
+            except (TypeError, ValueError):
+                pass
+        parsed = parse_log_name(filename)
+        if parsed:
+            manifest.append(ManifestEntry(filename, *parsed))
+    archive_dir = Path(performed_dir) / ARCHIVE_DIR
+    if include_archive and archive_dir.is_dir():
+        seen = {e.timestamp for e in manifest}
+        for filename in os.listdir(archive_dir):
+            parsed = parse_log_name(filename) if filename.endswith('.json') else None
+            if parsed and parsed[0] not in seen:
+                seen.add(parsed[0])
+                manifest.append(ManifestEntry(f"{ARCHIVE_DIR}/{filename}", *parsed))
+    manifest.sort(key=lambda e: (e.timestamp, e.name))
+    return manifest
 
-def analyze_logs(start_date, end_date):
-    """Analyze all performance logs within date range."""
-    
-    performed_dir = Path(__file__).parent.parent / 'performed'
-    
-    # Data structures
-    exercise_data = defaultdict(list)
-    session_count = 0
-    blocks_covered = set()
-    
-    # Process all JSON files
-    for filename in os.listdir(performed_dir):
-        if not filename.endswith('.json') or filename == 'index.json' or filename == 'README.md':
+
+def select_range(manifest: List[ManifestEntry], start_date, end_date) -> List[ManifestEntry]:
+    """Entries with start_date <= timestamp <= end_date, found by binary search."""
+    stamps = [e.timestamp for e in manifest]
+    return manifest[bisect.bisect_left(stamps, start_date):bisect.bisect_right(stamps, end_date)]
+
+
+def iter_logged_sets(data):
+    """Yield (exercise_name, set_dict) for every logged set of a perf-1 or perf-2 log."""
+    sections = data.get('sections')
+    if isinstance(sections, list):
+        for section in sections:
+            for item in (section.get('items') or []) if isinstance(section, dict) else []:
+                if not isinstance(item, dict):
+                    continue
+                if item.get('kind') == 'exercise':
+                    for s in item.get('sets') or []:
+                        yield item.get('name', ''), s
+                elif item.get('kind') in ('superset', 'circuit'):
+                    for rnd in item.get('rounds') or []:
+                        for ex in rnd.get('exercises') or []:
+                            yield ex.get('name', ex.get('key', '')), ex
+        return
+    for ex_key, ex_data in (data.get('exercises') or {}).items():
+        if isinstance(ex_data, dict):
+            for s in ex_data.get('sets', []):
+                yield ex_data.get('name', ex_key), s
+
+
+def index_is_complete(data, index):
+    """
+    True when a perf-2 `exerciseIndex` accounts for every logged set in `sections`.
+
+    The index keeps one summary per key, so an exercise repeated within a session (same key)
+    leaves an item unaccounted for; every item's `sectionPath` must therefore be present with
+    its name and set count (a name edited after logging makes the index stale). Summaries must
+    also carry `angle`: only indexes written by the app or scripts/exercise_index.py store
+    unrounded avgRPE/totalVolume (the first perf-1 migration rounded them to one decimal).
+    """
+    expected = {}
+    for s_idx, section in enumerate(data.get('sections') or []):
+        for i_idx, item in enumerate((section.get('items') or []) if isinstance(section, dict) else []):
+            if not isinstance(item, dict):
+                continue
+            if item.get('kind') == 'exercise':
+                sets = sum(isinstance(s, dict) for s in item.get('sets') or [])
+                if sets:
+                    expected[f"sections[{s_idx}].items[{i_idx}].sets[*]"] = (item.get('name', ''), sets)
+            elif item.get('kind') in ('superset', 'circuit'):
+                for rnd in item.get('rounds') or []:
+                    for ex_idx, ex in enumerate(rnd.get('exercises') or []):
+                        if not isinstance(ex, dict):
+                            return False
+                        path = f"sections[{s_idx}].items[{i_idx}].rounds[*].exercises[{ex_idx}]"
+                        name, sets = expected.get(path, (None, 0))
+                        if name is not None and name != ex.get('name', ex.get('key', '')):
+                            return False  # rounds disagree on the name: only the per-set path is exact
+                        expected[path] = (ex.get('name', ex.get('key', '')), sets + 1)
+    covered = {}
+    for summ in index.values():
+        if not isinstance(summ, dict) or 'angle' not in summ or summ.get('sectionPath') in covered:
+            return False
+        covered[summ.get('sectionPath')] = (summ.get('name'), summ.get('totalSets'))
+    return covered == expected
+
+
+def _finish(out):
+    for target in out.values():
+        sets = target['sets']
+        target['avg_rpe'] = round(target.pop('rpe_total') / sets, 2) if sets else 0
+        target['volume'] = round(target['volume'], 1)
+    return out
+
+
+def session_summaries(data):
+    """
+    Per-exercise {sets, volume, avg_rpe} for one log.
+
+    perf-2 logs answer from their precomputed `exerciseIndex` when it is complete (see
+    index_is_complete()); other logs are summed set by set with the same rules (volume =
+    weight * multiplier * reps, missing RPE counts as 0). Angle variants of one exercise name
+    are merged; index keys may be bare slugs or `slug_angle`.
+    """
+    out = {}
+    index = data.get('exerciseIndex')
+    if isinstance(index, dict) and index and index_is_complete(data, index):
+        for key, summ in index.items():
+            target = out.setdefault(summ.get('name', key), {'sets': 0, 'volume': 0, 'rpe_total': 0})
+            sets = summ.get('totalSets', 0)
+            target['sets'] += sets
+            target['volume'] += summ.get('totalVolume') or 0
+            target['rpe_total'] += (summ.get('avgRPE') or 0) * sets
+        return _finish(out)
+    for name, s in iter_logged_sets(data):
+        if not isinstance(s, dict):
             continue
-            
-        timestamp = parse_timestamp(filename)
-        if not timestamp:
+        target = out.setdefault(name, {'sets': 0, 'volume': 0, 'rpe_total': 0})
+        target['sets'] += 1
+        target['volume'] += (s.get('weight') or 0) * (s.get('multiplier') or 1) * (s.get('reps') or 0)
+        target['rpe_total'] += s.get('rpe') or 0
+    return _finish(out)
+
+
+def set_records(data, date, block_week):
+    """Per-set records (descends into sections/rounds for perf-2) grouped by exercise name."""
+    out = defaultdict(list)
+    for ex_name, s in iter_logged_sets(data):
+        if not isinstance(s, dict):
             continue
-            
-        if timestamp < start_date or timestamp > end_date:
+        weight = s.get('weight', 0)
+        multiplier = s.get('multiplier', 1)
+        reps = s.get('reps', 0)
+        out[ex_name].append({
+            'date': date,
+            'block_week': block_week,
+            'weight': weight,
+            'multiplier': multiplier,
+            'reps': reps,
+            'rpe': s.get('rpe', None),
+            'distance': s.get('distanceMiles', 0),
+            'time': s.get('timeSeconds', 0),
+            'volume': weight * multiplier * reps if reps else 0
+        })
+    return out
+
+
+class Window:
+    """
+    One report window: a date range (start <= timestamp <= end) or a single block-week.
+
+    Accumulates the session totals and set records of every log that falls inside it.
+    """
+
+    def __init__(self, start_date=None, end_date=None, block_week=None, include_records=True):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.block_week = block_week
+        self.include_records = include_records
+        self.exercise_sessions = defaultdict(list)
+        self.exercise_data = defaultdict(list)
+        self.session_count = 0
+        self.blocks_covered = set()
+
+    @property
+    def label(self):
+        if self.block_week is not None:
+            return self.block_week
+        return f"{self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}"
+
+    def contains(self, entry):
+        if self.block_week is not None:
+            return entry.block_week == self.block_week
+        return self.start_date <= entry.timestamp <= self.end_date
+
+    def add(self, entry, date, summaries, records):
+        self.session_count += 1
+        if entry.block is not None:
+            self.blocks_covered.add(str(entry.block))
+        for ex_name, totals in summaries.items():
+            self.exercise_sessions[ex_name].append(
+                dict(totals, date=date, block_week=entry.block_week, file=entry.name))
+        if self.include_records:
+            for ex_name, ex_records in records.items():
+                self.exercise_data[ex_name].extend(ex_records)
+
+    def header(self):
+        header = {'period': self.label} if self.block_week is None else {'block_week': self.block_week}
+        header.update({
+            'total_sessions': self.session_count,
+            'blocks_covered': sorted(self.blocks_covered, key=int),
+        })
+        return header
+
+    def exercises(self):
+        return iter_exercise_summaries(self.exercise_sessions, self.exercise_data)
+
+
+def block_week_windows(manifest, include_records=True):
+    """One Window per block-week present in the manifest, in training order."""
+    weeks = sorted({e.block_week for e in manifest if e.block is not None},
+                   key=lambda w: tuple(map(int, w.split('-'))))
+    return [Window(block_week=w, include_records=include_records) for w in weeks]
+
+
+def fill_windows(windows, manifest=None, jobs=None):
+    """
+    Fill every window from a single pass over performed/.
+
+    Only logs inside at least one window are opened, each exactly once; its session totals and
+    set records are computed once and bucketed into every window that contains it. Records are
+    held by their windows until the caller reports them (see --no-records).
+    """
+    performed_dir = Path(__file__).parent.parent / 'performed'
+    if manifest is None:
+        manifest = load_manifest(performed_dir)
+    wanted = {}
+    for window in windows:
+        if window.block_week is None:
+            candidates = select_range(manifest, window.start_date, window.end_date)
+        else:
+            candidates = (e for e in manifest if window.contains(e))
+        for entry in candidates:
+            wanted.setdefault(str(performed_dir / entry.name), (entry, []))[1].append(window)
+    
+    for result in ingest(wanted, jobs=jobs):
+        if result.error is not None or not isinstance(result.data, dict):
             continue
+        entry, targets = wanted[result.path]
+        date = entry.timestamp.strftime('%Y-%m-%d')
+        summaries = session_summaries(result.data)
+        records = {}
+        if any(w.include_records for w in targets):
+            records = set_records(result.data, date, entry.block_week)
+        for i, window in enumerate(targets):
+            # Later windows get their own copies: iter_exercise_summaries sorts records in place
+            window.add(entry, date, summaries,
+                       records if i == 0 else {k: list(v) for k, v in records.items()})
+    return windows
+
+
+def analyze_windows(windows=(), every_block_week=False, jobs=None, include_records=True):
+    """
+    Analyze many windows from one corpus pass.
+
+    windows: (start_date, end_date) pairs; every_block_week adds one window per block-week.
+    Returns a list of summaries shaped like analyze_logs() (block-week windows carry
+    `block_week` instead of `period`).
+    """
+    manifest = load_manifest(Path(__file__).parent.parent / 'performed')
+    targets = [Window(start, end, include_records=include_records) for start, end in windows]
+    if every_block_week:
+        targets += block_week_windows(manifest, include_records)
+    fill_windows(targets, manifest, jobs)
+    return [dict(w.header(), exercises=dict(w.exercises())) for w in targets]
+
+
+def _collect(start_date, end_date, jobs=None, include_records=True):
+    """
+    One pass over the logs in range.
+
+    Returns (header, per-exercise session totals, per-exercise set records).
+    """
+    window = Window(start_date, end_date, include_records=include_records)
+    fill_windows([window], jobs=jobs)
+    return window.header(), window.exercise_sessions, window.exercise_data
+
+
+def iter_exercise_summaries(exercise_sessions, exercise_data):
+    """
+    Yield (name, summary) per exercise.
+
+    Set records are popped as each exercise is emitted, so a streaming writer only ever holds
+    one finished exercise summary at a time.
+    """
+    for ex_name, sessions in exercise_sessions.items():
+        total_sets = sum(x['sets'] for x in sessions)
+        ex_summary = {
+            'total_sessions': len(set(x['date'] for x in sessions)),
+            'total_sets': total_sets,
+            'total_volume': round(sum(x['volume'] for x in sessions), 1),
+            'avg_rpe': (round(sum(x['avg_rpe'] * x['sets'] for x in sessions) / total_sets, 2)
+                        if total_sets else None),
+            'first_session': sessions[0],
+            'last_session': sessions[-1],
+            'peak_session': max(sessions, key=lambda x: x['volume']),
+        }
+        
+        records = exercise_data.pop(ex_name, None)
+        if records:
+            # Sort by date
+            records.sort(key=lambda x: x['date'])
             
-        # Load the log
-        filepath = performed_dir / filename
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-        except:
-            continue
+            first = records[0]
+            last = records[-1]
             
-        session_count += 1
-        
-        # Extract block info from filename
-        if '-' in filename:
-            parts = filename.split('_')
-            if len(parts) > 0:
-                block_week = parts[0].split('T')[0] if 'T' in parts[0] else parts[0]
-                if block_week and '-' in block_week:
-                    blocks_covered.add(block_week.split('-')[0])
-        
-        # Process exercises
-        exercises = data.get('exercises', {})
-        for ex_key, ex_data in exercises.items():
-            ex_name = ex_data.get('name', ex_key)
-            sets = ex_data.get('sets', [])
+            # Find peak volume
+            peak = max(records, key=lambda x: x['volume']) if records[0]['volume'] > 0 else last
             
-            for s in sets:
-                weight = s.get('weight', 0)
-                multiplier = s.get('multiplier', 1)
-                reps = s.get('reps', 0)
-                rpe = s.get('rpe', None)
-                distance = s.get('distanceMiles', 0)
-                time_sec = s.get('timeSeconds', 0)
-                
-                exercise_data[ex_name].append({
-                    'date': timestamp.strftime('%Y-%m-%d'),
-                    'block_week': block_week if 'block_week' in locals() else 'unknown',
-                    'weight': weight,
-                    'multiplier': multiplier,
-                    'reps': reps,
-                    'rpe': rpe,
-                    'distance': distance,
-                    'time': time_sec,
-                    'volume': weight * multiplier * reps if reps else 0
-                })
-    
-    # Generate summary
-    summary = {
-        'period': f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}",
-        'total_sessions': session_count,
-        'blocks_covered': sorted(list(blocks_covered)),
-        'exercises': {}
-    }
-    
-    # Summarize each exercise
-    for ex_name, records in exercise_data.items():
-        if not records:
+            ex_summary.update({
+                'first': first,
+                'last': last,
+                'peak': peak,
+                'all_records': records
+            })
+        yield ex_name, ex_summary
+
+
+def analyze_logs(start_date, end_date, jobs=None, include_records=True):
+    """
+    Analyze all performance logs within date range.
+
+    Session-level totals come from each log's exerciseIndex when available; per-set records
+    (first/last/peak/all_records) are only built when include_records is True.
+    """
+    header, exercise_sessions, exercise_data = _collect(start_date, end_date, jobs, include_records)
+    return dict(header, exercises=dict(iter_exercise_summaries(exercise_sessions, exercise_data)))
+
+
+def write_summary(header, exercises, out, compact=False, ndjson=False):
+    """
+    Stream a summary to `out` one exercise at a time.
+
+    header: the top-level fields; exercises: iterable of (name, summary). The default layout is
+    byte-identical to json.dumps(summary, indent=2); `compact` drops whitespace and `ndjson`
+    writes the header on the first line followed by one {"exercise": name, ...} line each.
+    """
+    if ndjson:
+        out.write(json.dumps(header, separators=(',', ':')) + '\n')
+        for name, summary in exercises:
+            line = json.dumps(dict({'exercise': name}, **summary), separators=(',', ':'))
+            out.write(line + '\n')
+        return
+    if compact:
+        out.write(json.dumps(header, separators=(',', ':'))[:-1] + ',"exercises":{')
+        for i, (name, summary) in enumerate(exercises):
+            out.write((',' if i else '') + json.dumps(name) + ':'
+                      + json.dumps(summary, separators=(',', ':')))
+        out.write('}}\n')
+        return
+    out.write('{\n')
+    for key, value in header.items():
+        out.write(f'  {json.dumps(key)}: ' + json.dumps(value, indent=2).replace('\n', '\n  ') + ',\n')
+    out.write('  "exercises": {')
+    empty = True
+    for name, summary in exercises:
+        out.write(('\n' if empty else ',\n') + f'    {json.dumps(name)}: '
+                  + json.dumps(summary, indent=2).replace('\n', '\n    '))
+        empty = False
+    out.write('}\n}\n' if empty else '\n  }\n}\n')
+
+
+def write_windows(windows, out, compact=False, ndjson=False):
+    """
+    Stream several filled windows: a JSON array of summaries, or NDJSON where every header and
+    exercise line carries a `window` label.
+    """
+    if ndjson:
+        for window in windows:
+            label = {'window': window.label}
+            out.write(json.dumps(dict(label, **window.header()), separators=(',', ':')) + '\n')
+            for name, summary in window.exercises():
+                line = json.dumps(dict(label, exercise=name, **summary), separators=(',', ':'))
+                out.write(line + '\n')
+        return
+    out.write('[')
+    for i, window in enumerate(windows):
+        buf = io.StringIO()
+        write_summary(window.header(), window.exercises(), buf, compact=compact)
+        text = buf.getvalue().rstrip('\n')
+        if not compact:
+            text = '\n  ' + text.replace('\n', '\n  ')
+        out.write((',' if i else '') + text)
+    out.write(']\n' if compact or not windows else '\n]\n')
+
+
+def parse_window(text):
+    """START:END (each YYYY-MM-DD[THH:MM]) -> (start, end) datetimes."""
+    m = re.match(r'^(.+?):(\d{4}-\d{2}-\d{2}.*)$', text)
+    if not m:
+        raise argparse.ArgumentTypeError(f"expected START:END, got {text!r}")
+    try:
+        return datetime.fromisoformat(m.group(1)), datetime.fromisoformat(m.group(2))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+# --- Materialized per-block-week rollups ---------------------------------------------------
+
+ROLLUP_PATH = Path('.cache') / 'analyze_rollups.json'
+ROLLUP_VERSION = 2
+
+
+def top_set(data):
+    """Heaviest loaded set per exercise name: {weight, multiplier, reps, rpe}."""
+    out = {}
+    for name, s in iter_logged_sets(data):
+        if not isinstance(s, dict) or not (s.get('weight') or 0) > 0:
             continue
-            
-        # Sort by date
-        records.sort(key=lambda x: x['date'])
-        
-        first = records[0]
-        last = records[-1]
-        
-        # Find peak volume
-        peak = max(records, key=lambda x: x['volume']) if records[0]['volume'] > 0 else last
-        
-        summary['exercises'][ex_name] = {
-            'total_sessions': len(set(r['date'] for r in records)),
-            'first': first,
-            'last': last,
-            'peak': peak,
-            'all_records': records
+        cand = {'weight': s['weight'], 'multiplier': s.get('multiplier', 1),
+                'reps': s.get('reps', 0), 'rpe': s.get('rpe')}
+        best = out.get(name)
+        if best is None or (cand['weight'], cand['reps'] or 0) > (best['weight'], best['reps'] or 0):
+            out[name] = cand
+    return out
+
+
+def _rollup_log(path, data):
+    """Per-exercise totals for one log (runs inside ingest workers)."""
+    if not isinstance(data, dict):
+        raise ValueError('not a JSON object')
+    tops = top_set(data)
+    return {name: dict(totals, top_set=tops.get(name))
+            for name, totals in session_summaries(data).items()}
+
+
+def _block_week_key(block_week):
+    block, _, week = block_week.partition('-')
+    return (0, int(block), int(week)) if block.isdigit() and week.isdigit() else (1, 0, 0)
+
+
+def _new_row():
+    return {'sessions': 0, 'sets': 0, 'volume': 0, 'avg_rpe': 0, 'rpe_total': 0, 'top_set': None}
+
+
+def _add_row(target, row, sessions):
+    # Carry the unrounded RPE x sets total so summing many rows does not drift
+    target['rpe_total'] += row.get('rpe_total', (row['avg_rpe'] or 0) * row['sets'])
+    target['sets'] += row['sets']
+    target['volume'] = round(target['volume'] + row['volume'], 1)
+    target['avg_rpe'] = round(target['rpe_total'] / target['sets'], 2) if target['sets'] else 0
+    target['sessions'] += sessions
+    top = row.get('top_set')
+    best = target.get('top_set')
+    if top and (best is None or (top['weight'], top['reps'] or 0) > (best['weight'], best['reps'] or 0)):
+        target['top_set'] = top
+
+
+class RollupStore:
+    """
+    Persisted per-block-week, per-exercise rollups (sessions, sets, volume, avg RPE, top set).
+
+    Like prescribe_loads' history index, the store remembers the mtime and size of every log it
+    has folded in; `refresh()` re-reads only new or changed logs and recomputes just the
+    block-weeks they belong to. Reports then combine a handful of week rows instead of
+    rescanning every set. Archived logs are included (load_manifest(include_archive=True)), so
+    the rollups cover every recorded session once.
+    """
+
+    def __init__(self, repo_root, store_path=None, jobs=None):
+        self.repo_root = Path(repo_root)
+        self.performed_dir = self.repo_root / 'performed'
+        self.store_path = store_path or (self.repo_root / ROLLUP_PATH)
+        self.jobs = jobs
+        self.files = {}
+        self.weeks = {}
+        self.dirty = False
+
+    def load(self):
+        try:
+            raw = json.loads(self.store_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return self
+        if isinstance(raw, dict) and raw.get('version') == ROLLUP_VERSION:
+            self.files = raw.get('files') or {}
+            self.weeks = raw.get('weeks') or {}
+        return self
+
+    def save(self):
+        if not self.dirty:
+            return
+        payload = {'version': ROLLUP_VERSION, 'files': self.files, 'weeks': self.weeks}
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(payload, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, self.store_path)
+        self.dirty = False
+
+    def refresh(self):
+        """Fold new/changed logs in and drop deleted ones; returns the recomputed block-weeks."""
+        # Archived logs count too: the earliest sessions only exist there
+        manifest = {e.name: e for e in load_manifest(self.performed_dir, include_archive=True)}
+        affected = set()
+        stale = {}
+        for name, entry in manifest.items():
+            stat = (self.performed_dir / name).stat()
+            meta = self.files.get(name)
+            if meta and meta.get('mtimeNs') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+                continue
+            stale[str(self.performed_dir / name)] = (entry, stat)
+        for name in [n for n in self.files if n not in manifest]:
+            affected.add(self.files.pop(name)['blockWeek'])
+        for result in ingest(stale, normalize=_rollup_log, jobs=self.jobs):
+            entry, stat = stale[result.path]
+            old = self.files.pop(entry.name, None)
+            if old:
+                affected.add(old['blockWeek'])
+            if result.error is not None:
+                continue
+            self.files[entry.name] = {
+                'mtimeNs': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'date': entry.timestamp.strftime('%Y-%m-%d'),
+                'blockWeek': entry.block_week,
+                'exercises': result.data,
+            }
+            affected.add(entry.block_week)
+        for block_week in affected:
+            self._recompute_week(block_week)
+        if affected:
+            self.dirty = True
+        return sorted(affected, key=_block_week_key)
+
+    def _recompute_week(self, block_week):
+        logs = [meta for meta in self.files.values() if meta['blockWeek'] == block_week]
+        if not logs:
+            self.weeks.pop(block_week, None)
+            return
+        exercises = {}
+        for meta in logs:
+            for name, row in meta['exercises'].items():
+                target = exercises.setdefault(name, _new_row())
+                _add_row(target, row, 1)
+        self.weeks[block_week] = {'sessions': len(logs), 'exercises': exercises}
+
+    def combine(self, block_weeks=None):
+        """Sum week rows (all weeks when block_weeks is None) into one per-exercise report."""
+        selected = sorted(self.weeks if block_weeks is None else (w for w in block_weeks if w in self.weeks),
+                          key=_block_week_key)
+        exercises = {}
+        for block_week in selected:
+            for name, row in self.weeks[block_week]['exercises'].items():
+                target = exercises.setdefault(name, _new_row())
+                _add_row(target, row, row['sessions'])
+        for row in exercises.values():
+            del row['rpe_total']
+        return {
+            'block_weeks': selected,
+            'total_sessions': sum(self.weeks[w]['sessions'] for w in selected),
+            'exercises': exercises,
         }
-    
-    return summary
+
+
+def load_rollups(repo_root=None, rebuild=False, jobs=None):
+    store = RollupStore(repo_root or Path(__file__).parent.parent, jobs=jobs)
+    if not rebuild:
+        store.load()
+    store.refresh()
+    try:
+        store.save()
+    except OSError:
+        pass  # read-only checkout: the in-memory rollups are still valid for this run
+    return store
+
 
 if __name__ == '__main__':
-    import sys
-    
-    # Default to 2025-08-22 to 2025-11-03
-    start = datetime(2025, 8, 22)
-    end = datetime(2025, 11, 3)
-    
-    summary = analyze_logs(start, end)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--start', type=datetime.fromisoformat, default=datetime(2025, 8, 22),
+                        help='window start (YYYY-MM-DD[THH:MM])')
+    parser.add_argument('--end', type=datetime.fromisoformat, default=datetime(2025, 11, 3),
+                        help='window end, inclusive (YYYY-MM-DD[THH:MM])')
+    parser.add_argument('--no-records', action='store_true',
+                        help='session-level totals only (uses perf-2 exerciseIndex; skips per-set records). '
+                             'Per-set records are kept in memory for the whole run, so use this on long '
+                             'ranges or with --every-block-week')
+    fmt = parser.add_mutually_exclusive_group()
+    fmt.add_argument('--compact', action='store_true', help='compact JSON (no indentation)')
+    fmt.add_argument('--ndjson', action='store_true',
+                     help='newline-delimited JSON: header line, then one line per exercise')
+    parser.add_argument('--output', '-o', help='write to this file instead of stdout')
+    parser.add_argument('--window', action='append', type=parse_window, default=[], metavar='START:END',
+                        help='report this window (repeatable); all windows are filled from one pass')
+    parser.add_argument('--every-block-week', action='store_true', help='one window per block-week')
+    parser.add_argument('--rollup', nargs='*', metavar='BLOCK[-WEEK]',
+                        help='report from the persisted per-week rollups '
+                             '(all weeks, or the given blocks/block-weeks)')
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                        help='ignore the persisted rollups and rebuild them')
+    args = parser.parse_args()
+    # --window and --every-block-week combine; the rollup report has its own output shape
+    if args.rollup is not None and (args.window or args.every_block_week):
+        parser.error('--rollup cannot be combined with --window/--every-block-week')
+
+    windows = None
+    if args.rollup is not None:
+        store = load_rollups(rebuild=args.rebuild_rollups)
+        wanted = None
+        if args.rollup:
+            wanted = [w for w in store.weeks
+                      if any(w == sel or w.startswith(f"{sel}-") for sel in args.rollup)]
+        summary = store.combine(wanted)
+        exercises = summary.pop('exercises').items()
+        header = summary
+    elif args.window or args.every_block_week:
+        manifest = load_manifest(Path(__file__).parent.parent / 'performed')
+        windows = [Window(start, end, include_records=not args.no_records) for start, end in args.window]
+        if args.every_block_week:
+            windows += block_week_windows(manifest, include_records=not args.no_records)
+        fill_windows(windows, manifest)
+    else:
+        header, exercise_sessions, exercise_data = _collect(
+            args.start, args.end, include_records=not args.no_records)
+        exercises = iter_exercise_summaries(exercise_sessions, exercise_data)
     
-    # Output as JSON
-    print(json.dumps(summary, indent=2))
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if windows is not None:
+            write_windows(windows, out, compact=args.compact, ndjson=args.ndjson)
+        else:
+            write_summary(header, exercises, out, compact=args.compact, ndjson=args.ndjson)
+    finally:
+        if out is not sys.stdout:
+            out.close()
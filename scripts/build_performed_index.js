@@ -6,6 +6,25 @@
 const fs = require('fs');
 const path = require('path');
 
+// <timestamp>_[workouts-]<block>-<week>_<title>.json (mirrors LOG_NAME in analyze_performance_logs.py)
+const LOG_NAME = /^(\d{4}-\d{2}-\d{2})T(\d{2})-?(\d{2})-?(\d{2})(?:\.(\d{1,6}))?Z?(?:_(?:workouts-)?(\d+)-(\d+)(?=_|\.))?/;
+
+/**
+ * Parse timestamp and block/week from a performed log filename so consumers can
+ * sort and range-filter the manifest without opening each log.
+ */
+function parseLogName(name) {
+  const m = LOG_NAME.exec(name);
+  if (!m) return {};
+  const frac = m[5] ? '.' + m[5].padEnd(6, '0') : '';
+  const meta = { timestamp: `${m[1]}T${m[2]}:${m[3]}:${m[4]}${frac}` };
+  if (m[6] !== undefined) {
+    meta.block = Number(m[6]);
+    meta.week = Number(m[7]);
+  }
+  return meta;
+}
+
 function main() {
   const repoRoot = path.resolve(__dirname, '..');
   const performedDir = path.join(repoRoot, 'performed');
@@ -23,7 +42,7 @@ function main() {
     try {
       const st = fs.statSync(p);
       if (!st.isFile()) continue;
-      files.push({ name, path: `performed/${name}`, size: st.size, mtimeMs: st.mtimeMs });
+      files.push({ name, path: `performed/${name}`, size: st.size, mtimeMs: st.mtimeMs, ...parseLogName(name) });
     } catch (_) {}
   }
   files.sort((a, b) => {
@@ -1,12 +1,31 @@
 #!/usr/bin/env python3
-"""Estimate total working time for workout JSON files."""
+"""
+Estimate total working time for workout JSON files.
+
+Usage:
+    python3 scripts/calculate_session_time.py workouts/<file>.json [...]
+    python3 scripts/calculate_session_time.py [workouts/] --format json|csv [--strict] [--no-cache] [--jobs N]
+
+With no paths the whole workouts/ library is estimated. Files are estimated across a process
+pool and each result is cached by file content hash (.cache/session_time.json), so unchanged
+sessions are never re-walked. JSON/CSV output carries per-section and per-block-week totals;
+--strict exits 1 when any session's working time exceeds the 40-minute cap.
+"""
 
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
 import json
+import os
+import re
+import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from log_ingest import ingest
 
 DEFAULT_ACTIVE_SECONDS = {
     "strength": 45.0,
@@ -25,23 +44,46 @@ WORKING_SECTION_TYPES = {
 
 PACE_SECONDS_PER_MILE = 600.0  # 10:00 per mile default
 PACE_SECONDS_PER_METER = PACE_SECONDS_PER_MILE / 1609.0
+WORKING_CAP_SECONDS = 40 * 60
 
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_PATH = ROOT / ".cache" / "session_time.json"
+# Bump when the estimation rules change; the defaults above are folded into the cache key too
+ESTIMATOR_VERSION = 1
+BLOCK_WEEK = re.compile(r"^(\d+)-(\d+)_")
 
-def main(paths: Iterable[str]) -> None:
+
+def main(paths: Iterable[str], fmt: str = "text", strict: bool = False, use_cache: bool = True,
+         jobs: Optional[int] = None) -> int:
     files = collect_files(paths)
     if not files:
         raise SystemExit("No workout JSON files found")
 
-    for file_path in files:
-        total_sec, working_sec, breakdown = estimate_workout(file_path)
-        print(f"\nWorkout: {file_path.name}")
-        print(f"  Title: {breakdown['title']}")
-        print(f"  Total time (all sections): {total_sec / 60:.1f} min")
-        print(f"  Working sections: {working_sec / 60:.1f} min")
-        for title, seconds in breakdown["sections"]:
-            print(f"    - {title}: {seconds / 60:.1f} min")
-        if working_sec > 40 * 60:
-            print("  ⚠️  Working time exceeds 40 minutes")
+    results = estimate_files(files, use_cache=use_cache, jobs=jobs)
+    if fmt == "json":
+        json.dump({"sessions": results, "blockWeeks": block_week_totals(results)}, sys.stdout, indent=2,
+                  ensure_ascii=False)
+        sys.stdout.write("\n")
+    elif fmt == "csv":
+        write_csv(results, sys.stdout)
+    else:
+        for res in results:
+            print_text(res)
+    return 1 if strict and any(res["overCap"] for res in results) else 0
+
+
+def print_text(res: Dict[str, Any]) -> None:
+    print(f"\nWorkout: {res['file']}")
+    if "error" in res:
+        print(f"  ❌ {res['error']}")
+        return
+    print(f"  Title: {res['title']}")
+    print(f"  Total time (all sections): {res['totalSeconds'] / 60:.1f} min")
+    print(f"  Working sections: {res['workingSeconds'] / 60:.1f} min")
+    for section in res["sections"]:
+        print(f"    - {section['title']}: {section['seconds'] / 60:.1f} min")
+    if res["overCap"]:
+        print("  ⚠️  Working time exceeds 40 minutes")
 
 
 def collect_files(paths: Iterable[str]) -> List[Path]:
@@ -56,16 +98,21 @@ def collect_files(paths: Iterable[str]) -> List[Path]:
 
 
 def estimate_workout(path: Path) -> Tuple[float, float, Dict[str, object]]:
-    data = json.loads(path.read_text())
+    return estimate_data(json.loads(path.read_text()))
+
+
+def estimate_data(data: Dict) -> Tuple[float, float, Dict[str, object]]:
     total_seconds = 0.0
     working_seconds = 0.0
     section_breakdown: List[Tuple[str, float]] = []
+    section_types: List[Optional[str]] = []
 
     for section in data.get("sections", []):
         section_seconds = 0.0
         for item in section.get("items", []):
             section_seconds += estimate_item(item)
         section_breakdown.append((section.get("title", "Unnamed Section"), section_seconds))
+        section_types.append(section.get("type"))
         total_seconds += section_seconds
         if section.get("type") in WORKING_SECTION_TYPES:
             working_seconds += section_seconds
@@ -73,9 +120,128 @@ def estimate_workout(path: Path) -> Tuple[float, float, Dict[str, object]]:
     return total_seconds, working_seconds, {
         "title": data.get("title", ""),
         "sections": section_breakdown,
+        "types": section_types,
     }
 
 
+def _estimate_entry(path: str, data: Any) -> Dict[str, Any]:
+    """Content-only estimate for one workout (module level so pool workers can run it)."""
+    total_sec, working_sec, breakdown = estimate_data(data)
+    return {
+        "title": breakdown["title"],
+        "totalSeconds": round(total_sec, 1),
+        "workingSeconds": round(working_sec, 1),
+        "sections": [
+            {"title": title, "type": kind, "seconds": round(seconds, 1), "working": kind in WORKING_SECTION_TYPES}
+            for (title, seconds), kind in zip(breakdown["sections"], breakdown["types"])
+        ],
+    }
+
+
+def _estimator_key() -> str:
+    rules = json.dumps([ESTIMATOR_VERSION, DEFAULT_ACTIVE_SECONDS, sorted(WORKING_SECTION_TYPES),
+                        PACE_SECONDS_PER_MILE], sort_keys=True)
+    return hashlib.sha256(rules.encode()).hexdigest()[:16]
+
+
+def _load_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        raw = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(raw, dict) or raw.get("estimator") != _estimator_key():
+        return {}
+    return raw.get("entries") or {}
+
+
+def _save_cache(entries: Dict[str, Dict[str, Any]]) -> None:
+    payload = {"estimator": _estimator_key(), "entries": entries}
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_PATH.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        pass  # read-only checkout: results are still correct, just not reused next run
+
+
+def estimate_files(files: List[Path], use_cache: bool = True, jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Estimate every file, reusing cached results for unchanged content (keyed by SHA-256).
+
+    Returns one result per file in the given order: file, blockWeek, title, totalSeconds,
+    workingSeconds, overCap and sections[] (or file/error when the JSON cannot be read).
+    """
+    cache = _load_cache() if use_cache else {}
+    digests: Dict[str, str] = {}
+    for path in files:
+        try:
+            digests[str(path)] = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            digests[str(path)] = ""
+    stale = [p for p, digest in digests.items() if digest not in cache]
+    fresh: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    for res in ingest(stale, normalize=_estimate_entry, jobs=jobs):
+        if res.error is None:
+            fresh[digests[res.path]] = res.data
+        else:
+            errors[res.path] = res.error
+
+    results: List[Dict[str, Any]] = []
+    for path in files:
+        m = BLOCK_WEEK.match(path.name)
+        base = {"file": path.name, "blockWeek": f"{m.group(1)}-{m.group(2)}" if m else None}
+        if str(path) in errors:
+            results.append(dict(base, error=errors[str(path)]))
+            continue
+        entry = cache.get(digests[str(path)]) or fresh[digests[str(path)]]
+        results.append(dict(base, **entry, overCap=entry["workingSeconds"] > WORKING_CAP_SECONDS))
+
+    if use_cache and fresh:
+        cache.update(fresh)
+        # Only keep entries for content that still exists
+        _save_cache({d: cache[d] for d in set(digests.values()) if d in cache})
+    return results
+
+
+def block_week_totals(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    totals: Dict[str, Dict[str, Any]] = defaultdict(
+        lambda: {"sessions": 0, "totalSeconds": 0.0, "workingSeconds": 0.0, "overCap": 0})
+    for res in results:
+        if "error" in res:
+            continue
+        row = totals[res["blockWeek"] or "unknown"]
+        row["sessions"] += 1
+        row["totalSeconds"] = round(row["totalSeconds"] + res["totalSeconds"], 1)
+        row["workingSeconds"] = round(row["workingSeconds"] + res["workingSeconds"], 1)
+        row["overCap"] += res["overCap"]
+
+    def order(key: str) -> Tuple[int, ...]:
+        return tuple(int(x) for x in key.split("-")) if key != "unknown" else (sys.maxsize,)
+
+    return {key: totals[key] for key in sorted(totals, key=order)}
+
+
+def write_csv(results: List[Dict[str, Any]], out) -> None:
+    """One row per section, per session and per block-week, told apart by the `level` column."""
+    writer = csv.writer(out)
+    writer.writerow(["level", "blockWeek", "file", "title", "section", "sectionType", "working",
+                     "totalMinutes", "workingMinutes", "overCap"])
+    for res in results:
+        if "error" in res:
+            continue
+        for section in res["sections"]:
+            writer.writerow(["section", res["blockWeek"], res["file"], res["title"], section["title"],
+                             section["type"], section["working"], f"{section['seconds'] / 60:.1f}",
+                             f"{section['seconds'] / 60:.1f}" if section["working"] else "0.0", ""])
+        writer.writerow(["session", res["blockWeek"], res["file"], res["title"], "", "", "",
+                         f"{res['totalSeconds'] / 60:.1f}", f"{res['workingSeconds'] / 60:.1f}", res["overCap"]])
+    for block_week, row in block_week_totals(results).items():
+        writer.writerow(["block-week", block_week, "", f"{row['sessions']} sessions", "", "", "",
+                         f"{row['totalSeconds'] / 60:.1f}", f"{row['workingSeconds'] / 60:.1f}", row["overCap"]])
+
+
 def estimate_item(item: Dict) -> float:
     kind = item.get("kind")
     if kind == "exercise":
@@ -160,5 +326,11 @@ def _safe_int(value, default: int = 0) -> int:
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Estimate session time for workout JSON files")
-    parser.add_argument("paths", nargs="+", help="Workout JSON files or directories")
-    main(parser.parse_args().paths)
+    parser.add_argument("paths", nargs="*", default=[str(ROOT / "workouts")],
+                        help="Workout JSON files or directories (default: workouts/)")
+    parser.add_argument("--format", choices=("text", "json", "csv"), default="text", help="output format")
+    parser.add_argument("--strict", action="store_true", help="exit 1 if any session's working time exceeds 40 min")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the content-hash cache")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    sys.exit(main(args.paths, args.format, args.strict, not args.no_cache, args.jobs))
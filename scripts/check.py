@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Unified repository check: schema validation, session lint and Markdown link resolution in one pass.
+
+Every file is read (and, for JSON, parsed) exactly once; each applicable rule then runs on that
+shared document:
+  - schema  performed/*.json, workouts/*.json, exercises/*.json against schemas/*.schema.json, and
+            the trailing ```json block of workouts/*.md (same rules as validate_schemas.py)
+  - lint    workouts/**/*.json: exercise items need a `link` to an existing exercises/<slug>.json
+            and an allowed `logType` (same rules as lint_sessions.py)
+  - links   README.md and the .md files under workouts/, exercises/, .github/: relative links must
+            resolve inside the repo to an existing file (same rules as validate_links.py)
+Every existence question (lint exercise links, Markdown link targets, cached dependencies) is
+answered from one RepoSnapshot of the repository file set.
+
+Usage:
+  python3 scripts/check.py                      # all rules
+  python3 scripts/check.py --rule schema --rule lint
+  python3 scripts/check.py --jobs 1 --no-cache
+  python3 scripts/check.py --watch              # re-check on save (inotify, or --poll)
+
+Results are cached per file content hash + rule set (.cache/check_all.json, scripts/check_cache.py).
+Prints a per-rule report and exits 1 when any rule reports an error (2 when jsonschema is missing).
+
+--watch keeps results, validators and the dependency map (which files link to which paths) in
+memory after the first run and re-checks only what a save affects: the saved file, plus the files
+linking to a path that was created, deleted or renamed; a schema edit re-checks the documents it
+governs. Changes arrive through inotify where available, otherwise by polling (scripts/file_watch.py).
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from check_cache import CheckCache, rules_digest
+from file_watch import Watcher
+from lint_sessions import lint_session
+from log_ingest import parallel_map
+from schema_compiler import load_compiled
+from validate_links import RepoSnapshot, find_markdown_files, links_in_text, validate_file
+import validate_schemas
+
+RULES = ("schema", "lint", "links")
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+
+# (rel path, {rule: schema kind or True}) — one unit per file, whatever rules apply to it
+Unit = Tuple[str, Dict[str, Any]]
+
+# Per-process state, set once by init_worker() (in every pool worker, or in-process)
+_SNAPSHOT: Optional[RepoSnapshot] = None
+
+
+def init_worker(snapshot: RepoSnapshot, use_schema: bool, use_compiled: bool) -> None:
+    global _SNAPSHOT
+    _SNAPSHOT = snapshot
+    if use_schema:
+        validate_schemas.init_worker(use_compiled)
+
+
+def work_units(repo_root: Path, rules: Sequence[str]) -> List[Unit]:
+    """Every file any selected rule applies to, with its rules, in sorted path order."""
+    units: Dict[str, Dict[str, Any]] = {}
+
+    def add(paths, rule, value=True):
+        for p in paths:
+            units.setdefault(os.path.relpath(p, repo_root), {})[rule] = value
+
+    if "schema" in rules:
+        add(repo_root.glob("performed/*.json"), "schema", "performance")
+        add(repo_root.glob("workouts/*.json"), "schema", "session")
+        add(repo_root.glob("exercises/*.json"), "schema", "exercise")
+        add(repo_root.glob("workouts/*.md"), "schema", "markdown")
+    if "lint" in rules:
+        add(repo_root.glob("workouts/**/*.json"), "lint")
+    if "links" in rules:
+        add(find_markdown_files(repo_root), "links")
+    return sorted(units.items())
+
+
+def unit_rules(unit_rules_map: Dict[str, Any]) -> str:
+    """Rule-set hash for one unit: the rules applied, their governing schema and the checker code."""
+    parts: List[Any] = [sorted(unit_rules_map.items())]
+    kind = unit_rules_map.get("schema")
+    if kind:
+        parts.append(Path(validate_schemas.SCHEMA_PATHS["session" if kind == "markdown" else kind]))
+        parts.append(SCRIPTS_DIR / "validate_schemas.py")
+    if "lint" in unit_rules_map:
+        parts.append(SCRIPTS_DIR / "lint_sessions.py")
+    if "links" in unit_rules_map:
+        parts.append(SCRIPTS_DIR / "validate_links.py")
+    return rules_digest(Path(__file__), *parts)
+
+
+def check_unit(unit: Unit) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """Load one file once and run its rules: ([(rule, message), ...], dependency paths)."""
+    rel, rules = unit
+    snapshot = _SNAPSHOT
+    path = snapshot.repo_root / rel
+    errors: List[Tuple[str, str]] = []
+    deps: Set[str] = set()
+    try:
+        text = path.read_text(encoding="utf-8")
+    except Exception as e:
+        return [(rule, f"{rel}: Cannot read: {e}") for rule in rules], []
+
+    data: Any = None
+    if rel.endswith(".json"):
+        try:
+            data = json.loads(text)
+        except Exception as e:
+            if "schema" in rules:
+                errors.append(("schema", f"{rel}: Invalid JSON: {e}"))
+            if "lint" in rules:
+                errors.append(("lint", f"{rel}: Failed to parse JSON: {e}"))
+            return errors, []
+
+    kind = rules.get("schema")
+    if kind == "markdown":
+        errors += [("schema", f"{rel}: {msg}") for msg in validate_schemas.markdown_errors(text)]
+    elif kind:
+        errors += [("schema", f"{rel}: {msg}") for msg in validate_schemas.document_errors(kind, data)]
+    if "lint" in rules:
+        lint_deps: Set[str] = set()
+        errors += [("lint", msg) for msg in lint_session(data, rel, str(snapshot.repo_root), lint_deps,
+                                                         lambda link: snapshot.exists(os.path.normpath(link)))]
+        deps |= {os.path.normpath(d) for d in lint_deps}
+    if "links" in rules:
+        for ln, href, msg in validate_file(path, snapshot.repo_root, deps, snapshot, (None, links_in_text(text))):
+            errors.append(("links", f"{rel} L{ln}: {href} -> {msg}"))
+    return errors, sorted(deps)
+
+
+def rules_key(rules: Dict[str, Any]) -> str:
+    return json.dumps(sorted(rules.items()))
+
+
+def report(selected: Sequence[str], units: Sequence[Unit], results: Dict[str, List[Tuple[str, str]]]) -> bool:
+    """Print the per-rule report; True when any rule has errors."""
+    failed = False
+    for rule in selected:
+        files = sum(1 for _, rules in units if rule in rules)
+        messages = [msg for rel, _ in units for r, msg in results[rel] if r == rule]
+        if messages:
+            failed = True
+            print(f"{rule}: {len(messages)} error(s) in {files} file(s)")
+            for msg in messages:
+                print(f"  - {msg}")
+        else:
+            print(f"{rule}: OK ({files} file(s))")
+    return failed
+
+
+class Checker:
+    """Per-file results and dependencies for one selection of rules, kept across watch cycles."""
+
+    def __init__(self, selected: Sequence[str], snapshot: RepoSnapshot, cache: CheckCache,
+                 use_compiled: bool) -> None:
+        self.selected = list(selected)
+        self.snapshot = snapshot
+        self.repo_root = snapshot.repo_root
+        self.cache = cache
+        self.use_compiled = use_compiled
+        self.units: List[Unit] = work_units(self.repo_root, self.selected)
+        self.results: Dict[str, List[Tuple[str, str]]] = {}
+        self.deps: Dict[str, Set[str]] = {}
+        self._digests: Dict[str, str] = {}
+        self.triggers: List[str] = []
+
+    def digest(self, rules: Dict[str, Any]) -> str:
+        key = rules_key(rules)
+        if key not in self._digests:
+            self._digests[key] = unit_rules(rules)
+        return self._digests[key]
+
+    def run(self, units: Sequence[Unit], jobs: Optional[int], use_cache: bool = True) -> None:
+        """Check `units` (reusing cached results when allowed) and record their errors and deps."""
+        stale: List[Unit] = []
+        # Fingerprints taken before checking, so an edit made mid-check is not cached as checked
+        fingerprints: Dict[str, Any] = {}
+        for unit in units:
+            rel, rules = unit
+            if use_cache:
+                cached = self.cache.lookup(self.repo_root / rel, self.digest(rules))
+            else:
+                cached, fingerprints[rel] = None, self.cache.fingerprint(self.repo_root / rel)
+            if cached is None:
+                stale.append(unit)
+            else:
+                self.results[rel] = [tuple(e) for e in cached]
+                self.deps[rel] = set((self.cache.entries.get(rel) or {}).get("deps") or ())
+        if stale:
+            use_schema = any("schema" in rules for _, rules in stale)
+            if jobs == 1 and _SNAPSHOT is self.snapshot:
+                checked = [check_unit(unit) for unit in stale]  # watch mode: validators already built
+            else:
+                if use_schema and self.use_compiled:
+                    # Generate/refresh the compiled modules once, before any worker starts
+                    for schema_path in validate_schemas.SCHEMA_PATHS.values():
+                        load_compiled(Path(schema_path))
+                checked = parallel_map(check_unit, stale, jobs, initializer=init_worker,
+                                       initargs=(self.snapshot, use_schema, self.use_compiled))
+            for (rel, rules), (errors, deps) in zip(stale, checked):
+                self.results[rel] = errors
+                self.deps[rel] = set(deps)
+                self.cache.store(self.repo_root / rel, self.digest(rules), errors, deps, fingerprints.get(rel))
+        self.cache.save()
+
+    def dependents(self, changed: Set[str]) -> Set[str]:
+        """Checked files whose result relied on the existence of any path in `changed`."""
+        return {rel for rel, deps in self.deps.items() if deps & changed}
+
+    def update(self, changed: Set[str]) -> List[str]:
+        """Bring results up to date after `changed` paths were edited/created/deleted; returns re-checked files."""
+        appeared = {rel for rel in changed if not self.snapshot.exists(rel)}
+        self.snapshot.refresh(changed)
+        appeared = {rel for rel in appeared if self.snapshot.exists(rel)}
+        vanished = {rel for rel in changed if not self.snapshot.exists(rel)}
+        known = {rel for rel, _ in self.units}
+        if appeared or vanished:
+            self.units = work_units(self.repo_root, self.selected)
+        by_rel = dict(self.units)
+        for rel in list(self.results):
+            if rel not in by_rel:
+                del self.results[rel]
+                self.deps.pop(rel, None)
+
+        # Content edits only affect the edited file; files that link to a path are affected only
+        # when that path appears or disappears (no rule reads a link target's content)
+        affected = self.dependents(appeared | vanished)
+        targets = {rel for rel in changed if rel in by_rel} | affected
+        schema_files = {os.path.relpath(p, self.repo_root): kind
+                        for kind, p in validate_schemas.SCHEMA_PATHS.items()}
+        # Changed paths that mattered (editor temp files etc. are left out of the log line)
+        self.triggers = sorted(rel for rel in changed if rel in by_rel or rel in known or rel in schema_files
+                               or any(rel in self.deps[d] for d in affected))
+        kinds = {schema_files[rel] for rel in changed if rel in schema_files}
+        if kinds and "schema" in self.selected:
+            # A schema was edited: rebuild the validators and re-check every document it governs
+            validate_schemas.init_worker(self.use_compiled)
+            kinds |= {"markdown"} if "session" in kinds else set()
+            targets |= {rel for rel, rules in self.units if rules.get("schema") in kinds}
+            self._digests.clear()
+        todo = [(rel, by_rel[rel]) for rel in sorted(targets) if rel in by_rel]
+        self.run(todo, jobs=1, use_cache=False)
+        return [rel for rel, _ in todo]
+
+
+WATCH_DIRS = ("workouts", "exercises", "performed", ".github", "schemas")
+WATCH_TOP_LEVEL = ("README.md",)
+
+
+def watch(checker: Checker, force_poll: bool) -> None:
+    watcher = Watcher(checker.repo_root, WATCH_DIRS, WATCH_TOP_LEVEL, force_poll=force_poll)
+    init_worker(checker.snapshot, "schema" in checker.selected, checker.use_compiled)
+    print(f"Watching for changes ({watcher.backend}); Ctrl-C to stop.", flush=True)
+    for changed in watcher:
+        start = time.perf_counter()
+        try:
+            rechecked = checker.update(changed)
+        except ValueError as e:
+            # e.g. a schema saved mid-edit is not valid JSON yet; the next save retries
+            print(f"\n[{time.strftime('%H:%M:%S')}] cannot reload schemas: {e}", flush=True)
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        if not rechecked and not checker.triggers:
+            continue
+        triggers = checker.triggers or sorted(changed)
+        names = ", ".join(triggers[:3]) + (" ..." if len(triggers) > 3 else "")
+        print(f"\n[{time.strftime('%H:%M:%S')}] {names}: re-checked {len(rechecked)} file(s) in {elapsed:.1f} ms")
+        report(checker.selected, checker.units, checker.results)
+        sys.stdout.flush()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run schema validation, session lint and link checks in one pass.")
+    parser.add_argument("--rule", action="append", choices=RULES,
+                        help="Rule to run (repeatable; default: all)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count, 1 = serial)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every file (ignore .cache/check_all.json)")
+    parser.add_argument("--generic", action="store_true",
+                        help="Validate schemas with jsonschema only (skip the compiled fast-path validators)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running: re-check changed files and the files that depend on them")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll mtimes instead of using inotify")
+    args = parser.parse_args()
+    selected = [r for r in RULES if r in (args.rule or RULES)]
+
+    if "schema" in selected and importlib.util.find_spec("jsonschema") is None:
+        print("Schema validation requires the 'jsonschema' package.\nInstall with: pip install jsonschema",
+              file=sys.stderr)
+        return 2
+
+    # One directory walk answers every existence question below
+    snapshot = RepoSnapshot(REPO_ROOT)
+    cache = CheckCache("all", REPO_ROOT, enabled=not args.no_cache, exists=snapshot.exists)
+    checker = Checker(selected, snapshot, cache, use_compiled=not args.generic)
+    checker.run(checker.units, args.jobs)
+    failed = report(selected, checker.units, checker.results)
+    if args.watch:
+        try:
+            watch(checker, args.poll)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Content-hash result cache shared by the repo checkers (validate_schemas, lint_sessions,
+validate_links).
+
+Each checker keeps one file, .cache/check_<name>.json, mapping a checked file (repo-relative)
+to the SHA-256 of its content, the hash of the rule set that produced the result (e.g. the
+governing JSON Schema), the errors found, and optionally the paths the result depends on
+together with whether each existed (link targets, linked exercise files). A cached result
+is reused only when the content hash, the rule hash and every dependency's existence still
+match; a stat (mtime + size) match skips re-hashing unchanged files. A result is stored under
+the fingerprint taken before the check ran (by `lookup()`, or `fingerprint()` when a caller
+skips the lookup), so a file edited mid-check is re-checked next time.
+
+Usage (library):
+    from check_cache import CheckCache, rules_digest
+    cache = CheckCache("lint", repo_root, enabled=not args.no_cache)
+    errs = cache.lookup(path, rules)
+    if errs is None:
+        errs = check(path)
+        cache.store(path, rules, errs, deps={...})
+    cache.save()
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+PathLike = Union[str, Path]
+
+CACHE_DIR = Path(".cache")
+CACHE_VERSION = 1
+
+
+def file_digest(path: PathLike) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def rules_digest(*parts: Any) -> str:
+    """Hash of a rule set: strings/bytes are hashed as-is, Paths by content, anything else as JSON."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, Path):
+            h.update((file_digest(part) or "missing").encode())
+        elif isinstance(part, bytes):
+            h.update(part)
+        elif isinstance(part, str):
+            h.update(part.encode())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=sorted).encode())
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class CheckCache:
+    def __init__(self, name: str, repo_root: PathLike, enabled: bool = True,
+                 exists: Optional[Callable[[str], bool]] = None) -> None:
+        self.repo_root = Path(repo_root)
+        # Existence test for repo-relative dependency paths (e.g. a prebuilt filesystem snapshot)
+        self.exists = exists or (lambda rel: os.path.exists(self.repo_root / rel))
+        self.path = self.repo_root / CACHE_DIR / f"check_{name}.json"
+        self.enabled = enabled
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Fingerprints taken by lookup() misses, consumed by store()
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.dirty = False
+        self.hits = 0
+        if enabled:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(raw, dict) and raw.get("version") == CACHE_VERSION:
+            self.entries = raw.get("entries") or {}
+
+    def _key(self, path: PathLike) -> str:
+        return os.path.relpath(os.path.abspath(path), self.repo_root)
+
+    def _fingerprint(self, path: PathLike, entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Current {hash, mtimeNs, size}; re-hashes only when the stat differs from `entry`."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if entry and entry.get("mtimeNs") == st.st_mtime_ns and entry.get("size") == st.st_size:
+            digest = entry.get("hash")
+        else:
+            digest = file_digest(path)
+        return {"hash": digest, "mtimeNs": st.st_mtime_ns, "size": st.st_size}
+
+    def lookup(self, path: PathLike, rules: str) -> Optional[List[Any]]:
+        """Cached errors for `path` under `rules`, or None when it must be re-checked."""
+        if not self.enabled:
+            return None
+        key = self._key(path)
+        entry = self.entries.get(key)
+        fp = self._fingerprint(path, entry)
+        self._pending[key] = fp
+        if not entry or entry.get("rules") != rules or fp is None or fp["hash"] != entry.get("hash"):
+            return None
+        for dep, existed in (entry.get("deps") or {}).items():
+            if self.exists(dep) != existed:
+                return None
+        del self._pending[key]
+        if fp["mtimeNs"] != entry.get("mtimeNs"):
+            # Touched but identical content: remember the new stat so the next run skips hashing
+            entry.update(fp)
+            self.dirty = True
+        self.hits += 1
+        return entry.get("errors", [])
+
+    def fingerprint(self, path: PathLike) -> Optional[Dict[str, Any]]:
+        """Current fingerprint of `path`, to take before a check that did not go through lookup()."""
+        return self._fingerprint(path, self.entries.get(self._key(path)))
+
+    def store(self, path: PathLike, rules: str, errors: List[Any],
+              deps: Optional[Iterable[PathLike]] = None,
+              fingerprint: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record the result for `path`; `deps` are paths whose existence the result relied on.
+        The result is keyed by `fingerprint`, else by the one lookup() took before the check.
+        """
+        if not self.enabled:
+            return
+        key = self._key(path)
+        pending = self._pending.pop(key, None)
+        fp = fingerprint or pending or self._fingerprint(path, None)
+        if fp is None:
+            self.entries.pop(key, None)
+            return
+        entry: Dict[str, Any] = dict(fp, rules=rules, errors=list(errors))
+        if deps:
+            dep_keys = {self._key(self.repo_root / d) for d in deps}
+            entry["deps"] = {d: self.exists(d) for d in sorted(dep_keys)}
+        self.entries[key] = entry
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.enabled:
+            return
+        gone = [k for k in self.entries if not (self.repo_root / k).exists()]
+        for k in gone:
+            del self.entries[k]
+        if not (self.dirty or gone):
+            return
+        payload = {"version": CACHE_VERSION, "entries": self.entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # read-only checkout: results are still correct, just not reused next run
+        self.dirty = False
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Bulk Markdown -> JSON conversion: workouts/*.md to session JSON (md_to_session_json.py) and
+exercises/*.md to exercise JSON (md_to_exercise_json.py).
+
+Files are converted across a process pool (log_ingest.parallel_map). Every conversion is recorded
+in .cache/md_convert.json: the Markdown's content hash, the converter's code hash and the hash of
+the JSON written. A file is skipped when its Markdown and converter are unchanged and the JSON on
+disk is still the one written last time (a stat match skips re-hashing), so regenerating an
+unchanged library costs a stat per file.
+
+Usage:
+  python3 scripts/convert_markdown.py                     # convert new/changed Markdown
+  python3 scripts/convert_markdown.py --check             # report drift, write nothing; exit 1 on drift
+  python3 scripts/convert_markdown.py --force --jobs 1    # reconvert everything, serially
+  python3 scripts/convert_markdown.py 'workouts/5-3_*.md' exercises/goblet_squat.md
+
+Exercise JSON that already exists without a conversion record is left alone unless --force (the same
+rule as md_to_exercise_json.py): those files are usually curated by hand.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from check_cache import file_digest, rules_digest
+from log_ingest import parallel_map
+import md_to_exercise_json
+import md_to_session_json
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RECORD_PATH = REPO_ROOT / '.cache' / 'md_convert.json'
+RECORD_VERSION = 1
+
+# kind -> (Markdown directory, converter module)
+CONVERTERS = {
+    'session': ('workouts', md_to_session_json),
+    'exercise': ('exercises', md_to_exercise_json),
+}
+
+# (kind, repo-relative .md path)
+Unit = Tuple[str, str]
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def json_path_for(md_rel: str) -> str:
+    return os.path.splitext(md_rel)[0] + '.json'
+
+
+def converter_digests() -> Dict[str, str]:
+    return {kind: rules_digest(Path(module.__file__)) for kind, (_, module) in CONVERTERS.items()}
+
+
+def find_units(patterns: List[str]) -> List[Unit]:
+    """Markdown files to consider: all of workouts/*.md and exercises/*.md, or those matching `patterns`."""
+    units: Dict[str, str] = {}
+    for kind, (sub, _) in CONVERTERS.items():
+        for path in glob.glob(os.path.join(REPO_ROOT, sub, '*.md')):
+            units[os.path.relpath(path, REPO_ROOT)] = kind
+    if not patterns:
+        return sorted((kind, rel) for rel, kind in units.items())
+    selected = set()
+    for pattern in patterns:
+        for path in glob.glob(pattern) + glob.glob(os.path.join(REPO_ROOT, pattern)):
+            rel = os.path.relpath(os.path.abspath(path), REPO_ROOT)
+            if rel in units:
+                selected.add(rel)
+    return sorted((units[rel], rel) for rel in selected)
+
+
+def convert_unit(unit: Unit) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(Markdown hash, rendered JSON text, error) for one unit; runs in the pool workers."""
+    kind, rel = unit
+    try:
+        raw = (REPO_ROOT / rel).read_bytes()
+    except OSError as e:
+        return None, None, f'cannot read: {e}'
+    md_hash = hashlib.sha256(raw).hexdigest()  # same digest as check_cache.file_digest()
+    try:
+        # Universal newlines, as the single-file converters read their input
+        md = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        if kind == 'session':
+            text = md_to_session_json.render(md_to_session_json.convert(md, os.path.basename(rel)))
+        else:
+            text = md_to_exercise_json.render(md_to_exercise_json.parse_md_text(md, str(REPO_ROOT / rel)))
+    except Exception as e:
+        return md_hash, None, str(e)
+    return md_hash, text, None
+
+
+def load_records() -> Dict[str, Dict[str, Any]]:
+    try:
+        raw = json.loads(RECORD_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if isinstance(raw, dict) and raw.get('version') == RECORD_VERSION:
+        return raw.get('files') or {}
+    return {}
+
+
+def save_records(records: Dict[str, Dict[str, Any]]) -> None:
+    payload = {'version': RECORD_VERSION, 'files': records}
+    try:
+        RECORD_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = RECORD_PATH.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(payload, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, RECORD_PATH)
+    except OSError:
+        pass  # read-only checkout: everything is simply reconverted next time
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def up_to_date(rel: str, rec: Optional[Dict[str, Any]], converter: str) -> bool:
+    """True when `rel` was converted by this converter from its current content and the JSON is untouched."""
+    if not rec or rec.get('converter') != converter:
+        return False
+    md_stat, json_stat = _stat(REPO_ROOT / rel), _stat(REPO_ROOT / json_path_for(rel))
+    if md_stat is None or json_stat is None:
+        return False
+    if list(md_stat) != rec.get('mdStat') and file_digest(REPO_ROOT / rel) != rec.get('mdHash'):
+        return False
+    if list(json_stat) != rec.get('jsonStat') and file_digest(REPO_ROOT / json_path_for(rel)) != rec.get('jsonHash'):
+        return False
+    # Touched but identical: remember the new stats so the next run skips hashing
+    rec['mdStat'], rec['jsonStat'] = list(md_stat), list(json_stat)
+    return True
+
+
+def write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Convert workout/exercise Markdown to JSON, skipping unchanged files.')
+    parser.add_argument('paths', nargs='*', help='Markdown files or globs (default: workouts/*.md and exercises/*.md)')
+    parser.add_argument('--check', action='store_true', help='report JSON that differs from a fresh conversion; write nothing')
+    parser.add_argument('--force', action='store_true', help='reconvert every file, including hand-curated exercise JSON')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count, 1 = serial)')
+    args = parser.parse_args()
+
+    units = find_units(args.paths)
+    if not units:
+        print('No Markdown files to convert.')
+        return 0
+
+    records = load_records()
+    converters = converter_digests()
+    stale: List[Unit] = []
+    unmanaged: List[str] = []
+    for kind, rel in units:
+        rec = records.get(rel)
+        if not args.force and up_to_date(rel, rec, converters[kind]):
+            continue
+        if kind == 'exercise' and not args.force and not rec and (REPO_ROOT / json_path_for(rel)).exists():
+            unmanaged.append(rel)
+            continue
+        stale.append((kind, rel))
+
+    drift: List[Tuple[str, str]] = []
+    written = errors = 0
+    for (kind, rel), (md_hash, text, error) in zip(stale, parallel_map(convert_unit, stale, args.jobs) if stale else []):
+        out_rel = json_path_for(rel)
+        out_path = REPO_ROOT / out_rel
+        if error is not None:
+            print(f'ERROR {rel}: {error}')
+            errors += 1
+            continue
+        try:
+            current = out_path.read_text(encoding='utf-8')
+        except OSError:
+            current = None
+        if args.check:
+            if current != text:
+                drift.append((out_rel, 'missing' if current is None else 'differs from a fresh conversion'))
+            continue
+        if current != text:
+            write_atomic(out_path, text)
+            print(f'Wrote {out_rel}')
+            written += 1
+        records[rel] = {
+            'converter': converters[kind],
+            'mdHash': md_hash,
+            'mdStat': list(_stat(REPO_ROOT / rel) or ()),
+            'jsonHash': text_digest(text),
+            'jsonStat': list(_stat(out_path) or ()),
+        }
+
+    if not args.check:
+        # Records for Markdown files that no longer exist are dropped
+        for rel in [r for r in records if not (REPO_ROOT / r).exists()]:
+            del records[rel]
+        save_records(records)
+
+    skipped = len(units) - len(stale) - len(unmanaged)
+    if args.check:
+        for out_rel, reason in drift:
+            print(f'DRIFT {out_rel}: {reason}')
+        print(f'Checked {len(units)} Markdown file(s): {len(drift)} drifted, {skipped} unchanged, '
+              f'{len(unmanaged)} hand-curated skipped, {errors} error(s)')
+        return 1 if drift or errors else 0
+    print(f'Converted {len(units)} Markdown file(s): {written} written, {len(stale) - written - errors} already current, '
+          f'{skipped} unchanged, {len(unmanaged)} hand-curated skipped, {errors} error(s)')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Persisted dependency graph between exercises, workouts and performed logs.
+
+Edges (source -> target, both repo-relative paths):
+  - workouts/**/*.json  -> exercises/<slug>.json   every exercise item's `link` (supersets/circuits too)
+  - performed/*.json    -> workouts/<file>.json    the log's `workoutFile`
+  - performed/*.json    -> exercises/<slug>.json   every key of a perf-2 `exerciseIndex` (perf-1:
+                                                   `exercises`), kebab -> snake; the angle suffix of
+                                                   app-format keys (entry has `angle`) is dropped,
+                                                   older unsuffixed keys are used as they are
+Targets are recorded whether or not they exist, so creating a missing exercise file still finds
+the sessions that were waiting for it.
+
+The graph lives in .cache/dep_graph.json together with the mtime and size of every source file;
+`refresh()` re-parses only new or changed files and drops deleted ones. Reverse edges are rebuilt
+in memory on load, so "what depends on X" is a dict lookup.
+
+Usage:
+  python3 scripts/dep_graph.py dependents exercises/goblet_squat.json          # direct
+  python3 scripts/dep_graph.py dependents exercises/goblet_squat.json --transitive
+  python3 scripts/dep_graph.py dependencies performed/2025-11-21T133542_5-3_Chest_Shoulders_Volume.json
+  python3 scripts/dep_graph.py summary [--rebuild]
+
+Usage (library):
+    from dep_graph import load_graph
+    graph = load_graph()
+    sessions = graph.dependents("exercises/goblet_squat.json")
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from log_ingest import ingest
+
+GRAPH_PATH = Path('.cache') / 'dep_graph.json'
+GRAPH_VERSION = 2
+
+# "<slug>_<angle>" exerciseIndex keys (see prescribe_loads.build_angle_key)
+ANGLE_SUFFIX = re.compile(r'_-?\d+$')
+
+
+def exercise_path_for_key(key: str, summary: Any = None) -> str:
+    """
+    exercises/<file>.json for an exerciseIndex key: 'goblet-squat_0' -> 'exercises/goblet_squat.json'.
+    The suffix is only dropped when `summary` records the angle it encodes, so an unsuffixed key
+    (old migrator output, perf-1 `exercises`) that happens to end in `_<digits>` is kept whole.
+    """
+    angle = summary.get('angle') if isinstance(summary, dict) else None
+    if isinstance(angle, int) and not isinstance(angle, bool) and key.endswith(f'_{angle}'):
+        key = ANGLE_SUFFIX.sub('', key)
+    return f"exercises/{key.replace('-', '_')}.json"
+
+
+def _session_links(items: Iterable[Any], out: Set[str]) -> None:
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        link = item.get('link')
+        if item.get('kind') == 'exercise' and isinstance(link, str) and link:
+            out.add(os.path.normpath(link))
+        if item.get('kind') in ('circuit', 'superset'):
+            _session_links(item.get('children'), out)
+
+
+def file_dependencies(kind: str, data: Any) -> List[str]:
+    """Sorted targets referenced by one parsed source file (`kind` is 'session' or 'performed')."""
+    deps: Set[str] = set()
+    if not isinstance(data, dict):
+        return []
+    if kind == 'session':
+        for section in data.get('sections') or []:
+            if isinstance(section, dict):
+                _session_links(section.get('items'), deps)
+    else:
+        workout = data.get('workoutFile')
+        if isinstance(workout, str) and workout:
+            deps.add(os.path.normpath(workout))
+        index = data.get('exerciseIndex') if data.get('version') == 'perf-2' else data.get('exercises')
+        if isinstance(index, dict):
+            deps.update(exercise_path_for_key(key, summary) for key, summary in index.items())
+    return sorted(deps)
+
+
+def _dependencies_of(path: str, data: Any) -> List[str]:
+    # ingest() normalize hook; runs in the pool workers
+    return file_dependencies('performed' if Path(path).parent.name == 'performed' else 'session', data)
+
+
+def source_files(repo_root: Path) -> List[Path]:
+    """Every file the graph reads edges from: session JSON and performed logs (not the manifest)."""
+    sessions = repo_root.glob('workouts/**/*.json')
+    logs = (p for p in repo_root.glob('performed/*.json') if p.name != 'index.json')
+    return sorted(p for p in list(sessions) + list(logs) if p.is_file())
+
+
+class DepGraph:
+    """
+    Forward edges per source file (persisted with its mtime/size) plus the derived reverse edges.
+    """
+
+    def __init__(self, repo_root, graph_path=None, jobs=None):
+        self.repo_root = Path(repo_root)
+        self.graph_path = graph_path or (self.repo_root / GRAPH_PATH)
+        self.jobs = jobs
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.reverse: Dict[str, Set[str]] = defaultdict(set)
+        self.dirty = False
+
+    def load(self):
+        try:
+            raw = json.loads(self.graph_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return self
+        if isinstance(raw, dict) and raw.get('version') == GRAPH_VERSION:
+            self.files = raw.get('files') or {}
+            self._rebuild_reverse()
+        return self
+
+    def save(self):
+        if not self.dirty:
+            return
+        payload = {'version': GRAPH_VERSION, 'files': self.files}
+        self.graph_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.graph_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(payload, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, self.graph_path)
+        self.dirty = False
+
+    def _rebuild_reverse(self):
+        self.reverse = defaultdict(set)
+        for source, meta in self.files.items():
+            for target in meta['deps']:
+                self.reverse[target].add(source)
+
+    def refresh(self) -> List[str]:
+        """Re-read new/changed source files and drop deleted ones; returns the sources updated."""
+        present = {os.path.relpath(p, self.repo_root): p for p in source_files(self.repo_root)}
+        stale = {}
+        for rel, path in present.items():
+            stat = path.stat()
+            meta = self.files.get(rel)
+            if meta and meta.get('mtimeNs') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+                continue
+            stale[str(path)] = (rel, stat)
+        updated = [rel for rel in self.files if rel not in present]
+        for rel in updated:
+            self._set(rel, None)
+        for result in ingest(stale, normalize=_dependencies_of, jobs=self.jobs):
+            rel, stat = stale[result.path]
+            # Unparseable files keep no edges until they parse again
+            deps = result.data if result.error is None else []
+            self._set(rel, {'mtimeNs': stat.st_mtime_ns, 'size': stat.st_size, 'deps': deps})
+            updated.append(rel)
+        if updated:
+            self.dirty = True
+        return sorted(updated)
+
+    def _set(self, rel: str, meta: Optional[Dict[str, Any]]) -> None:
+        old = self.files.pop(rel, None)
+        for target in (old or {}).get('deps', ()):
+            sources = self.reverse.get(target)
+            if sources is not None:
+                sources.discard(rel)
+                if not sources:
+                    del self.reverse[target]
+        if meta is not None:
+            self.files[rel] = meta
+            for target in meta['deps']:
+                self.reverse[target].add(rel)
+
+    def dependencies(self, path: str) -> List[str]:
+        return list((self.files.get(os.path.normpath(path)) or {}).get('deps', ()))
+
+    def dependents(self, path: str, transitive: bool = False) -> List[str]:
+        """Sources referencing `path`; with `transitive`, also whatever references those (e.g. their logs)."""
+        start = os.path.normpath(path)
+        seen: Set[str] = set()
+        frontier = [start]
+        while frontier:
+            nxt = []
+            for node in frontier:
+                for source in self.reverse.get(node, ()):
+                    if source not in seen and source != start:
+                        seen.add(source)
+                        nxt.append(source)
+            frontier = nxt if transitive else []
+        return sorted(seen)
+
+    def affected(self, paths: Iterable[str], transitive: bool = False) -> List[str]:
+        """The given paths plus everything depending on any of them."""
+        out = {os.path.normpath(p) for p in paths}
+        for p in list(out):
+            out.update(self.dependents(p, transitive))
+        return sorted(out)
+
+
+def load_graph(repo_root=None, rebuild=False, jobs=None) -> DepGraph:
+    graph = DepGraph(repo_root or Path(__file__).resolve().parent.parent, jobs=jobs)
+    if not rebuild:
+        graph.load()
+    graph.refresh()
+    try:
+        graph.save()
+    except OSError:
+        pass  # read-only checkout: the in-memory graph is still valid for this run
+    return graph
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Query the exercise/workout/performed-log dependency graph.')
+    parser.add_argument('--rebuild', action='store_true', help='re-read every source file (ignore .cache/dep_graph.json)')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes for parsing (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='print JSON instead of one path per line')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_dependents = sub.add_parser('dependents', help='files that reference the given paths')
+    p_dependents.add_argument('paths', nargs='+')
+    p_dependents.add_argument('--transitive', action='store_true',
+                              help='follow edges further (exercise -> workouts -> performed logs)')
+    p_dependencies = sub.add_parser('dependencies', help='paths referenced by the given files')
+    p_dependencies.add_argument('paths', nargs='+')
+    sub.add_parser('summary', help='graph size and missing targets')
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent.parent
+    graph = load_graph(repo_root, rebuild=args.rebuild, jobs=args.jobs)
+
+    if args.command == 'summary':
+        targets = sorted(graph.reverse)
+        missing = [t for t in targets if not (repo_root / t).exists()]
+        result: Any = {
+            'sources': len(graph.files),
+            'edges': sum(len(m['deps']) for m in graph.files.values()),
+            'targets': len(targets),
+            'missingTargets': missing,
+        }
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"{result['sources']} source file(s), {result['edges']} edge(s), {result['targets']} target(s)")
+            for t in missing:
+                print(f"  missing: {t} (referenced by {len(graph.reverse[t])})")
+        return 0
+
+    if args.command == 'dependents':
+        result = {p: graph.dependents(p, args.transitive) for p in args.paths}
+    else:
+        result = {p: graph.dependencies(p) for p in args.paths}
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for p in sorted({x for values in result.values() for x in values}):
+            print(p)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
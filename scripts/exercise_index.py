@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+perf-2 `exerciseIndex` builder, shared by the perf-1 migrator and the backfill CLI below.
+
+Same output as `buildExerciseIndex()` in assets/form-builder.ts (the app's exporter):
+  - keys are `<slug>_<angle>` (see prescribe_loads.build_angle_key); standalone exercises use the
+    slugified name, superset/circuit children their `key` (slugified name when missing)
+  - the angle is the first set/round that records one (0 when none do)
+  - totalVolume = sum of weight * multiplier * reps (missing weight/reps count as 0, multiplier as 1)
+  - avgRPE = sum of RPE / number of sets or rounds (missing RPE counts as 0)
+  - a later item with the same key replaces the earlier one
+Each item's sets/rounds are walked once, accumulating every child exercise in the same pass.
+
+Logs written by the old migrator carry unsuffixed keys without `angle` and 1-decimal values.
+Readers accept both formats (analyze_performance_logs only trusts an index with `angle` on every
+entry, dep_graph only strips a suffix that matches the entry's angle), so a backfill is optional.
+The archive is left alone unless --include-archive is given.
+
+Usage:
+  python3 scripts/exercise_index.py                      # backfill/refresh every perf-2 log in performed/
+  python3 scripts/exercise_index.py --check              # report stale/missing indexes; exit 1 if any
+  python3 scripts/exercise_index.py --include-archive    # performed/archive/ too
+  python3 scripts/exercise_index.py performed/2025-11-17T133000_5-3_Chest_Triceps_Strength.json
+
+Usage (library):
+    from exercise_index import build_exercise_index
+    log['exerciseIndex'] = build_exercise_index(log['sections'])
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from log_ingest import parallel_map
+from prescribe_loads import build_angle_key, parse_angle, slugify
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _number(value: Any, default: float) -> float:
+    # JS `value || default`: missing, null, zero and non-numeric values fall back
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value:
+        return default
+    return value
+
+
+def _js_number(value: float) -> float:
+    # JSON.stringify writes 7 for 7.0; keep Python output byte-compatible with the app's
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def _summary(name: Any, angle: Optional[int], path: str, sets: int, rounds: int,
+             rpe_sum: float, volume: float, count: int) -> Dict[str, Any]:
+    return {
+        'angle': angle if angle is not None else 0,
+        'name': name,
+        'sectionPath': path,
+        'totalSets': sets,
+        'totalRounds': rounds,
+        'avgRPE': _js_number(rpe_sum / count),
+        'totalVolume': _js_number(volume),
+    }
+
+
+def build_exercise_index(sections: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """perf-2 `exerciseIndex` for `sections` (angle-suffixed keys, one summary per exercise)."""
+    index: Dict[str, Dict[str, Any]] = {}
+    for s_idx, section in enumerate(sections or []):
+        for i_idx, item in enumerate(section.get('items') or []):
+            kind = item.get('kind')
+            sets = item.get('sets')
+            rounds = item.get('rounds')
+            if kind == 'exercise' and isinstance(sets, list) and sets:
+                volume = rpe_sum = 0
+                angle = None
+                for s in sets:
+                    s = s if isinstance(s, dict) else {}
+                    volume += _number(s.get('weight'), 0) * _number(s.get('multiplier'), 1) * _number(s.get('reps'), 0)
+                    rpe_sum += _number(s.get('rpe'), 0)
+                    if angle is None:
+                        angle = parse_angle(s.get('angle'))
+                key = build_angle_key(slugify(item.get('name') or ''), angle)
+                index[key] = _summary(item.get('name'), angle, f"sections[{s_idx}].items[{i_idx}].sets[*]",
+                                      len(sets), 0, rpe_sum, volume, len(sets))
+            elif kind in ('superset', 'circuit') and isinstance(rounds, list) and rounds:
+                children = (rounds[0] or {}).get('exercises') or []
+                volumes = [0] * len(children)
+                rpe_sums = [0] * len(children)
+                angles: List[Optional[int]] = [None] * len(children)
+                for r in rounds:
+                    exercises = (r or {}).get('exercises') or []
+                    for ex_idx, ex in enumerate(exercises[:len(children)]):
+                        if not isinstance(ex, dict):
+                            continue
+                        volumes[ex_idx] += _number(ex.get('weight'), 0) * _number(ex.get('multiplier'), 1) * _number(ex.get('reps'), 0)
+                        rpe_sums[ex_idx] += _number(ex.get('rpe'), 0)
+                        if angles[ex_idx] is None:
+                            angles[ex_idx] = parse_angle(ex.get('angle'))
+                for ex_idx, child in enumerate(children):
+                    child_key = child.get('key')
+                    slug = child_key if isinstance(child_key, str) and child_key else slugify(child.get('name') or '')
+                    index[build_angle_key(slug, angles[ex_idx])] = _summary(
+                        child.get('name'), angles[ex_idx],
+                        f"sections[{s_idx}].items[{i_idx}].rounds[*].exercises[{ex_idx}]",
+                        len(rounds), len(rounds), rpe_sums[ex_idx], volumes[ex_idx], len(rounds))
+    return index
+
+
+def default_paths(include_archive: bool = False) -> List[str]:
+    """Every log in performed/ (plus performed/archive/ when asked), not the manifest."""
+    paths = glob.glob(os.path.join(REPO_ROOT, 'performed', '*.json'))
+    if include_archive:
+        paths += glob.glob(os.path.join(REPO_ROOT, 'performed', 'archive', '*.json'))
+    return sorted(p for p in paths if os.path.basename(p) != 'index.json')
+
+
+def _render(data: Dict[str, Any], raw: str) -> str:
+    """`data` serialized the way the original file was (indent 2; ASCII escapes and trailing newline kept)."""
+    text = json.dumps(data, indent=2, ensure_ascii='\\u' in raw)
+    return text + '\n' if raw.endswith('\n') else text
+
+
+def refresh_file(path: str) -> Tuple[str, str, Optional[str]]:
+    """
+    (path, status, new text) for one log; runs in the pool workers. status is 'current',
+    'missing' / 'stale' (new text holds the refreshed file), 'skipped' (not perf-2) or 'error: ...'.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = f.read()
+        data = json.loads(raw)
+    except (OSError, ValueError) as e:
+        return path, f'error: {e}', None
+    if not isinstance(data, dict) or data.get('version') != 'perf-2' or not isinstance(data.get('sections'), list):
+        return path, 'skipped', None
+    try:
+        index = build_exercise_index(data['sections'])
+    except (AttributeError, TypeError) as e:
+        return path, f'error: {e}', None
+    current = data.get('exerciseIndex')
+    if current == index and list(current) == list(index):
+        return path, 'current', None
+    data['exerciseIndex'] = index
+    return path, 'missing' if current is None else 'stale', _render(data, raw)
+
+
+def write_atomic(path: str, text: str) -> None:
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Backfill or refresh the exerciseIndex of perf-2 performed logs.')
+    parser.add_argument('paths', nargs='*', help='logs or globs (default: performed/*.json)')
+    parser.add_argument('--include-archive', action='store_true',
+                        help='with no paths, also refresh the historical logs in performed/archive/')
+    parser.add_argument('--check', action='store_true', help='report missing/stale indexes; write nothing')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count, 1 = serial)')
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.paths for p in glob.glob(pattern)}) if args.paths else default_paths(args.include_archive)
+    if not paths:
+        print('No performed logs found.')
+        return 1
+
+    counts = {'current': 0, 'missing': 0, 'stale': 0, 'skipped': 0, 'error': 0}
+    for path, status, text in parallel_map(refresh_file, paths, args.jobs):
+        rel = os.path.relpath(os.path.abspath(path), REPO_ROOT)
+        if status.startswith('error'):
+            print(f'ERROR {rel}: {status[len("error: "):]}')
+            counts['error'] += 1
+            continue
+        counts[status] += 1
+        if text is None:
+            continue
+        if args.check:
+            print(f'{status.upper()} {rel}')
+        else:
+            write_atomic(path, text)
+            print(f'Wrote {rel} ({status} index)')
+
+    changed = counts['missing'] + counts['stale']
+    print(f"{'Checked' if args.check else 'Refreshed'} {len(paths)} log(s): {counts['current']} current, "
+          f"{counts['missing']} missing, {counts['stale']} stale, {counts['skipped']} not perf-2, "
+          f"{counts['error']} error(s)")
+    if counts['error'] or (args.check and changed):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Change notification for the repo's watch modes (scripts/check.py --watch).
+
+Iterating `Watcher(repo_root, dirs)` yields batches of changed repo-relative paths (created, modified,
+deleted or renamed files) under the given directories. On Linux it uses inotify through ctypes
+(no extra dependency); elsewhere, or when inotify is unavailable (e.g. the watch limit is
+exhausted), it polls mtimes/sizes of the watched trees. Editors save in several steps, so
+events arriving within DEBOUNCE seconds are delivered as one batch.
+
+Usage (library):
+    from file_watch import Watcher
+    for changed in Watcher(repo_root, ["workouts", "exercises"]):
+        ...  # {"workouts/3-1_Upper.json", ...}
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Set, Tuple
+
+DEBOUNCE = 0.05       # seconds to wait for the rest of an editor's save
+POLL_INTERVAL = 0.25  # seconds between scans in the polling fallback
+
+# Directories never watched (VCS internals, installed packages, generated caches)
+PRUNE = {".git", "node_modules", ".cache", "__pycache__"}
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _walk_dirs(repo_root: Path, dirs: Sequence[str]) -> Iterator[str]:
+    """Repo-relative directories to watch: each of `dirs` and its subdirectories."""
+    for top in dirs:
+        base = repo_root / top
+        if not base.is_dir():
+            continue
+        for dirpath, dirnames, _ in os.walk(base):
+            dirnames[:] = [d for d in dirnames if d not in PRUNE]
+            yield os.path.relpath(dirpath, repo_root)
+
+
+class _Inotify:
+    def __init__(self, repo_root: Path, dirs: Sequence[str]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.repo_root = repo_root
+        self.roots = set(dirs)
+        self.dirs: Dict[int, str] = {}
+
+    def add(self, rel_dir: str) -> None:
+        wd = self._add(self.fd, os.fsencode(self.repo_root / rel_dir), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {rel_dir}")
+        self.dirs[wd] = rel_dir
+
+    def read(self, timeout: Optional[float]) -> Tuple[Set[str], bool]:
+        """(changed paths, overflowed) from the events available within `timeout` seconds."""
+        changed: Set[str] = set()
+        overflow = False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed, overflow
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, overflow
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(buf[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            rel_dir = self.dirs.get(wd)
+            if rel_dir is None or not name:
+                continue
+            rel = name if rel_dir == "." else os.path.join(rel_dir, name)
+            if mask & IN_ISDIR:
+                top_ok = rel_dir != "." or name in self.roots
+                if mask & (IN_CREATE | IN_MOVED_TO) and name not in PRUNE and top_ok:
+                    # New directory: watch it and report the files it already holds
+                    for sub in _walk_dirs(self.repo_root, [rel]):
+                        self.add(sub)
+                        changed.update(os.path.join(sub, f) for f in os.listdir(self.repo_root / sub)
+                                       if (self.repo_root / sub / f).is_file())
+                continue
+            changed.add(rel)
+        return changed, overflow
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _scan(repo_root: Path, dirs: Sequence[str]) -> Dict[str, Tuple[int, int]]:
+    """{rel path: (mtime_ns, size)} for every file in the watched directories."""
+    state: Dict[str, Tuple[int, int]] = {}
+    for rel_dir in _walk_dirs(repo_root, dirs):
+        try:
+            entries = os.scandir(repo_root / rel_dir)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_file():
+                    st = entry.stat()
+                    rel = entry.name if rel_dir == "." else os.path.join(rel_dir, entry.name)
+                    state[rel] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+class Watcher:
+    """
+    Iterate to receive sets of changed repo-relative paths under `dirs` (recursively) and the
+    top-level files named in `top_level`, forever. `backend` is "inotify" or "polling".
+    """
+
+    def __init__(self, repo_root: Path, dirs: Sequence[str], top_level: Sequence[str] = (),
+                 force_poll: bool = False) -> None:
+        self.repo_root = Path(repo_root).resolve()
+        self.dirs = list(dirs)
+        self.top_level = set(top_level)
+        self._notifier: Optional[_Inotify] = None
+        if not force_poll and sys.platform.startswith("linux"):
+            try:
+                self._notifier = _Inotify(self.repo_root, self.dirs)
+                for rel_dir in _walk_dirs(self.repo_root, self.dirs):
+                    self._notifier.add(rel_dir)
+                if self.top_level:
+                    self._notifier.add(".")
+            except (OSError, AttributeError):
+                if self._notifier is not None:
+                    self._notifier.close()
+                self._notifier = None
+        self.backend = "polling" if self._notifier is None else "inotify"
+        # Baseline taken now, so changes made before iteration starts are still reported
+        self._state = self._snapshot() if self._notifier is None else {}
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state = _scan(self.repo_root, self.dirs)
+        for name in self.top_level:
+            try:
+                st = os.stat(self.repo_root / name)
+                state[name] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return state
+
+    def __iter__(self) -> Iterator[Set[str]]:
+        if self._notifier is None:
+            while True:
+                time.sleep(POLL_INTERVAL)
+                current = self._snapshot()
+                changed = {p for p in self._state.keys() | current.keys()
+                           if self._state.get(p) != current.get(p)}
+                self._state = current
+                if changed:
+                    yield changed
+        notifier = self._notifier
+        try:
+            while True:
+                changed, overflow = notifier.read(None)
+                # Collect the rest of this save before reporting
+                while True:
+                    more, more_overflow = notifier.read(DEBOUNCE)
+                    overflow = overflow or more_overflow
+                    if not more and not more_overflow:
+                        break
+                    changed |= more
+                if overflow:
+                    # Events were dropped: report everything so callers re-check from scratch
+                    changed |= set(self._snapshot())
+                changed = {p for p in changed if os.sep in p or p in self.top_level}
+                if changed:
+                    yield changed
+        finally:
+            notifier.close()
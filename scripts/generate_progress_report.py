@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Generate schema-valid progress reports (reports/*.json) from cached per-session summaries.
+
+Usage:
+    python3 scripts/generate_progress_report.py --start 2025-11-17 --end 2025-11-22 --grade A-
+        [--title ...] [--highlight ...] [--generated 2025-11-23] [--output reports/NAME.json]
+    python3 scripts/generate_progress_report.py --all [--check]
+
+Numbers come from the per-session rollups kept by analyze_performance_logs.py, so only new or
+changed logs are read. New reports get the computed KPIs and per-exercise section; existing
+reports only have the ones they already carry refreshed, and the coach's narrative is kept.
+--all skips a report whose index sessionCount the performed logs don't fully cover. Reports
+are validated with one compiled Draft7Validator before writing; reports/index.json follows.
+
+Exit codes: 0 ok, 1 validation failed (or --check found stale reports), 2 setup error.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import date
+from pathlib import Path
+
+from analyze_performance_logs import load_rollups
+
+ROOT = Path(__file__).resolve().parent.parent
+REPORTS_DIR = ROOT / 'reports'
+INDEX_PATH = REPORTS_DIR / 'index.json'
+SCHEMA_PATH = ROOT / 'schemas' / 'progress-report.schema.json'
+
+REPORT_VERSION = '1.0'
+EXERCISE_SECTION_TITLE = '📊 Per-Exercise Volume & Load'
+NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def sessions_in_range(rollups, start, end):
+    """Cached per-session summaries with start <= date <= end, oldest first."""
+    lo, hi = start.isoformat(), end.isoformat()
+    return [
+        dict(meta, file=name)
+        for name, meta in sorted(rollups.files.items(), key=lambda kv: (kv[1]['date'], kv[0]))
+        if lo <= meta['date'] <= hi
+    ]
+
+
+def _num(v):
+    return f"{int(v):,}" if float(v).is_integer() else f"{v:,}"
+
+
+def _day(iso):
+    d = date.fromisoformat(iso)
+    return f"{d:%b} {d.day}"
+
+
+def format_top_set(top, iso):
+    if not top:
+        return f"— ({_day(iso)})"
+    mult = top.get('multiplier') or 1
+    load = f"{_num(top['weight'])}×{_num(mult)}" if mult != 1 else f"{_num(top['weight'])} lb"
+    rpe = f" @ RPE {_num(top['rpe'])}" if top.get('rpe') is not None else ''
+    return f"{load} × {top.get('reps') or 0}{rpe} ({_day(iso)})"
+
+
+def _half_weeks(start, end):
+    weeks = round(((end - start).days + 1) / 7 * 2) / 2
+    return int(weeks) if weeks.is_integer() else weeks
+
+
+def _numbers(text):
+    return [float(n.replace(',', '')) for n in NUMBER.findall(text)]
+
+
+def _still_holds(written, computed):
+    """
+    True when a hand-written KPI value agrees with the computed one. Its wording is kept
+    ("5 (4 strength + 1 run)", "≈7.2"), and so is a shorter form that states only the leading
+    numbers ("44" for "44 (35 strength + 9 other)").
+    """
+    old = _numbers(written)
+    return bool(old) and _numbers(computed)[:len(old)] == old
+
+
+def _sentiment(delta):
+    return 'positive' if delta > 0 else 'negative' if delta < 0 else 'neutral'
+
+
+def compute_kpis(sessions):
+    strength = [s for s in sessions if any(ex['volume'] > 0 for ex in s['exercises'].values())]
+    other = len(sessions) - len(strength)
+    volume = sum(ex['volume'] for s in strength for ex in s['exercises'].values())
+    rpe_sets = [(ex['avg_rpe'] or 0, ex['sets']) for s in strength for ex in s['exercises'].values()
+                if ex['volume'] > 0 and ex['avg_rpe']]
+    total_sets = sum(n for _, n in rpe_sets)
+    avg_rpe = sum(r * n for r, n in rpe_sets) / total_sets if total_sets else None
+    count = f"{len(sessions)}" + (f" ({len(strength)} strength + {other} other)" if other else '')
+    return {
+        'Total Sessions': count,
+        'Strength Volume': f"{_num(round(volume))} lb",
+        'Avg Strength RPE': '—' if avg_rpe is None else f"{avg_rpe:.1f}",
+    }
+
+
+def exercise_rows(sessions):
+    """One exercise-progression row per loaded exercise, heaviest total volume first."""
+    history = {}
+    for s in sessions:
+        for name, ex in s['exercises'].items():
+            if ex['volume'] > 0:
+                history.setdefault(name, []).append((s['date'], ex))
+    rows = []
+    for name, hist in sorted(history.items(), key=lambda kv: -sum(ex['volume'] for _, ex in kv[1])):
+        first_date, first = hist[0]
+        last_date, last = hist[-1]
+        peak_date, peak = max(hist, key=lambda h: ((h[1].get('top_set') or {}).get('weight', 0),
+                                                    (h[1].get('top_set') or {}).get('reps', 0)))
+        delta = last['volume'] - first['volume']
+        if len(hist) == 1:
+            change = f"{_num(first['volume'])} lb (single session)"
+        else:
+            pct = f"{delta / first['volume'] * 100:+.0f}%" if first['volume'] else 'n/a'
+            change = f"{pct} session volume ({_num(first['volume'])} -> {_num(last['volume'])} lb)"
+        rows.append({
+            'exercise': name,
+            'firstSession': format_top_set(first.get('top_set'), first_date),
+            'peakPerformance': format_top_set(peak.get('top_set'), peak_date),
+            'volumeChange': change,
+            'volumeChangeSentiment': _sentiment(delta) if len(hist) > 1 else 'neutral',
+            'sessions': str(len({d for d, _ in hist})),
+        })
+    return rows
+
+
+def block_range(sessions):
+    blocks = sorted({int(s['blockWeek'].split('-')[0]) for s in sessions if s['blockWeek'] != 'unknown'})
+    return f"{blocks[0]}-{blocks[-1]}" if blocks else None
+
+
+def default_title(sessions):
+    weeks = sorted({s['blockWeek'] for s in sessions if s['blockWeek'] != 'unknown'})
+    if len(weeks) == 1:
+        block, week = weeks[0].split('-')
+        return f"Training Progress Report - Block {block} Week {week}"
+    rng = block_range(sessions)
+    if rng and rng.split('-')[0] == rng.split('-')[1]:
+        return f"Training Progress Report - Block {rng.split('-')[0]}"
+    return f"Training Progress Report - Blocks {rng}"
+
+
+def default_filename(sessions, generated):
+    weeks = sorted({s['blockWeek'] for s in sessions if s['blockWeek'] != 'unknown'})
+    if len(weeks) == 1:
+        return f"{generated}_block-{weeks[0]}.json"
+    return f"{generated}_blocks-{block_range(sessions)}.json"
+
+
+def build_report(sessions, start, end, existing=None, title=None, grade=None, highlights=None, generated=None):
+    """
+    Assemble a report for the sessions in [start, end].
+
+    Computed fields are refreshed; narrative fields fall back to `existing` (the report being
+    regenerated), then to the arguments, then to factual defaults.
+    """
+    existing = existing or {}
+    old_meta = existing.get('metadata') or {}
+    old_summary = existing.get('summary') or {}
+    kpis = compute_kpis(sessions)
+
+    kpi_cards = []
+    for card in old_summary.get('kpis') or []:
+        if card.get('label') in kpis:
+            value = kpis.pop(card['label'])
+            if not _still_holds(card.get('value', ''), value):
+                card = dict(card, value=value)
+        kpi_cards.append(card)
+    # A curated report keeps its own choice of KPIs and sections; only new reports get them all
+    if not existing:
+        kpi_cards += [{'label': label, 'value': value, 'sentiment': 'neutral'} for label, value in kpis.items()]
+
+    rows = exercise_rows(sessions)
+    old_sections = existing.get('sections') or []
+    sections = [s for s in old_sections if s.get('title') != EXERCISE_SECTION_TITLE]
+    if rows and (not existing or len(sections) != len(old_sections)):
+        sections.append({
+            'type': 'table',
+            'title': EXERCISE_SECTION_TITLE,
+            'table': {
+                'type': 'exercise-progression',
+                'columns': ['Exercise', 'First Session', 'Peak Performance', 'Volume Change', 'Sessions'],
+                'rows': rows,
+            },
+        })
+
+    if not highlights:
+        highlights = old_summary.get('highlights') or [
+            f"{row['exercise']}: {row['volumeChange']}" for row in rows[:3]
+        ]
+
+    summary = {
+        'grade': grade or old_summary.get('grade'),
+        'kpis': kpi_cards,
+        'highlights': highlights,
+    }
+    if old_summary.get('injuryStatus'):
+        summary['injuryStatus'] = old_summary['injuryStatus']
+
+    period = {
+        'startDate': start.isoformat(),
+        'endDate': end.isoformat(),
+        'blockRange': block_range(sessions) or (old_meta.get('period') or {}).get('blockRange'),
+        # Calendar weeks to the nearest half, unless the report already states its own count
+        'weeks': (old_meta.get('period') or {}).get('weeks', _half_weeks(start, end)),
+    }
+    return {
+        'version': existing.get('version', REPORT_VERSION),
+        'metadata': {
+            'title': title or old_meta.get('title') or default_title(sessions),
+            'period': {k: v for k, v in period.items() if v is not None},
+            'generatedDate': generated or old_meta.get('generatedDate') or date.today().isoformat(),
+        },
+        'summary': {k: v for k, v in summary.items() if v is not None},
+        'sections': sections,
+    }
+
+
+def index_entry(filename, report, session_count, existing=None):
+    """reports/index.json entry; curated index highlights win over the report's own."""
+    meta = report['metadata']
+    return {
+        'filename': filename,
+        'startDate': meta['period']['startDate'],
+        'endDate': meta['period']['endDate'],
+        'blockRange': meta['period'].get('blockRange'),
+        'title': meta['title'],
+        'generatedDate': meta['generatedDate'],
+        'overallGrade': report['summary'].get('grade'),
+        'sessionCount': session_count,
+        'highlights': (existing or {}).get('highlights') or report['summary'].get('highlights', []),
+    }
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump_json(data):
+    return json.dumps(data, indent=2, ensure_ascii=False) + '\n'
+
+
+def is_current(path, data):
+    """True when `path` already holds `data` (formatting differences are ignored)."""
+    try:
+        return load_json(path) == data
+    except (OSError, ValueError):
+        return False
+
+
+def write_if_changed(path, data):
+    """Atomically replace `path` with `data` as JSON; returns False when it was already current."""
+    if is_current(path, data):
+        return False
+    text = dump_json(data)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--start', type=date.fromisoformat, help='first day of the report (YYYY-MM-DD)')
+    parser.add_argument('--end', type=date.fromisoformat, help='last day of the report, inclusive (YYYY-MM-DD)')
+    parser.add_argument('--grade', help='overall grade (A-F with optional +/-); kept from the existing report otherwise')
+    parser.add_argument('--title', help='report title (default derived from the block/week covered)')
+    parser.add_argument('--highlight', action='append', default=[], help='highlight line (repeatable)')
+    parser.add_argument('--generated', type=lambda s: date.fromisoformat(s).isoformat(),
+                        help='generatedDate (default: kept from the existing report, else today)')
+    parser.add_argument('--output', help='report path (default reports/<generated>_block[s]-X-Y.json)')
+    parser.add_argument('--all', action='store_true', help='regenerate every report listed in reports/index.json')
+    parser.add_argument('--check', action='store_true', help='write nothing; exit 1 if any report is out of date')
+    args = parser.parse_args()
+
+    if args.all == bool(args.start or args.end):
+        parser.error('give either --all or --start/--end')
+    if not args.all and not (args.start and args.end):
+        parser.error('--start and --end are both required')
+
+    try:
+        from jsonschema import Draft7Validator, FormatChecker
+    except Exception:
+        print("Schema validation requires the 'jsonschema' package.\nInstall with: pip install jsonschema", file=sys.stderr)
+        return 2
+
+    try:
+        index = load_json(INDEX_PATH)
+    except (OSError, ValueError):
+        index = {'version': '2.0', 'description': 'AI-generated training progress reports (JSON format)', 'reports': []}
+    rollups = load_rollups()
+
+    # (path, report, session_count) for every report this run produces
+    jobs = []
+    skipped = []
+    if args.all:
+        for entry in index.get('reports', []):
+            path = REPORTS_DIR / entry['filename']
+            try:
+                existing = load_json(path)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {entry['filename']}: {e}", file=sys.stderr)
+                continue
+            start = date.fromisoformat(entry['startDate'])
+            end = date.fromisoformat(entry['endDate'])
+            sessions = sessions_in_range(rollups, start, end)
+            # Never rewrite a curated report from logs that don't cover every session it counts
+            if entry.get('sessionCount') is not None and len(sessions) != entry['sessionCount']:
+                print(f"Skipping {entry['filename']}: performed logs cover {len(sessions)} of its "
+                      f"{entry['sessionCount']} sessions")
+                skipped.append(entry['filename'])
+                continue
+            jobs.append((path, build_report(sessions, start, end, existing), len(sessions)))
+    else:
+        sessions = sessions_in_range(rollups, args.start, args.end)
+        if not sessions:
+            print(f"No performed logs between {args.start} and {args.end}.", file=sys.stderr)
+            return 2
+        generated = args.generated or date.today().isoformat()
+        path = Path(args.output) if args.output else REPORTS_DIR / default_filename(sessions, generated)
+        try:
+            existing = load_json(path)
+        except (OSError, ValueError):
+            existing = None
+        if existing is None and not args.grade:
+            parser.error('--grade is required for a new report')
+        report = build_report(sessions, args.start, args.end, existing, title=args.title, grade=args.grade,
+                              highlights=args.highlight, generated=args.generated)
+        jobs.append((path, report, len(sessions)))
+
+    # One compiled validator for the whole batch; an invalid report is neither written nor indexed
+    validator = Draft7Validator(load_json(SCHEMA_PATH), format_checker=FormatChecker())
+    valid_jobs = []
+    for path, report, session_count in jobs:
+        errors = sorted(validator.iter_errors(report), key=lambda e: [str(p) for p in e.path])
+        for err in errors:
+            loc = '/'.join(str(p) for p in err.path)
+            # oneOf/anyOf messages embed the whole instance; name the failing keyword instead
+            msg = err.message if len(err.message) <= 200 else f"does not satisfy '{err.validator}'"
+            print(f"[progress-report] {path.name}: {msg} at /{loc}")
+        if not errors:
+            valid_jobs.append((path, report, session_count))
+    failed = len(valid_jobs) != len(jobs)
+    jobs = valid_jobs
+
+    entries = {e['filename']: e for e in index.get('reports', [])}
+    stale = []
+    for path, report, session_count in jobs:
+        if args.check:
+            if not is_current(path, report):
+                stale.append(path.name)
+        elif write_if_changed(path, report):
+            print(f"Wrote {path.relative_to(ROOT) if path.is_relative_to(ROOT) else path}")
+        if path.parent.resolve() == REPORTS_DIR.resolve():
+            entries[path.name] = index_entry(path.name, report, session_count, entries.get(path.name))
+
+    # Newest first; reports generated the same day keep their existing relative order
+    order = {name: i for i, name in enumerate(e['filename'] for e in index.get('reports', []))}
+    index['reports'] = sorted(entries.values(),
+                              key=lambda e: (-date.fromisoformat(e['generatedDate']).toordinal(),
+                                             order.get(e['filename'], -1)))
+    if args.check:
+        if not is_current(INDEX_PATH, index):
+            stale.append(INDEX_PATH.name)
+        if stale:
+            print('Out of date: ' + ', '.join(stale))
+            return 1
+        print(f'Progress reports up to date ({len(jobs)} checked'
+              + (f', {len(skipped)} skipped: incomplete logs' if skipped else '') + ').')
+        return 1 if failed else 0
+    if write_if_changed(INDEX_PATH, index):
+        print(f"Updated {INDEX_PATH.relative_to(ROOT)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
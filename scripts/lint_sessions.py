@@ -10,13 +10,19 @@ Checks (warnings by default; can be strict):
 Usage:
   python3 scripts/lint_sessions.py --glob 'workouts/3-1_*.json' --strict
   python3 scripts/lint_sessions.py                 # scans workouts/**/*.json (warn-only)
+  python3 scripts/lint_sessions.py --affected-by exercises/goblet_squat.json   # sessions linking to it
+
+Results are cached per file content hash (scripts/check_cache.py); --no-cache re-lints everything.
 """
 import argparse
 import glob
 import json
 import os
 import sys
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from check_cache import CheckCache, rules_digest
 
 ALLOWED_LOG_TYPES = {"strength", "endurance", "carry", "mobility", "stretch"}
 
@@ -41,16 +47,17 @@ def iter_items(item: Dict[str, Any]):
                 yield sub
 
 
-def lint_file(path: str, repo_root: str) -> List[str]:
-    rel = os.path.relpath(path, repo_root)
+def lint_session(data: Any, rel: str, repo_root: str, deps: Optional[Set[str]] = None,
+                 exists: Optional[Callable[[str], bool]] = None) -> List[str]:
+    """
+    Lint an already-parsed session document (`rel` is its repo-relative path, used in messages).
+    `exists(link)` answers whether a repo-relative exercise path exists (default: the filesystem);
+    linked exercise paths whose existence was checked are added to `deps`.
+    """
+    if exists is None:
+        exists = lambda link: os.path.exists(os.path.join(repo_root, link))  # noqa: E731
     errors: List[str] = []
-    try:
-        data = load_json(path)
-    except Exception as e:
-        errors.append(f"{rel}: Failed to parse JSON: {e}")
-        return errors
-
-    sections = data.get("sections") or []
+    sections = (data.get("sections") if isinstance(data, dict) else None) or []
     if not isinstance(sections, list):
         errors.append(f"{rel}: sections must be an array")
         return errors
@@ -69,8 +76,9 @@ def lint_file(path: str, repo_root: str) -> List[str]:
                         if not isinstance(link, str) or not link.startswith("exercises/") or not link.endswith(".json"):
                             errors.append(f"{rel}: Suspicious link on '{name}': {link}")
                         else:
-                            ex_path = os.path.join(repo_root, link)
-                            if not os.path.exists(ex_path):
+                            if deps is not None:
+                                deps.add(link)
+                            if not exists(link):
                                 errors.append(f"{rel}: Exercise JSON not found for '{name}': {link}")
                     if not lt:
                         errors.append(f"{rel}: Missing logType on '{name}'")
@@ -79,29 +87,57 @@ def lint_file(path: str, repo_root: str) -> List[str]:
     return errors
 
 
+def lint_file(path: str, repo_root: str, deps: Optional[Set[str]] = None) -> List[str]:
+    """Lint one session file; linked exercise paths whose existence was checked are added to `deps`."""
+    rel = os.path.relpath(path, repo_root)
+    try:
+        data = load_json(path)
+    except Exception as e:
+        return [f"{rel}: Failed to parse JSON: {e}"]
+    return lint_session(data, rel, repo_root, deps)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--glob", default="workouts/**/*.json", help="Glob for session JSON files")
     parser.add_argument("--strict", action="store_true", help="Exit non-zero if any errors found")
+    parser.add_argument("--no-cache", action="store_true", help="Re-lint every file (ignore .cache/check_lint.json)")
+    parser.add_argument("--affected-by", action="append", default=[], metavar="PATH",
+                        help="Only lint matched sessions that are PATH or reference it (repeatable; "
+                             "e.g. an edited exercises/<slug>.json), via scripts/dep_graph.py")
     args = parser.parse_args()
 
     repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     pattern = os.path.join(repo_root, args.glob)
     files = sorted(glob.glob(pattern, recursive=True))
+    if args.affected_by:
+        from dep_graph import load_graph
+
+        affected = set(load_graph(repo_root).affected(
+            os.path.relpath(os.path.abspath(p), repo_root) for p in args.affected_by))
+        files = [fp for fp in files if os.path.relpath(fp, repo_root) in affected]
     if not files:
         print(f"No files matched: {args.glob}")
         return 0
 
+    # Reuse results for unchanged files whose linked exercise files neither appeared nor vanished
+    cache = CheckCache("lint", repo_root, enabled=not args.no_cache)
+    rules = rules_digest(Path(__file__))
     total = 0
     total_errs = 0
     for fp in files:
         total += 1
-        errs = lint_file(fp, repo_root)
+        errs = cache.lookup(fp, rules)
+        if errs is None:
+            deps: Set[str] = set()
+            errs = lint_file(fp, repo_root, deps)
+            cache.store(fp, rules, errs, deps)
         if errs:
             total_errs += len(errs)
             for e in errs:
                 print("ERROR:", e)
 
+    cache.save()
     print(f"Scanned {total} file(s); errors: {total_errs}")
     if args.strict and total_errs:
         return 1
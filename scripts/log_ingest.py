@@ -0,0 +1,108 @@
+"""
+Shared JSON ingestion layer for the repo scripts (performed logs, workouts, exercises).
+
+Reads and parses files, optionally fanning the work out over a process pool with bounded
+chunking, and hands back one `IngestResult` per file in deterministic (sorted path) order.
+Callers can pass a module-level `normalize(path, data)` function so the per-file
+post-processing (e.g. extracting set rows) also runs inside the workers.
+
+Small batches stay in-process: spinning up a pool costs more than parsing a few dozen files.
+`parallel_map` exposes the same pool policy for other per-file work (e.g. schema validation).
+
+Usage (library):
+    from log_ingest import ingest
+    for res in ingest(sorted(Path("performed").glob("*.json"))):
+        if res.error is None:
+            ...
+"""
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+PathLike = Union[str, Path]
+
+# Below this many files the pool start-up cost outweighs the parallel speedup.
+PARALLEL_THRESHOLD = 64
+MAX_CHUNKSIZE = 32
+
+
+class IngestResult(NamedTuple):
+    path: str
+    data: Any
+    error: Optional[str]
+
+
+def default_jobs() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def _load_one(path: str, normalize: Optional[Callable[[str, Any], Any]] = None) -> IngestResult:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        return IngestResult(path, None, str(e))
+    if normalize is not None:
+        try:
+            data = normalize(path, data)
+        except Exception as e:
+            return IngestResult(path, None, f"normalize failed: {e}")
+    return IngestResult(path, data, None)
+
+
+def _chunksize(n_files: int, workers: int) -> int:
+    # ~4 chunks per worker keeps the pool balanced without per-file IPC overhead
+    return max(1, min(MAX_CHUNKSIZE, n_files // (workers * 4) or 1))
+
+
+def parallel_map(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    jobs: Optional[int] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = (),
+) -> List[Any]:
+    """
+    `[func(x) for x in items]`, fanned out over a process pool when the batch is big enough.
+
+    `initializer(*initargs)` runs once per worker (and once in-process for the serial path), so
+    expensive per-process state such as compiled validators is built a single time per worker.
+    Results keep the order of `items`.
+    """
+    workers = default_jobs() if jobs is None else max(1, jobs)
+    workers = min(workers, len(items))
+
+    def serial() -> List[Any]:
+        if initializer is not None:
+            initializer(*initargs)
+        return [func(x) for x in items]
+
+    if workers <= 1 or len(items) < PARALLEL_THRESHOLD:
+        return serial()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            return list(pool.map(func, items, chunksize=_chunksize(len(items), workers)))
+    except (OSError, RuntimeError):
+        # Sandboxed/limited environments may refuse to spawn workers; fall back to serial.
+        return serial()
+
+
+def ingest(
+    paths: Iterable[PathLike],
+    normalize: Optional[Callable[[str, Any], Any]] = None,
+    jobs: Optional[int] = None,
+) -> List[IngestResult]:
+    """
+    Load every path as JSON (then `normalize(path, data)` if given) and return results sorted by path.
+
+    jobs: worker processes (None = CPU count, 1 = serial). `normalize` must be picklable,
+    i.e. a module-level function, when more than one job is used.
+    """
+    ordered = sorted(str(p) for p in paths)
+    return parallel_map(partial(_load_one, normalize=normalize), ordered, jobs)
@@ -16,6 +16,7 @@ Behavior:
 
 Notes:
   - This is a heuristic converter to bootstrap JSON; please review outputs for accuracy.
+  - scripts/convert_markdown.py converts workouts and exercises in bulk (parallel, skips unchanged files).
 """
 
 import argparse
@@ -29,6 +30,11 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 EX_DIR = os.path.join(ROOT, 'exercises')
 SCHEMA_PATH = os.path.join(ROOT, 'schemas', 'exercise.schema.json')
 
+H1 = re.compile(r"^#\s+(.+)$")
+H2 = re.compile(r"^##\s+(.+)$")
+BULLET = re.compile(r"^[-*]\s+")
+NUMBERED = re.compile(r"^\d+\.\s+")
+
 
 def slugify(name: str) -> str:
     s = name.strip().lower()
@@ -46,7 +52,7 @@ def read_text(path: str) -> str:
 
 def first_h1(text: str) -> str:
     for line in text.splitlines():
-        m = re.match(r"^#\s+(.+)$", line.strip())
+        m = H1.match(line.strip())
         if m:
             return m.group(1).strip()
     return ''
@@ -58,7 +64,7 @@ def extract_section(text: str, titles: List[str]) -> str:
     content_lines: List[str] = []
     capture = False
     for i, line in enumerate(lines):
-        h2 = re.match(r"^##\s+(.+)$", line.strip())
+        h2 = H2.match(line.strip())
         if h2:
             cur = h2.group(1).strip().lower()
             if any(cur.startswith(t.lower()) for t in titles):
@@ -79,10 +85,10 @@ def bullets_and_numbers_to_list(section_text: str) -> List[str]:
         if not line:
             continue
         # bullets: -, *, or numbered 1. 2.
-        if re.match(r"^[-*]\s+", line):
-            cues.append(re.sub(r"^[-*]\s+", '', line).strip())
-        elif re.match(r"^\d+\.\s+", line):
-            cues.append(re.sub(r"^\d+\.\s+", '', line).strip())
+        if BULLET.match(line):
+            cues.append(BULLET.sub('', line).strip())
+        elif NUMBERED.match(line):
+            cues.append(NUMBERED.sub('', line).strip())
     return [c for c in (c.strip(' .') for c in cues) if c]
 
 
@@ -145,7 +151,11 @@ def infer_tags(text: str) -> List[str]:
 
 
 def parse_md_to_json(md_path: str) -> Dict:
-    text = read_text(md_path)
+    return parse_md_text(read_text(md_path), md_path)
+
+
+def parse_md_text(text: str, md_path: str) -> Dict:
+    """Exercise JSON for the Markdown `text` of `md_path` (the path only supplies a fallback name)."""
     name = first_h1(text)
     if not name:
         # fallback to filename
@@ -169,7 +179,7 @@ def parse_md_to_json(md_path: str) -> Dict:
     safety = ''
     if safety_section:
         # Keep plain text by removing bullet markers
-        safety_lines = [re.sub(r"^[-*]\s+", '', ln).strip() for ln in safety_section.splitlines() if ln.strip()]
+        safety_lines = [BULLET.sub('', ln).strip() for ln in safety_section.splitlines() if ln.strip()]
         safety = ' '.join(safety_lines)
 
     equipment = infer_equipment(name + '\n' + text)
@@ -191,8 +201,13 @@ def parse_md_to_json(md_path: str) -> Dict:
     return data
 
 
+def render(data: Dict) -> str:
+    """File contents written for a converted exercise."""
+    return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+
 def save_json(path: str, data: Dict, dry_run: bool = False):
-    js = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    js = render(data)
     if dry_run:
         print(f"[dry-run] Would write: {os.path.relpath(path)}")
         return
@@ -9,8 +9,10 @@ Heuristics:
 - Attach nearby bullet items (next lines starting with - or *) as cues for that exercise.
 
 Outputs <same-name>.json next to the .md and does not delete the original.
+For the whole library, scripts/convert_markdown.py runs this converter in parallel and skips
+unchanged files.
 """
-import re, os, sys, json, glob
+import bisect, re, os, sys, json, glob
 from typing import Optional
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -36,6 +38,58 @@ H1 = re.compile(r'^#\s+(.+)$', re.M)
 H2 = re.compile(r'^##\s+(.+)$', re.M)
 H3 = re.compile(r'^###\s+(.+)$', re.M)
 LINK = re.compile(r"\[(?P<text>[^\]]+)\]\((?P<href>[^\)]+exercises/[\w\-]+\.(?:md|json))\)")
+LINK_SLUG = re.compile(r"exercises/([\w\-]+)\.(?:md|json)$")
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+DASHES = re.compile(r'-+')
+BULLET = re.compile(r'^\s*[-*]\s+')
+HEADING = re.compile(r'^#{1,6}\s+')
+NEWLINE = re.compile(r'\n')
+FENCED_JSON = re.compile(r"```json([^\n]*)\n([\s\S]*?)\n```", re.I)
+BLOCK_NUM = re.compile(r'Block\s*(\d+)', re.I)
+WEEK_NUM = re.compile(r'Week\s*(\d+)', re.I)
+
+# Inline prescription patterns on an exercise line ("3 x 10 @ RPE 8, 35 lb per hand")
+SETS_X_REPS = re.compile(r"(\d{1,2})\s*[x×]\s*(\d{1,3})", re.I)
+SETS_OF_REPS = re.compile(r"(\d{1,2})\s*sets?\s*(?:of|x)?\s*(\d{1,3})", re.I)
+RPE = re.compile(r"RPE\s*(\d{1,2}(?:\.\d+)?)", re.I)
+WEIGHT = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*(lb|lbs|kg)", re.I)
+PER_HAND = re.compile(r"per\s*hand|each|per\s*side|x2|×2", re.I)
+BODYWEIGHT = re.compile(r"bodyweight", re.I)
+CLOCK = re.compile(r"\b(\d{1,2}):(\d{2})(?::(\d{2}))?\b")
+MINUTES = re.compile(r"(\d{1,3})\s*(?:min|minutes?)\b", re.I)
+MILES = re.compile(r"(\d+(?:\.\d+)?)\s*(?:mi|miles?|mile)\b", re.I)
+
+# Line tokens. Exercise links are found in one pass over the lines; the lines after a link are
+# classified as the cue scans reach them (each line at most once per scan)
+T_BULLET, T_HEADING, T_LINK, T_BLANK, T_TEXT = range(5)
+
+
+def find_links(lines):
+    """Exercise link match (or None) per line."""
+    return [LINK.search(line) if 'exercises/' in line else None for line in lines]
+
+
+def classify(line, lm):
+    """Token for one line; a bullet wins over a heading/link on the same line."""
+    first = line.lstrip()[:1]
+    if (first == '-' or first == '*') and BULLET.match(line):
+        return T_BULLET
+    if first == '#' and HEADING.match(line):
+        return T_HEADING
+    if lm:
+        return T_LINK
+    if not first:
+        return T_BLANK
+    return T_TEXT
+
+
+def link_slug(href: str) -> Optional[str]:
+    m = LINK_SLUG.search(href)
+    return m.group(1) if m else None
+
+
+def name_slug(name: str) -> str:
+    return NON_ALNUM.sub('-', name.lower()).strip('-')
 
 def try_parse_embedded_session_json(md: str):
     """If the markdown contains a fenced JSON block with session structure, return that object.
@@ -44,8 +98,7 @@ def try_parse_embedded_session_json(md: str):
     """
     # Find all fenced json blocks
     blocks = []
-    fence = re.compile(r"```json([^\n]*)\n([\s\S]*?)\n```", re.I)
-    for m in fence.finditer(md):
+    for m in FENCED_JSON.finditer(md):
         meta = (m.group(1) or '').strip().lower()
         body = m.group(2) or ''
         blocks.append((meta, body))
@@ -64,14 +117,14 @@ def try_parse_embedded_session_json(md: str):
 def normalize_links_in_session(obj: dict) -> dict:
     """Walk the session JSON and normalize exercise links to 'exercises/<slug>.json'."""
     def slugify(s: str) -> str:
-        return re.sub(r'-+', '-', re.sub(r'[^a-z0-9]+', '-', s.lower())).strip('-')
+        return DASHES.sub('-', NON_ALNUM.sub('-', s.lower())).strip('-')
 
     def fix_link(name: str, link: Optional[str]) -> str:
         if link and isinstance(link, str):
             # Keep only trailing exercises/<slug>.json
-            m = re.search(r"exercises/([\w\-]+)\.(?:md|json)$", link)
-            if m:
-                return f"exercises/{m.group(1)}.json"
+            slug = link_slug(link)
+            if slug:
+                return f"exercises/{slug}.json"
         # Fallback from name
         if name:
             return f"exercises/{slugify(name)}.json"
@@ -104,70 +157,69 @@ def merge_md_annotations_into_session(md: str, obj: dict) -> dict:
     Matching is by slug derived from link href or name.
     """
     lines = md.splitlines()
+    links = find_links(lines)
     # Map slug -> { cues: [...], text: full_line_text }
     found = {}
-    for i, line in enumerate(lines):
-        lm = LINK.search(line)
+    for i, lm in enumerate(links):
         if not lm:
             continue
-        href = lm.group('href').strip()
-        mslug = re.search(r"exercises/([\w\-]+)\.(?:md|json)$", href)
-        slug = mslug.group(1) if mslug else re.sub(r'[^a-z0-9]+', '-', lm.group('text').lower()).strip('-')
+        slug = link_slug(lm.group('href').strip()) or name_slug(lm.group('text'))
         cues = []
         j = i + 1
         while j < len(lines):
-            nxt = lines[j]
-            if re.match(r'^\s*[-*]\s+', nxt):
-                cues.append(re.sub(r'^\s*[-*]\s+', '', nxt).strip())
+            nxt_lm = links[j]
+            nxt_tok = classify(lines[j], nxt_lm)
+            if nxt_tok == T_BULLET:
+                cues.append(BULLET.sub('', lines[j]).strip())
                 j += 1
                 continue
-            if re.match(r'^#{1,6}\s+', nxt) or LINK.search(nxt):
+            if nxt_tok == T_HEADING or nxt_lm:
                 break
             # stop on blank line
-            if not nxt.strip():
+            if nxt_tok == T_BLANK:
                 break
             j += 1
         found[slug] = {
             'cues': cues,
-            'line': line.strip()
+            'line': lines[i].strip()
         }
 
     def parse_prescription(text: str):
         if not text:
             return None
         pres = {}
-        m = re.search(r"(\d{1,2})\s*[x×]\s*(\d{1,3})", text, re.I)
+        m = SETS_X_REPS.search(text)
         if m:
             pres['sets'] = int(m.group(1))
             pres['reps'] = int(m.group(2))
-        m = re.search(r"(\d{1,2})\s*sets?\s*(?:of|x)?\s*(\d{1,3})", text, re.I)
+        m = SETS_OF_REPS.search(text)
         if 'sets' not in pres and m:
             pres['sets'] = int(m.group(1))
             pres['reps'] = int(m.group(2))
-        m = re.search(r"RPE\s*(\d{1,2}(?:\.\d+)?)", text, re.I)
+        m = RPE.search(text)
         if m:
             pres['rpe'] = float(m.group(1))
-        m = re.search(r"(\d{1,3}(?:\.\d+)?)\s*(lb|lbs|kg)", text, re.I)
+        m = WEIGHT.search(text)
         if m:
             pres['weight'] = float(m.group(1))
         # multiplier
-        if re.search(r"per\s*hand|each|per\s*side|x2|×2", text, re.I):
+        if PER_HAND.search(text):
             pres['multiplier'] = 2
-        if re.search(r"bodyweight", text, re.I):
+        if BODYWEIGHT.search(text):
             pres['multiplier'] = 0
         # time
-        m = re.search(r"\b(\d{1,2}):(\d{2})(?::(\d{2}))?\b", text)
+        m = CLOCK.search(text)
         if m:
             h = int(m.group(3) is not None and m.group(1) or 0)
             mm = int(m.group(3) is not None and m.group(2) or m.group(1))
             ss = int(m.group(3) is not None and m.group(3) or m.group(2))
             pres['timeSeconds'] = h * 3600 + mm * 60 + ss
         else:
-            m2 = re.search(r"(\d{1,3})\s*(?:min|minutes?)\b", text, re.I)
+            m2 = MINUTES.search(text)
             if m2:
                 pres['timeSeconds'] = int(m2.group(1)) * 60
         # distance (miles)
-        m = re.search(r"(\d+(?:\.\d+)?)\s*(?:mi|miles?|mile)\b", text, re.I)
+        m = MILES.search(text)
         if m:
             pres['distanceMiles'] = float(m.group(1))
         return pres if pres else None
@@ -178,12 +230,8 @@ def merge_md_annotations_into_session(md: str, obj: dict) -> dict:
                 continue
             if it.get('kind') == 'exercise' and (it.get('name') or it.get('exercise')):
                 name = it.get('name') or it.get('exercise')
-                slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
                 # prefer link-derived slug
-                if it.get('link'):
-                    m = re.search(r"exercises/([\w\-]+)\.(?:md|json)$", it['link'])
-                    if m:
-                        slug = m.group(1)
+                slug = (link_slug(it['link']) if it.get('link') else None) or name_slug(name)
                 meta = found.get(slug)
                 if meta:
                     # merge cues
@@ -236,6 +284,9 @@ def parse_md(md: str) -> dict:
         return embedded
 
     sections = []
+    lines = md.splitlines()
+    links = find_links(lines)
+    newlines = [m.start() for m in NEWLINE.finditer(md)]
     for head, chunk in parts:
         items = []
         # scan for exercise links
@@ -244,21 +295,22 @@ def parse_md(md: str) -> dict:
             href = lm.group('href').strip()
             # collect immediate following bullets as cues
             cues = []
-            # find following lines after the link line
-            start_line = md[:lm.start()].count('\n')
-            lines = md.splitlines()
+            # find following lines after the link line (the offset is chunk-relative, as it always
+            # has been; kept so regenerated files do not drift)
+            start_line = bisect.bisect_left(newlines, lm.start())
             j = start_line + 1
             while j < len(lines):
-                line = lines[j]
-                if re.match(r'^\s*[-*]\s+', line):
-                    cues.append(re.sub(r'^\s*[-*]\s+', '', line).strip())
+                line_lm = links[j]
+                tok = classify(lines[j], line_lm)
+                if tok == T_BULLET:
+                    cues.append(BULLET.sub('', lines[j]).strip())
                     j += 1
                     continue
                 # stop at next heading
-                if re.match(r'^#{1,6}\s+', line):
+                if tok == T_HEADING:
                     break
                 # stop if another exercise link is encountered
-                if LINK.search(line):
+                if line_lm:
                     break
                 j += 1
             items.append({
@@ -301,6 +353,24 @@ def iter_md_files(args):
         if name.endswith('.md'):
             yield os.path.join(WORKOUTS, name)
 
+def convert(md: str, name: str) -> dict:
+    """Session JSON for the markdown text `md` of workouts/<name>."""
+    data = parse_md(md)
+    # try to infer block/week from title or body or filename
+    title = None
+    m = H1.search(md)
+    if m: title = m.group(1)
+    text_for_bw = (title or '') + '\n' + md + '\n' + name
+    m = BLOCK_NUM.search(text_for_bw)
+    if m: data['block'] = int(m.group(1))
+    m = WEEK_NUM.search(text_for_bw)
+    if m: data['week'] = int(m.group(1))
+    return data
+
+def render(data: dict) -> str:
+    """File contents written for a converted session."""
+    return json.dumps(data, indent=2)
+
 def main():
     count = 0
     for md_path in iter_md_files(sys.argv[1:]):
@@ -309,18 +379,9 @@ def main():
         try:
             with open(md_path, 'r', encoding='utf-8') as f:
                 md = f.read()
-            data = parse_md(md)
-            # try to infer block/week from title or body or filename
-            title = None
-            m = re.search(r'^#\s+(.+)$', md, re.M)
-            if m: title = m.group(1)
-            text_for_bw = (title or '') + '\n' + md + '\n' + name
-            m = re.search(r'Block\s*(\d+)', text_for_bw, re.I)
-            if m: data['block'] = int(m.group(1))
-            m = re.search(r'Week\s*(\d+)', text_for_bw, re.I)
-            if m: data['week'] = int(m.group(1))
+            data = convert(md, name)
             with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+                f.write(render(data))
             print('Wrote', os.path.relpath(json_path, ROOT))
             count += 1
         except Exception as e:
@@ -14,13 +14,41 @@ Usage:
     
     # Migrate all perf-1 logs (use with caution!)
     python3 scripts/migrate_perf1_to_perf2.py performed/*_perf1.json
+
+    # Migrate the logs recorded from one session (found via scripts/dep_graph.py)
+    python3 scripts/migrate_perf1_to_perf2.py --workout workouts/4-1_Chest_Core_Glutes_Focus.json
+
+Logs are migrated in parallel (--jobs), grouped by session so each session JSON is parsed
+once per run (LRU cache keyed by mtime/size). Each output is written to a temp file and
+renamed into place. Completed files are appended to a checkpoint journal
+(.cache/migrate_perf1_to_perf2.journal), so re-running after an interruption skips them; an
+entry only counts while the input, the output and this script (and exercise_index.py) are
+unchanged, so editing the migrator re-migrates everything. Superseded entries are compacted
+away when the journal is loaded. --fresh ignores the journal.
 """
 
+import argparse
+import contextlib
+import functools
+import glob
+import io
 import json
+import os
 import sys
 import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+from check_cache import file_digest, rules_digest
+from exercise_index import build_exercise_index
+from log_ingest import PARALLEL_THRESHOLD, default_jobs, parallel_map
+
+# Parsed sessions kept in memory; logs from the same workout reuse one parse
+SESSION_CACHE_SIZE = 64
+REPO_ROOT = Path(__file__).resolve().parent.parent
+JOURNAL_PATH = REPO_ROOT / '.cache' / 'migrate_perf1_to_perf2.journal'
+# Session a log was recorded from, taken from its file name ("<timestamp>_<session>_perf1.json")
+LOG_SESSION = re.compile(r'^[^_]+_(?:workouts-)?(?P<session>.+?)(?:\.md)?(?:_perf[12])?\.json$')
 
 
 def exercise_key_from_name(name: str) -> str:
@@ -34,64 +62,22 @@ def exercise_key_from_name(name: str) -> str:
     return key
 
 
+@functools.lru_cache(maxsize=SESSION_CACHE_SIZE)
+def _parse_session(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    # Keyed by stat so an edited session is re-read
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 def load_session_json(workout_file: str) -> Optional[Dict[str, Any]]:
-    """Load session JSON from workouts directory."""
+    """Load session JSON from workouts directory (cached; the returned dict is shared, do not mutate)."""
     session_path = Path(workout_file)
-    if not session_path.exists():
+    try:
+        st = session_path.stat()
+    except OSError:
         print(f"  ⚠️  Session not found: {workout_file}")
         return None
-    
-    with open(session_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def build_exercise_index(sections: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-    """Build flat exercise index for fast queries."""
-    index = {}
-    
-    for s_idx, section in enumerate(sections):
-        for i_idx, item in enumerate(section.get('items', [])):
-            if item['kind'] == 'exercise' and 'sets' in item:
-                # Standalone exercise
-                ex_key = exercise_key_from_name(item['name'])
-                total_volume = sum(
-                    (s.get('weight', 0) * s.get('multiplier', 1)) * s.get('reps', 0)
-                    for s in item['sets']
-                )
-                avg_rpe = sum(s.get('rpe', 0) for s in item['sets']) / len(item['sets']) if item['sets'] else 0
-                
-                index[ex_key] = {
-                    'name': item['name'],
-                    'sectionPath': f"sections[{s_idx}].items[{i_idx}].sets[*]",
-                    'totalSets': len(item['sets']),
-                    'totalRounds': 0,
-                    'avgRPE': round(avg_rpe, 1),
-                    'totalVolume': round(total_volume, 1)
-                }
-            
-            elif item['kind'] in ('superset', 'circuit') and 'rounds' in item:
-                # Superset/circuit - index each child exercise
-                for ex_idx, exercise in enumerate(item['rounds'][0]['exercises'] if item['rounds'] else []):
-                    total_volume = sum(
-                        (r['exercises'][ex_idx].get('weight', 0) * r['exercises'][ex_idx].get('multiplier', 1)) * 
-                        r['exercises'][ex_idx].get('reps', 0)
-                        for r in item['rounds'] if ex_idx < len(r['exercises'])
-                    )
-                    avg_rpe = sum(
-                        r['exercises'][ex_idx].get('rpe', 0) 
-                        for r in item['rounds'] if ex_idx < len(r['exercises'])
-                    ) / len(item['rounds']) if item['rounds'] else 0
-                    
-                    index[exercise['key']] = {
-                        'name': exercise['name'],
-                        'sectionPath': f"sections[{s_idx}].items[{i_idx}].rounds[*].exercises[{ex_idx}]",
-                        'totalSets': len(item['rounds']),
-                        'totalRounds': len(item['rounds']),
-                        'avgRPE': round(avg_rpe, 1),
-                        'totalVolume': round(total_volume, 1)
-                    }
-    
-    return index
+    return _parse_session(str(session_path.resolve()), st.st_mtime_ns, st.st_size)
 
 
 def migrate_perf1_to_perf2(perf1_path: Path) -> Optional[Dict[str, Any]]:
@@ -285,65 +271,220 @@ def migrate_perf1_to_perf2(perf1_path: Path) -> Optional[Dict[str, Any]]:
         if perf2_section['items']:
             perf2['sections'].append(perf2_section)
     
-    # Build exercise index
+    # Build exercise index (same keys and summaries as the app's exporter)
     if perf2['sections']:
         perf2['exerciseIndex'] = build_exercise_index(perf2['sections'])
     
     return perf2
 
 
+def output_path_for(perf1_path: Path) -> Path:
+    """perf-2 output path: replace _perf1.json with _perf2.json (other names are migrated in place)."""
+    return perf1_path.parent / perf1_path.name.replace('_perf1.json', '_perf2.json')
+
+
+def write_atomic(path: Path, data: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # The target keeps its previous content; don't leave the partial temp file behind
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def migrate_file(perf1_path: Path) -> Tuple[str, Optional[str], str]:
+    """
+    Migrate one log and write its perf-2 file; returns (status, output path, printed report).
+    status is 'migrated', 'skipped' or 'error'.
+    """
+    out = io.StringIO()
+    output_path = None
+    with contextlib.redirect_stdout(out):
+        try:
+            perf2 = migrate_perf1_to_perf2(perf1_path)
+            if not perf2:
+                return 'skipped', None, out.getvalue()
+            output_path = output_path_for(perf1_path)
+            # Write perf-2 log (temp file + rename: an interrupted run never leaves a partial log)
+            write_atomic(output_path, perf2)
+            print(f"  ✅ Migrated → {output_path.name}")
+            print(f"     • {len(perf2['sections'])} sections")
+            print(f"     • {len(perf2.get('exerciseIndex', {}))} exercises in index")
+            print(f"     • {sum(len(s['items']) for s in perf2['sections'])} total items")
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+            return 'error', None, out.getvalue()
+    return 'migrated', str(output_path), out.getvalue()
+
+
+def migrate_group(paths: List[str]) -> List[Tuple[str, str, Optional[str], Optional[str], str]]:
+    """Migrate logs of one session in order (pool worker); [(path, status, output, output hash, report)]."""
+    results = []
+    for path in paths:
+        status, output, report = migrate_file(Path(path))
+        results.append((path, status, output, file_digest(output) if output else None, report))
+    return results
+
+
+def group_by_session(files: List[Path]) -> List[List[str]]:
+    """Logs grouped by the session named in their file name, so each group parses its session once."""
+    groups: Dict[str, List[str]] = {}
+    for path in files:
+        m = LOG_SESSION.match(path.name)
+        groups.setdefault(m.group('session') if m else path.name, []).append(str(path))
+    return [sorted(paths) for _, paths in sorted(groups.items())]
+
+
+def migrator_digest() -> str:
+    """Hash of this script and the index builder: a format fix invalidates every journal entry."""
+    return rules_digest(Path(__file__), Path(__file__).with_name('exercise_index.py'))
+
+
+def journal_key(path: Path) -> str:
+    return os.path.relpath(os.path.abspath(path), REPO_ROOT)
+
+
+def load_journal(journal_path: Path, digest: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Last recorded entry per input log; a torn final line (interrupted write) is ignored.
+
+    With `digest`, entries written by another migrator are dropped, and a journal holding
+    superseded lines is rewritten with just the live entries, so it does not grow with every run.
+    """
+    entries: Dict[str, Dict[str, Any]] = {}
+    lines = 0
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and 'input' in entry:
+                    entries.pop(entry['input'], None)  # keep file order = last-written order
+                    entries[entry['input']] = entry
+    except OSError:
+        pass
+    if digest is None:
+        return entries
+    live = {key: entry for key, entry in entries.items() if entry.get('migrator') == digest}
+    if lines != len(live):
+        tmp_path = journal_path.with_name(f"{journal_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry) + '\n' for entry in live.values())
+            os.replace(tmp_path, journal_path)
+        except OSError:
+            pass  # read-only checkout: the journal is only compacted next time
+    return live
+
+
+def already_done(path: Path, entry: Optional[Dict[str, Any]], digest: str) -> bool:
+    """True when the journal shows `path` was migrated by this migrator and nothing changed since."""
+    if not entry or entry.get('migrator') != digest or entry.get('status') != 'migrated':
+        return False
+    output = REPO_ROOT / entry['output']
+    if file_digest(output) != entry.get('outputHash'):
+        return False
+    # In-place migrations replace the input, so it then matches the output hash instead
+    return file_digest(path) in (entry.get('inputHash'), entry.get('outputHash'))
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 scripts/migrate_perf1_to_perf2.py <perf1_file_pattern>")
-        print("\nExamples:")
-        print("  python3 scripts/migrate_perf1_to_perf2.py performed/2025-11-04T133137_5-1_Chest_Triceps_Hypertrophy_perf1.json")
-        print("  python3 scripts/migrate_perf1_to_perf2.py performed/*5-1*_perf1.json  # Block 5 Week 1")
-        print("  python3 scripts/migrate_perf1_to_perf2.py performed/*_perf1.json  # All perf-1 logs")
+    parser = argparse.ArgumentParser(
+        description='Migrate perf-1 performance logs to perf-2.',
+        epilog='Examples:\n'
+               '  python3 scripts/migrate_perf1_to_perf2.py performed/2025-11-04T133137_5-1_Chest_Triceps_Hypertrophy_perf1.json\n'
+               '  python3 scripts/migrate_perf1_to_perf2.py performed/*5-1*_perf1.json  # Block 5 Week 1\n'
+               '  python3 scripts/migrate_perf1_to_perf2.py performed/*_perf1.json  # All perf-1 logs\n'
+               '  python3 scripts/migrate_perf1_to_perf2.py --workout workouts/4-1_Chest_Core_Glutes_Focus.json',
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('patterns', nargs='*', help='perf-1 log files or glob patterns')
+    parser.add_argument('--workout', action='append', default=[], metavar='PATH',
+                        help='also migrate the performed/ logs recorded from this session (scripts/dep_graph.py)')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count, 1 = serial)')
+    parser.add_argument('--fresh', action='store_true',
+                        help='ignore the checkpoint journal and migrate every matched file again')
+    args = parser.parse_args()
+
+    if not args.patterns and not args.workout:
+        parser.print_help()
         sys.exit(1)
-    
+
     # Collect all matching files
-    import glob
-    files = []
-    for pattern in sys.argv[1:]:
+    files: List[Path] = []
+    for pattern in args.patterns:
         files.extend(Path(p) for p in glob.glob(pattern))
-    
+    if args.workout:
+        from dep_graph import load_graph
+
+        graph = load_graph(REPO_ROOT)
+        for workout in args.workout:
+            rel = os.path.relpath(os.path.abspath(workout), REPO_ROOT)
+            files.extend(REPO_ROOT / dep for dep in graph.dependents(rel) if dep.startswith('performed' + os.sep))
+    files = sorted({Path(os.path.abspath(f)): f for f in files}.values())
+
     if not files:
-        print(f"❌ No files found matching pattern: {sys.argv[1:]}")
+        print(f"❌ No files found matching pattern: {args.patterns or args.workout}")
         sys.exit(1)
-    
+
     print(f"🔍 Found {len(files)} file(s) to migrate")
-    
-    # Migrate each file
+
+    # Resume: files the journal shows as migrated (same migrator, unchanged input and output) are skipped
+    digest = migrator_digest()
+    journal = {} if args.fresh else load_journal(JOURNAL_PATH, digest)
+    todo = [f for f in files if not already_done(f, journal.get(journal_key(f)), digest)]
+    resumed = len(files) - len(todo)
+    if resumed:
+        print(f"⏩ {resumed} file(s) already migrated (checkpoint journal); use --fresh to redo them")
+
     success_count = 0
     skip_count = 0
     error_count = 0
-    
-    for perf1_path in files:
-        try:
-            perf2 = migrate_perf1_to_perf2(perf1_path)
-            
-            if not perf2:
-                skip_count += 1
-                continue
-            
-            # Generate output filename: replace _perf1.json with _perf2.json
-            output_path = perf1_path.parent / perf1_path.name.replace('_perf1.json', '_perf2.json')
-            
-            # Write perf-2 log
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(perf2, f, indent=2, ensure_ascii=False)
-            
-            print(f"  ✅ Migrated → {output_path.name}")
-            print(f"     • {len(perf2['sections'])} sections")
-            print(f"     • {len(perf2.get('exerciseIndex', {}))} exercises in index")
-            print(f"     • {sum(len(s['items']) for s in perf2['sections'])} total items")
-            
-            success_count += 1
-        
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            error_count += 1
-    
+
+    # Groups are checkpointed in batches: a completed batch is journaled before the next starts.
+    # Batches are big enough for parallel_map to use its pool, small enough to lose little on interrupt.
+    groups = group_by_session(todo)
+    batch_size = max(PARALLEL_THRESHOLD, 4 * (args.jobs or default_jobs()))
+    try:
+        JOURNAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        journal_file = open(JOURNAL_PATH, 'a', encoding='utf-8')
+    except OSError:
+        journal_file = None  # read-only checkout: migrate without checkpoints
+    try:
+        for start in range(0, len(groups), batch_size):
+            batch = groups[start:start + batch_size]
+            for results in parallel_map(migrate_group, batch, args.jobs):
+                for path, status, output, output_hash, report in results:
+                    sys.stdout.write(report)
+                    if status == 'migrated':
+                        success_count += 1
+                    elif status == 'skipped':
+                        skip_count += 1
+                    else:
+                        error_count += 1
+                    if journal_file is not None:
+                        entry = {
+                            'input': journal_key(Path(path)),
+                            'inputHash': file_digest(Path(path)) if output and os.path.abspath(output) != os.path.abspath(path) else None,
+                            'status': status,
+                            'output': journal_key(Path(output)) if output else None,
+                            'outputHash': output_hash,
+                            'migrator': digest,
+                        }
+                        journal_file.write(json.dumps(entry) + '\n')
+            if journal_file is not None:
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+    finally:
+        if journal_file is not None:
+            journal_file.close()
+
     # Summary
     print(f"\n{'='*60}")
     print(f"✅ Migration Complete")
@@ -351,12 +492,14 @@ def main():
     print(f"  Migrated: {success_count}")
     print(f"  Skipped:  {skip_count}")
     print(f"  Errors:   {error_count}")
+    if resumed:
+        print(f"  Resumed:  {resumed}")
     print(f"  Total:    {len(files)}")
-    
+
     if success_count > 0:
         print(f"\n💾 New perf-2 files saved with '_perf2.json' suffix")
         print(f"   Original perf-1 files preserved")
-    
+
     if error_count > 0:
         sys.exit(1)
 
@@ -5,24 +5,51 @@ to guide prescriptions.
  - Normalizes exercise names to slugs (lowercase, alnum->-, collapse dashes).
  - Scans performed/*.json, aggregates the last 1–3 entries per normalized key, and now suffixes
      keys with `_angle` so incline vs flat prescriptions stay distinct (`slug_0` when no angle).
- - Prints a compact summary and suggested conservative progression heuristic.
+ - Prints a compact summary and suggested conservative progression heuristic; with `--suggest`,
+     a concrete e1RM/trend-based load per key (see progression_engine.py).
 
 Usage:
     python3 scripts/prescribe_loads.py --exercise "Neutral-Grip Flat Bench Press (Dumbbells)" --n 3
+    python3 scripts/prescribe_loads.py --exercise "Goblet Squat" --recent    # touch only the newest logs
+    python3 scripts/prescribe_loads.py --exercise "Incline Dumbbell Bench Press" --angle-range 15:45
+    python3 scripts/prescribe_loads.py --session workouts/5-3_Chest_Shoulders_Volume.json workouts/5-3_Glutes_Calves_Core.json
+    python3 scripts/prescribe_loads.py --exercise "Goblet Squat" --suggest
+    python3 scripts/prescribe_loads.py --suggest            # suggested load for every key
     python3 scripts/prescribe_loads.py --list-keys
+    python3 scripts/prescribe_loads.py --list-keys --rebuild-index
+    python3 scripts/prescribe_loads.py --serve [--socket /tmp/prescribe.sock]
+
+Serve mode (one JSON object per line in, one per line out; an optional "id" is echoed back):
+    {"op": "lookup", "exercise": "Goblet Squat", "n": 3}
+    {"op": "lookup", "exercise": "Incline Dumbbell Bench Press", "angleMin": 15, "angleMax": 45}
+    {"op": "last", "key": "goblet-squat_0", "n": 5}
+    {"op": "list-keys", "prefix": "incline-"}
+    {"op": "ping"}
 
 Notes:
 - This does not write workouts; it’s a planning aid for Kai.
 - Dumbbell per-hand entries may appear as weight + multiplier; we display both.
 - Angle defaults to `_0` when prescriptions/logs omit the field so legacy data remains accessible.
+- History is cached in `.cache/prescribe_loads_index.json` (keyed by `slug_angle`); only logs whose
+  mtime/size changed since the last run are re-parsed. Pass `--no-index` to force a full scan.
 """
 from __future__ import annotations
 import argparse
+import bisect
 import json
+import math
+import os
 import re
-from dataclasses import dataclass
+import socketserver
+import sys
+import threading
+from array import array
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from log_ingest import ingest
+from progression_engine import TARGET_RPE, Suggestion, format_suggestion, suggest
 
 RE_NONALNUM = re.compile(r"[^a-z0-9]+")
 
@@ -41,15 +68,25 @@ def slugify(name: str) -> str:
     return s
 
 
+def build_alias_map(aliases: Dict[str, List[str]]) -> Dict[str, str]:
+    """Reverse `ALIASES` into alias -> canonical (canonical keys map to themselves)."""
+    reverse: Dict[str, str] = {}
+    for canon, alist in aliases.items():
+        reverse.setdefault(canon, canon)
+        for alias in alist:
+            reverse.setdefault(alias, canon)
+    return reverse
+
+
+ALIAS_TO_CANONICAL: Dict[str, str] = build_alias_map(ALIASES)
+
+
 def canonical_keys_for(name: str) -> List[str]:
     key = slugify(name)
-    keys = [key]
-    # add alias candidates
-    for canon, alist in ALIASES.items():
-        if key == canon or key in alist:
-            keys = [canon] + alist
-            break
-    return keys
+    canon = ALIAS_TO_CANONICAL.get(key)
+    if canon is None:
+        return [key]
+    return [canon] + ALIASES[canon]
 
 
 def build_angle_key(slug: str, angle: int | None) -> str:
@@ -67,12 +104,29 @@ def parse_angle(value: Any) -> int | None:
     return num
 
 
-def format_weight(weight_val: Any, multiplier: Any) -> str:
-    if isinstance(weight_val, (int, float)):
-        if multiplier:
-            return f"{weight_val} x{multiplier}"
+def _num(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _text(value: Any) -> str | None:
+    """A logged value that is not a number (e.g. weight "bodyweight"), kept for display."""
+    return None if value is None or _num(value) is not None else str(value)
+
+
+def _fmt_num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def format_weight(weight_val: Any, multiplier: float | None) -> str:
+    if weight_val is None:
+        return ""
+    if _num(weight_val) is None:
         return str(weight_val)
-    return str(weight_val) if weight_val is not None else ""
+    if multiplier:
+        return f"{_fmt_num(weight_val)} x{_fmt_num(multiplier)}"
+    return _fmt_num(weight_val)
 
 
 def detect_angle_from_sets(sets: Iterable[Dict[str, Any]] | None) -> int | None:
@@ -84,13 +138,101 @@ def detect_angle_from_sets(sets: Iterable[Dict[str, Any]] | None) -> int | None:
             return angle
     return None
 
-@dataclass
+@dataclass(slots=True)
 class SetRow:
-    weight: str
-    reps: int | None
+    weight: float | None
+    multiplier: float | None
+    reps: float | None
     rpe: float | None
     set: int | None
     angle: int | None = None
+    weight_text: str | None = None
+
+
+SET_FIELDS = ("weight", "multiplier", "reps", "rpe", "set", "angle")
+NAN = float("nan")
+
+
+class SetStore:
+    """
+    Array-backed history for one `slug_angle` key.
+
+    Every set field lives in its own parallel `array('d')` (NaN = not logged); `files[i]` is the
+    log for session i and `offsets[i]:offsets[i + 1]` its rows. Sessions stay in filename
+    (timestamp) order. Numbers stay numeric until `rows()` / `format_row()` at print time; a
+    non-numeric weight is kept as text in the parallel `weight_text` list.
+    """
+
+    __slots__ = ("files", "offsets", "weight_text") + SET_FIELDS
+
+    def __init__(self) -> None:
+        self.files: List[str] = []
+        self.offsets = array("l", [0])
+        self.weight_text: List[str | None] = []
+        for field in SET_FIELDS:
+            setattr(self, field, array("d"))
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def insert_session(self, fname: str, rows: List[SetRow]) -> None:
+        self.remove_session(fname)
+        pos = bisect.bisect_left(self.files, fname)
+        start = self.offsets[pos]
+        for field in SET_FIELDS:
+            values = (getattr(r, field) for r in rows)
+            getattr(self, field)[start:start] = array("d", (NAN if v is None else v for v in values))
+        self.weight_text[start:start] = [r.weight_text for r in rows]
+        self.files.insert(pos, fname)
+        self.offsets.insert(pos + 1, start)
+        for i in range(pos + 1, len(self.offsets)):
+            self.offsets[i] += len(rows)
+
+    def remove_session(self, fname: str) -> bool:
+        pos = bisect.bisect_left(self.files, fname)
+        if pos == len(self.files) or self.files[pos] != fname:
+            return False
+        start, end = self.offsets[pos], self.offsets[pos + 1]
+        for field in SET_FIELDS:
+            del getattr(self, field)[start:end]
+        del self.weight_text[start:end]
+        del self.files[pos]
+        del self.offsets[pos + 1]
+        for i in range(pos + 1, len(self.offsets)):
+            self.offsets[i] -= end - start
+        return True
+
+    def rows(self, session: int) -> List[SetRow]:
+        out: List[SetRow] = []
+        for i in range(self.offsets[session], self.offsets[session + 1]):
+            vals = [getattr(self, field)[i] for field in SET_FIELDS]
+            vals = [None if math.isnan(v) else v for v in vals]
+            set_num, angle = vals[4], vals[5]
+            out.append(SetRow(vals[0], vals[1], vals[2], vals[3],
+                              None if set_num is None else int(set_num),
+                              None if angle is None else int(angle), self.weight_text[i]))
+        return out
+
+    def sessions(self, last_n: int | None = None) -> List[Tuple[str, List[SetRow]]]:
+        start = 0 if last_n is None else max(0, len(self.files) - last_n)
+        return [(self.files[i], self.rows(i)) for i in range(start, len(self.files))]
+
+    def to_json(self) -> Dict[str, Any]:
+        raw: Dict[str, Any] = {"files": self.files, "offsets": list(self.offsets)}
+        for field in SET_FIELDS:
+            raw[field] = [None if math.isnan(v) else v for v in getattr(self, field)]
+        raw["weight_text"] = self.weight_text
+        return raw
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "SetStore":
+        store = cls()
+        store.files = list(raw["files"])
+        store.offsets = array("l", raw["offsets"])
+        for field in SET_FIELDS:
+            setattr(store, field, array("d", (NAN if v is None else v for v in raw[field])))
+        store.weight_text = list(raw["weight_text"])
+        return store
 
 
 def collect_perf1_entries(data: Dict[str, Any]) -> Dict[str, List[SetRow]]:
@@ -115,13 +257,14 @@ def collect_perf1_entries(data: Dict[str, Any]) -> Dict[str, List[SetRow]]:
         for s in sets_list:
             if not isinstance(s, dict):
                 continue
-            weight_str = format_weight(s.get("weight"), s.get("multiplier"))
             rows.append(SetRow(
-                weight=weight_str,
-                reps=s.get("reps"),
-                rpe=s.get("rpe"),
-                set=s.get("set"),
-                angle=parse_angle(s.get("angle"))
+                weight=_num(s.get("weight")),
+                multiplier=_num(s.get("multiplier")),
+                reps=_num(s.get("reps")),
+                rpe=_num(s.get("rpe")),
+                set=s.get("set") if isinstance(s.get("set"), int) else None,
+                angle=parse_angle(s.get("angle")),
+                weight_text=_text(s.get("weight"))
             ))
         if rows:
             angle_val = detect_angle_from_sets(sets_list)
@@ -148,14 +291,16 @@ def collect_perf2_entries(data: Dict[str, Any]) -> Dict[str, List[SetRow]]:
                 for set_entry in item["sets"]:
                     if not isinstance(set_entry, dict):
                         continue
-                    weight_str = format_weight(set_entry.get("weight"), set_entry.get("multiplier"))
                     angle_for_row = parse_angle(set_entry.get("angle"))
+                    set_num = set_entry.get("set")
                     result.setdefault(key, []).append(SetRow(
-                        weight=weight_str,
-                        reps=set_entry.get("reps"),
-                        rpe=set_entry.get("rpe"),
-                        set=set_entry.get("set"),
-                        angle=angle_for_row if angle_for_row is not None else angle_val
+                        weight=_num(set_entry.get("weight")),
+                        multiplier=_num(set_entry.get("multiplier")),
+                        reps=_num(set_entry.get("reps")),
+                        rpe=_num(set_entry.get("rpe")),
+                        set=set_num if isinstance(set_num, int) else None,
+                        angle=angle_for_row if angle_for_row is not None else angle_val,
+                        weight_text=_text(set_entry.get("weight"))
                     ))
             elif kind in {"superset", "circuit"} and isinstance(item.get("rounds"), list):
                 for round_entry in item["rounds"]:
@@ -169,35 +314,226 @@ def collect_perf2_entries(data: Dict[str, Any]) -> Dict[str, List[SetRow]]:
                             continue
                         angle_val = parse_angle(ex.get("angle"))
                         key = build_angle_key(slug, angle_val)
-                        weight_str = format_weight(ex.get("weight"), ex.get("multiplier"))
                         result.setdefault(key, []).append(SetRow(
-                            weight=weight_str,
-                            reps=ex.get("reps"),
-                            rpe=ex.get("rpe"),
-                            set=round_num,
-                            angle=angle_val
+                            weight=_num(ex.get("weight")),
+                            multiplier=_num(ex.get("multiplier")),
+                            reps=_num(ex.get("reps")),
+                            rpe=_num(ex.get("rpe")),
+                            set=round_num if isinstance(round_num, int) else None,
+                            angle=angle_val,
+                            weight_text=_text(ex.get("weight"))
                         ))
     return result
 
 
-def collect(repo_root: Path) -> Dict[str, List[Tuple[str, List[SetRow]]]]:
-    logs = sorted((repo_root / "performed").glob("*.json"))
-    out: Dict[str, List[Tuple[str, List[SetRow]]]] = {}
-    for path in logs:
+def entries_from_log(path: str, data: Any) -> Dict[str, List[SetRow]]:
+    """Normalize one parsed performed log into {slug_angle: rows} (runs inside ingest workers)."""
+    if not isinstance(data, dict):
+        return {}
+    if data.get("version") == "perf-2" or "sections" in data:
+        entries = collect_perf2_entries(data)
+    else:
+        entries = collect_perf1_entries(data)
+    return {key: rows for key, rows in entries.items() if rows}
+
+
+def ingest_entries(paths: Iterable[Path], jobs: int | None = None) -> List[Tuple[str, Dict[str, List[SetRow]]]]:
+    """Parse logs (in parallel for large batches); unreadable files yield no entries."""
+    return [
+        (os.path.basename(res.path), res.data if res.error is None else {})
+        for res in ingest(paths, normalize=entries_from_log, jobs=jobs)
+    ]
+
+
+History = Dict[str, SetStore]
+
+
+def collect(repo_root: Path, jobs: int | None = None) -> History:
+    logs = (repo_root / "performed").glob("*.json")
+    out: History = {}
+    for fname, entries in ingest_entries(logs, jobs):
+        for key, rows in entries.items():
+            out.setdefault(key, SetStore()).insert_session(fname, rows)
+    return out
+
+
+INDEX_VERSION = 3
+INDEX_PATH = Path(".cache") / "prescribe_loads_index.json"
+
+
+class HistoryIndex:
+    """
+    Persistent history index keyed by `slug_angle`.
+
+    The on-disk file remembers the mtime and size of every performed log it has ingested, so
+    `refresh()` only re-parses logs that are new or changed and drops logs that were deleted.
+    Each key maps to a `SetStore` whose sessions are kept in filename (i.e. timestamp) order.
+    """
+
+    def __init__(self, repo_root: Path, index_path: Path | None = None, jobs: int | None = None) -> None:
+        self.repo_root = repo_root
+        self.jobs = jobs
+        self.performed_dir = repo_root / "performed"
+        self.index_path = index_path or (repo_root / INDEX_PATH)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.keys: History = {}
+        self.dirty = False
+        self._lookup: KeyIndex | None = None
+
+    @property
+    def lookup(self) -> KeyIndex:
+        if self._lookup is None:
+            self._lookup = KeyIndex(self.keys)
+        return self._lookup
+
+    def load(self) -> "HistoryIndex":
+        try:
+            raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return self
+        if not isinstance(raw, dict) or raw.get("version") != INDEX_VERSION:
+            return self
+        self.files = raw.get("files") or {}
+        self.keys = {key: SetStore.from_json(store) for key, store in (raw.get("keys") or {}).items()}
+        return self
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        payload = {
+            "version": INDEX_VERSION,
+            "files": self.files,
+            "keys": {key: store.to_json() for key, store in self.keys.items()},
+        }
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+    def _drop_file(self, fname: str) -> None:
+        meta = self.files.pop(fname, None)
+        if not meta:
+            return
+        for key in meta.get("keys", []):
+            store = self.keys.get(key)
+            if store is None:
+                continue
+            store.remove_session(fname)
+            if not store:
+                del self.keys[key]
+        self.dirty = True
+
+    def _add_file(self, fname: str, entries: Dict[str, List[SetRow]], stat: os.stat_result) -> None:
+        for key, rows in entries.items():
+            self.keys.setdefault(key, SetStore()).insert_session(fname, rows)
+        self.files[fname] = {
+            "mtimeNs": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "keys": sorted(entries),
+        }
+        self.dirty = True
+
+    def refresh(self) -> bool:
+        """Bring the index in line with performed/; returns True when anything changed."""
+        seen: set[str] = set()
+        stale: Dict[str, os.stat_result] = {}
+        changed = False
+        try:
+            dir_entries = list(os.scandir(self.performed_dir))
+        except FileNotFoundError:
+            dir_entries = []
+        for entry in dir_entries:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            seen.add(entry.name)
+            stat = entry.stat()
+            meta = self.files.get(entry.name)
+            if meta and meta.get("mtimeNs") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+                continue
+            stale[entry.name] = stat
+        for fname, entries in ingest_entries((self.performed_dir / name for name in stale), self.jobs):
+            self._drop_file(fname)
+            self._add_file(fname, entries, stale[fname])
+            changed = True
+        for fname in [f for f in self.files if f not in seen]:
+            self._drop_file(fname)
+            changed = True
+        if changed:
+            self._lookup = None
+        return changed
+
+    def data(self) -> History:
+        return self.keys
+
+
+def load_history(repo_root: Path, use_index: bool = True, rebuild: bool = False,
+                 jobs: int | None = None) -> History:
+    if not use_index:
+        return collect(repo_root, jobs)
+    index = HistoryIndex(repo_root, jobs=jobs)
+    if not rebuild:
+        index.load()
+    index.refresh()
+    try:
+        index.save()
+    except OSError:
+        pass  # read-only checkout: the in-memory index is still valid for this run
+    return index.data()
+
+
+def collect_recent(repo_root: Path, requests: Iterable[Sequence[str]], n: int,
+                   angle_range: Tuple[int | None, int | None] = (None, None)) -> History:
+    """
+    Bounded newest-first retrieval for a few exercises.
+
+    `requests` holds one candidate-slug list per exercise, in the order print_history() tries
+    them. Walks performed logs from the newest timestamp-prefixed filename backwards, keeping at
+    most `n` sessions per matching key. An exercise is satisfied once its first candidate has
+    been seen (within `angle_range`) and every such angle variant found so far has `n`
+    sessions: print_history() then picks the same key as a full scan would. The walk stops when every exercise is satisfied or
+    the logs run out, so exercises with sparse (or no) history cost a full walk. Angle variants
+    that only appear in logs older than the stopping point are not surfaced; use the index
+    (default) when exhaustive history matters.
+    """
+    requests = [list(c) for c in requests if c]
+    wanted = {slug for candidates in requests for slug in candidates}
+    performed_dir = repo_root / "performed"
+    try:
+        names = sorted(e.name for e in os.scandir(performed_dir) if e.name.endswith(".json") and e.is_file())
+    except FileNotFoundError:
+        names = []
+    found: Dict[str, List[Tuple[str, List[SetRow]]]] = {}
+    variants: Dict[str, List[str]] = {}
+
+    def satisfied(candidates: List[str]) -> bool:
+        keys = KeyIndex(variants.get(candidates[0], ())).variants(candidates[0], *angle_range)
+        return bool(keys) and all(len(found[k]) >= n for k in keys)
+
+    for fname in reversed(names):
+        path = performed_dir / fname
         try:
             data = json.loads(path.read_text(encoding="utf-8"))
         except Exception:
             continue
-
-        if isinstance(data, dict) and (data.get("version") == "perf-2" or "sections" in data):
-            entries = collect_perf2_entries(data)
-        else:
-            entries = collect_perf1_entries(data)
-
-        for key, rows in entries.items():
-            if not rows:
+        for key, rows in entries_from_log(str(path), data).items():
+            slug = split_angle_key(key)[0]
+            if slug not in wanted:
                 continue
-            out.setdefault(key, []).append((path.name, rows))
+            if key not in found:
+                found[key] = []
+                variants.setdefault(slug, []).append(key)
+            bucket = found[key]
+            if len(bucket) < n:
+                bucket.append((fname, rows))
+        if requests and all(satisfied(c) for c in requests):
+            break
+
+    out: History = {}
+    for key, bucket in found.items():
+        store = out[key] = SetStore()
+        for fname, rows in bucket:
+            store.insert_session(fname, rows)
     return out
 
 
@@ -216,21 +552,369 @@ def describe_angle_suffix(key: str) -> str:
     return " (flat)"
 
 
-def matching_keys(data: Dict[str, Any], candidate: str) -> List[str]:
-    prefix = f"{candidate}_"
-    matches = [k for k in data if k == candidate or k.startswith(prefix)]
-    return sorted(matches)
+def split_angle_key(key: str) -> Tuple[str, int | None]:
+    """Split `slug_angle` into (slug, angle); keys without a numeric suffix return (key, None)."""
+    slug, sep, suffix = key.rpartition("_")
+    if sep:
+        try:
+            return slug, int(suffix)
+        except ValueError:
+            pass
+    return key, None
+
+
+class KeyIndex:
+    """
+    Precomputed lookup over `slug_angle` keys.
+
+    Keys are grouped per slug with their angles kept sorted, so "all angle variants of a slug"
+    is a dict hit and angle windows (e.g. incline 15–45°) are a bisect range. The full key list
+    is also kept sorted for prefix range scans.
+    """
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        self.sorted_keys: List[str] = sorted(keys)
+        self._by_slug: Dict[str, Tuple[List[int], List[str]]] = {}
+        self._bare: Dict[str, str] = {}
+        for key in self.sorted_keys:
+            slug, angle = split_angle_key(key)
+            if angle is None:
+                self._bare[key] = key
+                continue
+            angles, names = self._by_slug.setdefault(slug, ([], []))
+            pos = bisect.bisect_right(angles, angle)
+            angles.insert(pos, angle)
+            names.insert(pos, key)
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(self.sorted_keys, prefix)
+        hi = bisect.bisect_left(self.sorted_keys, prefix + "\uffff")
+        return self.sorted_keys[lo:hi]
+
+    def variants(self, slug: str, angle_min: int | None = None, angle_max: int | None = None) -> List[str]:
+        """All keys for `slug` (optionally limited to angle_min..angle_max inclusive), sorted."""
+        matches: List[str] = []
+        if slug in self._bare and angle_min is None and angle_max is None:
+            matches.append(slug)
+        group = self._by_slug.get(slug)
+        if group:
+            angles, names = group
+            lo = 0 if angle_min is None else bisect.bisect_left(angles, angle_min)
+            hi = len(angles) if angle_max is None else bisect.bisect_right(angles, angle_max)
+            matches.extend(names[lo:hi])
+        return sorted(matches)
+
+
+def parse_angle_range(text: str) -> Tuple[int | None, int | None]:
+    """Parse "15:45", "15:" or ":45" into inclusive angle bounds."""
+    lo, sep, hi = text.partition(":")
+    if not sep:
+        raise ValueError(f"angle range must look like MIN:MAX, got {text!r}")
+    return (int(lo) if lo.strip() else None, int(hi) if hi.strip() else None)
+
+
+def matching_keys(data: Dict[str, Any] | KeyIndex, candidate: str,
+                  angle_min: int | None = None, angle_max: int | None = None) -> List[str]:
+    lookup = data if isinstance(data, KeyIndex) else KeyIndex(data)
+    return lookup.variants(candidate, angle_min, angle_max)
+
+
+def format_row(r: SetRow) -> str:
+    parts = []
+    weight = format_weight(r.weight if r.weight is not None else r.weight_text, r.multiplier)
+    if weight:
+        parts.append(f"weight={weight}")
+    if r.reps is not None:
+        parts.append(f"reps={_fmt_num(r.reps)}")
+    if r.rpe is not None:
+        parts.append(f"rpe={_fmt_num(r.rpe)}")
+    if r.set is not None:
+        parts.append(f"set={r.set}")
+    if r.angle is not None:
+        parts.append(f"angle={r.angle}°")
+    return ", ".join(parts)
+
+
+def print_history(data: History, keys: List[str], n: int,
+                  lookup: KeyIndex | None = None, angle_range: Tuple[int | None, int | None] = (None, None),
+                  suggestions: Dict[str, Suggestion] | None = None) -> bool:
+    """Print history blocks for the first candidate key (in `keys` order) that has any data."""
+    lookup = lookup or KeyIndex(data)
+    seen: set[str] = set()
+    for base in keys:
+        matches = [k for k in lookup.variants(base, *angle_range) if k not in seen]
+        if not matches:
+            continue
+        for k in matches:
+            seen.add(k)
+            print(f"History for: {k}{describe_angle_suffix(k)}")
+            for fname, rows in data[k].sessions(n):
+                print(f"- {fname}")
+                for r in rows:
+                    print("  " + format_row(r))
+            if suggestions is not None and k in suggestions:
+                print(format_suggestion(suggestions[k]))
+            print()
+        return True
+    return False
+
+
+def session_exercises(session: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a session's sections/items (including superset/circuit children) into exercise nodes."""
+    found: List[Dict[str, Any]] = []
+
+    def walk(item: Any) -> None:
+        if not isinstance(item, dict):
+            return
+        if item.get("kind") == "exercise" and item.get("name"):
+            found.append(item)
+        for child in item.get("children") or []:
+            walk(child)
+
+    for section in session.get("sections") or []:
+        if isinstance(section, dict):
+            for item in section.get("items") or []:
+                walk(item)
+    return found
+
+
+def exercise_candidates(item: Dict[str, Any]) -> List[str]:
+    keys = canonical_keys_for(item["name"])
+    link = item.get("link")
+    if isinstance(link, str) and link.endswith(".json"):
+        for k in canonical_keys_for(Path(link).stem):
+            if k not in keys:
+                keys.append(k)
+    return keys
+
+
+def recent_requests(exercise: str | None, session_paths: List[str] | None) -> List[List[str]]:
+    """Candidate-slug lists (one per exercise, aliases included) a --recent lookup has to satisfy."""
+    requests: List[List[str]] = [canonical_keys_for(exercise)] if exercise else []
+    for raw in session_paths or []:
+        try:
+            session = json.loads(Path(raw).read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        for item in session_exercises(session):
+            requests.append(exercise_candidates(item))
+    return requests
+
+
+def prescribe_sessions(data: History, session_paths: List[str], n: int,
+                       suggestions: Dict[str, Suggestion] | None = None) -> bool:
+    """Print history for every exercise in each session, all served from one history scan."""
+    printed_any = False
+    lookup = KeyIndex(data)
+    for raw in session_paths:
+        path = Path(raw)
+        try:
+            session = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"=== {raw}: cannot read session ({e}) ===\n")
+            continue
+        print(f"=== Session: {raw} — {session.get('title', '')} ===\n")
+        done: set[str] = set()
+        missing: List[str] = []
+        for item in session_exercises(session):
+            keys = exercise_candidates(item)
+            if keys[0] in done:
+                continue
+            done.add(keys[0])
+            if print_history(data, keys, n, lookup, suggestions=suggestions):
+                printed_any = True
+            else:
+                missing.append(item["name"])
+        if missing:
+            print("No history: " + ", ".join(missing))
+            print()
+    return printed_any
+
+
+def dumbbell_slugs(repo_root: Path) -> set[str]:
+    """Slugs (file stem and name) of exercises whose equipment lists a dumbbell; only those snap to the dumbbell ladder."""
+    out: set[str] = set()
+    for path in (repo_root / "exercises").glob("*.json"):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        equipment = data.get("equipment") if isinstance(data, dict) else None
+        if not isinstance(equipment, list):
+            continue
+        if any(isinstance(e, str) and "dumbbell" in e.lower() and "optional" not in e.lower() for e in equipment):
+            out.add(path.stem.replace("_", "-"))
+            if isinstance(data.get("name"), str):
+                out.add(slugify(data["name"]))
+    return out
+
+
+def row_to_dict(r: SetRow) -> Dict[str, Any]:
+    raw = asdict(r)
+    text = raw.pop("weight_text")
+    if raw["weight"] is None:
+        raw["weight"] = text
+    return {k: int(v) if isinstance(v, float) and v.is_integer() else v for k, v in raw.items()}
+
+
+def _history_payload(index: HistoryIndex, key: str, n: int) -> Dict[str, Any]:
+    return {
+        "key": key,
+        "label": f"{key}{describe_angle_suffix(key)}",
+        "entries": [
+            {"file": fname, "sets": [row_to_dict(r) for r in rows]}
+            for fname, rows in index.keys[key].sessions(n)
+        ],
+    }
+
+
+def handle_query(index: HistoryIndex, query: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer one JSON-lines query against an in-memory history index."""
+    op = query.get("op", "lookup")
+    n = query.get("n", 3)
+    # JSON true/false arrive as bool, which is an int subclass (see _num)
+    if isinstance(n, bool) or not isinstance(n, int) or n < 1:
+        return {"ok": False, "error": "n must be a positive integer"}
+
+    if op == "ping":
+        return {"ok": True, "files": len(index.files), "keys": len(index.keys)}
+    if op == "list-keys":
+        prefix = query.get("prefix")
+        if isinstance(prefix, str) and prefix:
+            return {"ok": True, "keys": index.lookup.with_prefix(prefix)}
+        return {"ok": True, "keys": index.lookup.sorted_keys}
+    if op == "last":
+        key = query.get("key")
+        if not isinstance(key, str) or key not in index.keys:
+            return {"ok": False, "error": f"unknown key: {key!r}"}
+        return {"ok": True, "history": [_history_payload(index, key, n)]}
+    if op == "lookup":
+        name = query.get("exercise")
+        if not isinstance(name, str) or not name.strip():
+            return {"ok": False, "error": "lookup requires an 'exercise' name"}
+        angle_min, angle_max = query.get("angleMin"), query.get("angleMax")
+        for bound in (angle_min, angle_max):
+            if bound is not None and (isinstance(bound, bool) or not isinstance(bound, int)):
+                return {"ok": False, "error": "angleMin/angleMax must be integers"}
+        for base in canonical_keys_for(name):
+            matches = index.lookup.variants(base, angle_min, angle_max)
+            if matches:
+                return {"ok": True, "history": [_history_payload(index, k, n) for k in matches]}
+        return {"ok": True, "history": []}
+    return {"ok": False, "error": f"unknown op: {op!r}"}
+
+
+class QueryServer:
+    """
+    Resident prescription service: loads the history index once and answers newline-delimited
+    JSON queries. The index is refreshed (stat-only) before each query, so logs added to
+    performed/ are folded in without a restart.
+    """
+
+    def __init__(self, repo_root: Path, jobs: int | None = None) -> None:
+        self.index = HistoryIndex(repo_root, jobs=jobs).load()
+        self.lock = threading.Lock()
+        self._refresh()
+
+    def _refresh(self) -> None:
+        self.index.refresh()
+        try:
+            self.index.save()
+        except OSError:
+            pass
+
+    def answer(self, line: str) -> str:
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError("query must be a JSON object")
+        except ValueError as e:
+            return json.dumps({"ok": False, "error": f"bad request: {e}"}, ensure_ascii=False)
+        with self.lock:
+            self._refresh()
+            reply = handle_query(self.index, query)
+        if "id" in query:
+            reply["id"] = query["id"]
+        return json.dumps(reply, ensure_ascii=False)
+
+    def serve_stdio(self) -> None:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            sys.stdout.write(self.answer(line) + "\n")
+            sys.stdout.flush()
+
+    def serve_socket(self, socket_path: Path) -> None:
+        server_self = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for raw in self.rfile:
+                    line = raw.decode("utf-8").strip()
+                    if not line:
+                        continue
+                    self.wfile.write((server_self.answer(line) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+        if socket_path.exists():
+            socket_path.unlink()
+        with socketserver.ThreadingUnixStreamServer(str(socket_path), Handler) as server:
+            print(f"prescribe_loads: serving on {socket_path}", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                socket_path.unlink(missing_ok=True)
 
 
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--exercise", help="exercise name to look up", default=None)
+    ap.add_argument("--session", nargs="+", metavar="WORKOUT_JSON", default=None,
+                    help="print history for every exercise in one or more workouts/<file>.json sessions")
     ap.add_argument("--n", type=int, default=3, help="max logs to show per exercise")
+    ap.add_argument("--angle-range", default=None, metavar="MIN:MAX",
+                    help="only show angle variants within MIN..MAX degrees (e.g. 15:45 for incline)")
     ap.add_argument("--list-keys", action="store_true", help="list all normalized keys found")
+    ap.add_argument("--suggest", action="store_true",
+                    help="compute e1RM/trend-based load suggestions (for every key when no --exercise/--session)")
+    ap.add_argument("--target-rpe", type=float, default=TARGET_RPE, help="RPE the suggested load should land at")
+    ap.add_argument("--recent", action="store_true",
+                    help="read logs newest-first and stop once each matching key has --n sessions (no index)")
+    ap.add_argument("--no-index", action="store_true", help="scan every performed log instead of using the history index")
+    ap.add_argument("--rebuild-index", action="store_true", help="discard the history index and rebuild it from performed/")
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes for parsing logs (default: CPU count, 1 = serial)")
+    ap.add_argument("--serve", action="store_true", help="stay resident and answer JSON-lines queries on stdin/stdout")
+    ap.add_argument("--socket", type=Path, default=None, help="with --serve, listen on this Unix socket instead of stdio")
     args = ap.parse_args()
 
     repo_root = Path(__file__).resolve().parents[1]
-    data = collect(repo_root)
+
+    if args.serve:
+        server = QueryServer(repo_root, jobs=args.jobs)
+        if args.socket:
+            server.serve_socket(args.socket)
+        else:
+            server.serve_stdio()
+        return 0
+
+    if not args.list_keys and not args.suggest and not args.exercise and not args.session:
+        ap.error("--exercise NAME or --session FILE is required unless --list-keys or --suggest is used")
+
+    angle_range: Tuple[int | None, int | None] = (None, None)
+    if args.angle_range:
+        try:
+            angle_range = parse_angle_range(args.angle_range)
+        except ValueError as e:
+            ap.error(str(e))
+
+    if args.recent:
+        if args.list_keys or not (args.exercise or args.session):
+            ap.error("--recent needs --exercise or --session")
+        data = collect_recent(repo_root, recent_requests(args.exercise, args.session), args.n, angle_range)
+    else:
+        data = load_history(repo_root, use_index=not args.no_index, rebuild=args.rebuild_index, jobs=args.jobs)
 
     if args.list_keys:
         keys = sorted(data.keys())
@@ -238,45 +922,24 @@ def main() -> int:
             print(k)
         return 0
 
-    if not args.exercise:
-        ap.error("--exercise NAME is required unless --list-keys is used")
+    suggestions = None
+    if args.suggest:
+        suggestions = suggest(data, target_rpe=args.target_rpe, dumbbell_slugs=dumbbell_slugs(repo_root))
+    if suggestions is not None and not args.exercise and not args.session:
+        for k in sorted(suggestions):
+            print(f"{k}: {format_suggestion(suggestions[k])}")
+        return 0
 
-    keys = canonical_keys_for(args.exercise)
-    printed = False
-    seen: set[str] = set()
-    for base in keys:
-        matches = [k for k in matching_keys(data, base) if k not in seen]
-        if not matches:
-            continue
-        for k in matches:
-            seen.add(k)
-            print(f"History for: {k}{describe_angle_suffix(k)}")
-            entries = data[k][-args.n:]
-            for fname, rows in entries:
-                print(f"- {fname}")
-                for r in rows:
-                    parts = []
-                    if r.weight:
-                        parts.append(f"weight={r.weight}")
-                    if r.reps is not None:
-                        parts.append(f"reps={r.reps}")
-                    if r.rpe is not None:
-                        parts.append(f"rpe={r.rpe}")
-                    if r.set is not None:
-                        parts.append(f"set={r.set}")
-                    if r.angle is not None:
-                        parts.append(f"angle={r.angle}°")
-                    print("  " + ", ".join(parts))
-            print()
-        printed = True
-        if printed:
-            break
-    if not printed:
-        print("No history found for that exercise name. Try --list-keys to see available.")
+    if args.session:
+        printed = prescribe_sessions(data, args.session, args.n, suggestions)
     else:
+        printed = print_history(data, canonical_keys_for(args.exercise), args.n,
+                                angle_range=angle_range, suggestions=suggestions)
+        if not printed:
+            print("No history found for that exercise name. Try --list-keys to see available.")
+    if printed and suggestions is None:
         print("\nSuggestion: If RPE ≤ 8 and all reps completed last time, add +2.5–5 lb per hand (upper) or +5–10 lb (lower), or add reps within range.")
     return 0
 
-
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,202 @@
+"""
+Batched e1RM / progression-suggestion engine over prescribe_loads history.
+
+Works directly on the numeric `SetStore` arrays (one per `slug_angle` key) and computes, for every
+key in one pass:
+  - per-set estimated 1RM (Epley with reps-in-reserve from RPE: load * (1 + (reps + 10 - RPE) / 30)),
+  - best e1RM per session and a least-squares trend slope (lb per session) over the recent window,
+  - an RPE-adjusted load for the last session's working reps at the target RPE, snapped down to
+    the home dumbbell ladder for dumbbell keys and to a plain LOAD_INCREMENT step otherwise.
+
+NumPy is used when installed; otherwise an equivalent pure-Python path runs (same results).
+Loads are per hand for dumbbell work, matching how prescriptions are written ("35 x2 lb").
+"""
+from __future__ import annotations
+
+import bisect
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    from prescribe_loads import SetStore
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# Per-dumbbell increments available at home (see .github/instructions/kai.personal.instructions.md)
+AVAILABLE_LOADS: Tuple[float, ...] = (
+    5, 7.5, 10, 15, 17.5, 20, 25, 27.5, 30, 35, 37.5, 40, 45, 47.5, 50, 55, 57.5, 60, 65, 67.5, 70,
+)
+LOAD_INCREMENT = 2.5   # rounding step for everything that is not a dumbbell (barbell, kettlebell, vest...)
+DEFAULT_RPE = 8.0      # assumed when a set has no RPE logged
+TARGET_RPE = 8.0
+TREND_WINDOW = 6       # sessions used for the trend slope
+
+
+@dataclass(slots=True)
+class Suggestion:
+    key: str
+    sessions: int
+    last_file: str
+    last_load: float
+    multiplier: Optional[float]
+    last_reps: int
+    last_rpe: Optional[float]
+    e1rm: float
+    trend: Optional[float]   # e1RM change per session over the recent window
+    target_reps: int
+    target_load: float       # exact RPE-adjusted load
+    suggested_load: float    # snapped to AVAILABLE_LOADS or LOAD_INCREMENT (held at last load when trending down)
+
+
+def estimate_e1rm(load: float, reps: float, rpe: Optional[float]) -> float:
+    rir = 10.0 - (DEFAULT_RPE if rpe is None else rpe)
+    return load * (1.0 + (reps + max(rir, 0.0)) / 30.0)
+
+
+def load_for(e1rm: float, reps: int, rpe: float) -> float:
+    return e1rm / (1.0 + (reps + max(10.0 - rpe, 0.0)) / 30.0)
+
+
+def snap_down(load: float, available: Sequence[float] = AVAILABLE_LOADS) -> float:
+    """Largest available load not above `load` (the lightest one if `load` is below the range)."""
+    pos = bisect.bisect_right(available, load + 1e-9)
+    return float(available[max(pos - 1, 0)])
+
+
+def round_down(load: float, step: float = LOAD_INCREMENT) -> float:
+    """`load` rounded down to a multiple of `step` (never below 0)."""
+    return float(max(math.floor(load / step + 1e-9) * step, 0.0))
+
+
+def is_dumbbell_key(key: str, multiplier: Optional[float] = None) -> bool:
+    """Heuristic for keys without equipment info: the slug names dumbbells, or sets were logged per hand (x2)."""
+    slug = key.rsplit("_", 1)[0]
+    return bool({"dumbbell", "dumbbells", "db"} & set(slug.split("-"))) or multiplier == 2
+
+
+def _slope(ys: Sequence[float]) -> Optional[float]:
+    n = len(ys)
+    if n < 2:
+        return None
+    mean_x = (n - 1) / 2.0
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in range(n))
+    return sum((x - mean_x) * (y - mean_y) for x, y in enumerate(ys)) / sxx
+
+
+def _session_bests_python(history: Dict[str, SetStore]) -> Dict[str, List[float]]:
+    bests: Dict[str, List[float]] = {}
+    for key, store in history.items():
+        per_session: List[float] = []
+        for s in range(len(store)):
+            best = -math.inf
+            for i in range(store.offsets[s], store.offsets[s + 1]):
+                w, r, rpe = store.weight[i], store.reps[i], store.rpe[i]
+                if w > 0 and r > 0:  # NaN compares False, so unlogged sets drop out
+                    best = max(best, estimate_e1rm(w, r, None if math.isnan(rpe) else rpe))
+            per_session.append(best)
+        bests[key] = per_session
+    return bests
+
+
+def _session_bests_numpy(history: Dict[str, SetStore]) -> Dict[str, List[float]]:
+    keys = list(history)
+    stores = [history[k] for k in keys]
+    weight = np.concatenate([np.frombuffer(s.weight, dtype=np.float64) for s in stores])
+    reps = np.concatenate([np.frombuffer(s.reps, dtype=np.float64) for s in stores])
+    rpe = np.concatenate([np.frombuffer(s.rpe, dtype=np.float64) for s in stores])
+    if weight.size == 0:
+        return {k: [] for k in keys}
+
+    rir = np.clip(10.0 - np.where(np.isnan(rpe), DEFAULT_RPE, rpe), 0.0, None)
+    with np.errstate(invalid="ignore"):
+        valid = (weight > 0) & (reps > 0)
+    e1rm = np.where(valid, weight * (1.0 + (np.nan_to_num(reps) + rir) / 30.0), -np.inf)
+
+    # Global session start offsets: every store's offsets shifted by its row base
+    starts, base, n_sessions = [], 0, []
+    for s in stores:
+        starts.append(np.asarray(s.offsets, dtype=np.int64)[:-1] + base)
+        base += s.offsets[-1]
+        n_sessions.append(len(s))
+    session_best = np.maximum.reduceat(e1rm, np.concatenate(starts))
+
+    out: Dict[str, List[float]] = {}
+    pos = 0
+    for key, n in zip(keys, n_sessions):
+        out[key] = session_best[pos:pos + n].tolist()
+        pos += n
+    return out
+
+
+def session_bests(history: Dict[str, SetStore], use_numpy: Optional[bool] = None) -> Dict[str, List[float]]:
+    """Best e1RM per session for every key (-inf for sessions without a loaded set)."""
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is not None:
+        return _session_bests_numpy(history)
+    return _session_bests_python(history)
+
+
+def suggest(history: Dict[str, SetStore], target_rpe: float = TARGET_RPE,
+            use_numpy: Optional[bool] = None, dumbbell_slugs: Optional[Set[str]] = None) -> Dict[str, Suggestion]:
+    """
+    Compute a concrete load suggestion for every key that has at least one loaded session.
+
+    Only dumbbell keys snap to AVAILABLE_LOADS: slugs in `dumbbell_slugs` (e.g. from exercise
+    equipment lists) or keys is_dumbbell_key() recognizes. Everything else rounds down to LOAD_INCREMENT.
+    """
+    bests = session_bests(history, use_numpy)
+    out: Dict[str, Suggestion] = {}
+    for key, per_session in bests.items():
+        loaded = [i for i, b in enumerate(per_session) if b > -math.inf]
+        if not loaded:
+            continue
+        store = history[key]
+        last = loaded[-1]
+        lo, hi = store.offsets[last], store.offsets[last + 1]
+        top = max(
+            (i for i in range(lo, hi) if store.weight[i] > 0 and store.reps[i] > 0),
+            key=lambda i: estimate_e1rm(store.weight[i], store.reps[i],
+                                        None if math.isnan(store.rpe[i]) else store.rpe[i]),
+        )
+        working_reps = sorted(int(store.reps[i]) for i in range(lo, hi) if store.reps[i] > 0)
+        target_reps = working_reps[len(working_reps) // 2]
+        e1rm = per_session[last]
+        trend = _slope([per_session[i] for i in loaded[-TREND_WINDOW:]])
+        target_load = load_for(e1rm, target_reps, target_rpe)
+        last_load = store.weight[top]
+        rpe, multiplier = store.rpe[top], store.multiplier[top]
+        dumbbell = key.rsplit("_", 1)[0] in (dumbbell_slugs or ()) or is_dumbbell_key(key, multiplier)
+        suggested = snap_down(target_load) if dumbbell else round_down(target_load)
+        if trend is not None and trend < 0:
+            suggested = min(suggested, last_load)
+        out[key] = Suggestion(
+            key=key,
+            sessions=len(loaded),
+            last_file=store.files[last],
+            last_load=last_load,
+            multiplier=None if math.isnan(multiplier) else multiplier,
+            last_reps=int(store.reps[top]),
+            last_rpe=None if math.isnan(rpe) else rpe,
+            e1rm=round(e1rm, 1),
+            trend=None if trend is None else round(trend, 2),
+            target_reps=target_reps,
+            target_load=round(target_load, 1),
+            suggested_load=suggested,
+        )
+    return out
+
+
+def format_suggestion(sug: Suggestion) -> str:
+    def num(v: float) -> str:
+        return str(int(v)) if float(v).is_integer() else str(v)
+
+    hand = f" x{num(sug.multiplier)}" if sug.multiplier else ""
+    trend = "n/a" if sug.trend is None else f"{sug.trend:+.2f}/session"
+    return (f"Suggested next: {num(sug.suggested_load)}{hand} lb × {sug.target_reps} "
+            f"(last {num(sug.last_load)}{hand} × {sug.last_reps}, e1RM {num(sug.e1rm)}, trend {trend})")
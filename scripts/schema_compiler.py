@@ -0,0 +1,288 @@
+"""
+Compile the repo's JSON Schemas into plain Python validation functions.
+
+`compile_schema(schema)` turns a Draft 7 schema into the source of a module whose
+`is_valid(data)` answers "does this document validate?" with straight-line isinstance/dict/
+regex checks — one generated function per subschema, `$ref`s to `#/definitions/...` become
+direct calls — instead of jsonschema's generic keyword dispatch. Generated modules are
+cached under .cache/compiled_schemas/ keyed by the schema's content hash, so they are
+rebuilt only when a schema file changes.
+
+The compiled check is a fast path only: callers still ask jsonschema for the error messages
+of the (rare) invalid documents, so reports stay identical. Keywords outside the supported
+subset raise `UnsupportedSchema`; callers then keep using the generic validator. As with
+jsonschema's Draft7Validator without a format checker, `format` is not asserted.
+
+Usage (library):
+    from schema_compiler import load_compiled
+    is_valid = load_compiled(Path("schemas/performance.schema.json"))
+    if is_valid is not None and is_valid(doc):
+        ...
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Bump when the generated code changes shape; it is part of every cached module's key
+COMPILER_VERSION = 1
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "compiled_schemas"
+
+# Annotation-only keywords (and `format`, which Draft7Validator does not assert by default)
+IGNORED = {"$schema", "$id", "$comment", "title", "description", "default", "examples", "definitions", "format"}
+
+TYPE_CHECKS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "integer": "_is_integer({v})",
+}
+
+PRELUDE = '''\
+# Generated by scripts/schema_compiler.py -- do not edit.
+import re
+
+_MISSING = object()
+
+
+def _is_integer(v):
+    if isinstance(v, bool):
+        return False
+    return isinstance(v, int) or (isinstance(v, float) and v.is_integer())
+
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _unbool(v):
+    # JSON Schema equality keeps true/false distinct from 1/0
+    if v is True:
+        return _TRUE
+    if v is False:
+        return _FALSE
+    return v
+
+
+_TRUE, _FALSE = object(), object()
+
+
+def _equal(a, b):
+    if a is b:
+        return True
+    if isinstance(a, str) or isinstance(b, str):
+        return a == b
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[k], b[k]) for k in a)
+    return _unbool(a) == _unbool(b)
+'''
+
+
+class UnsupportedSchema(ValueError):
+    pass
+
+
+class _Compiler:
+    def __init__(self, root: Dict[str, Any]) -> None:
+        self.root = root
+        self.constants: List[str] = []
+        self.functions: List[str] = []
+        self.names: Dict[int, str] = {}
+
+    def const(self, expr: str) -> str:
+        name = f"_C{len(self.constants)}"
+        self.constants.append(f"{name} = {expr}")
+        return name
+
+    def resolve(self, ref: str) -> Any:
+        if not ref.startswith("#"):
+            raise UnsupportedSchema(f"external $ref {ref!r}")
+        node: Any = self.root
+        for part in [p for p in ref[1:].split("/") if p]:
+            part = part.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[int(part)] if isinstance(node, list) else node[part]
+            except (KeyError, IndexError, ValueError):
+                raise UnsupportedSchema(f"unresolvable $ref {ref!r}")
+        return node
+
+    def function(self, schema: Any) -> str:
+        """Name of the generated function validating `schema` (compiled once per subschema)."""
+        key = id(schema)
+        if key in self.names:
+            return self.names[key]
+        name = f"_v{len(self.names)}"
+        self.names[key] = name  # registered before compiling so recursive $refs terminate
+        body = self.body(schema)
+        self.functions.append("\n".join([f"def {name}(d):"] + [f"    {line}" for line in body] + ["    return True"]))
+        return name
+
+    def body(self, schema: Any) -> List[str]:
+        if schema is True or schema == {}:
+            return []
+        if schema is False:
+            return ["return False"]
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"schema must be an object or boolean, got {type(schema).__name__}")
+        if "$ref" in schema:
+            # Draft 7: keywords next to $ref are ignored
+            return [f"if not {self.function(self.resolve(schema['$ref']))}(d): return False"]
+
+        unknown = set(schema) - IGNORED - {
+            "type", "const", "enum", "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum",
+            "pattern", "minLength", "maxLength", "items", "minItems", "maxItems", "required", "properties",
+            "patternProperties", "additionalProperties", "allOf", "anyOf", "oneOf", "not", "if", "then", "else",
+        }
+        if unknown:
+            raise UnsupportedSchema(f"unsupported keywords: {sorted(unknown)}")
+
+        lines: List[str] = []
+        if "type" in schema:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            try:
+                checks = [TYPE_CHECKS[t].format(v="d") for t in types]
+            except KeyError as e:
+                raise UnsupportedSchema(f"unknown type {e}")
+            lines.append(f"if not ({' or '.join(checks)}): return False")
+        if "const" in schema:
+            lines.append(f"if not _equal(d, {self.const(repr(schema['const']))}): return False")
+        if "enum" in schema:
+            enum = self.const(repr(list(schema["enum"])))
+            lines.append(f"if not any(_equal(d, e) for e in {enum}): return False")
+
+        numeric = []
+        for key, op in (("minimum", "<"), ("maximum", ">"), ("exclusiveMinimum", "<="), ("exclusiveMaximum", ">=")):
+            if key in schema:
+                numeric.append(f"if d {op} {schema[key]!r}: return False")
+        if numeric:
+            lines.append("if _is_number(d):")
+            lines += [f"    {line}" for line in numeric]
+
+        string = []
+        if "pattern" in schema:
+            regex = self.const(f"re.compile({schema['pattern']!r})")
+            string.append(f"if not {regex}.search(d): return False")
+        if "minLength" in schema:
+            string.append(f"if len(d) < {int(schema['minLength'])}: return False")
+        if "maxLength" in schema:
+            string.append(f"if len(d) > {int(schema['maxLength'])}: return False")
+        if string:
+            lines.append("if isinstance(d, str):")
+            lines += [f"    {line}" for line in string]
+
+        array = []
+        if "minItems" in schema:
+            array.append(f"if len(d) < {int(schema['minItems'])}: return False")
+        if "maxItems" in schema:
+            array.append(f"if len(d) > {int(schema['maxItems'])}: return False")
+        items = schema.get("items", True)
+        if isinstance(items, list):
+            for i, sub in enumerate(items):
+                array.append(f"if len(d) > {i} and not {self.function(sub)}(d[{i}]): return False")
+        elif items is not True and items != {}:
+            array.append("for x in d:")
+            array.append(f"    if not {self.function(items)}(x): return False")
+        if array:
+            lines.append("if isinstance(d, list):")
+            lines += [f"    {line}" for line in array]
+
+        lines += self.object_checks(schema)
+
+        for sub in schema.get("allOf", []):
+            lines.append(f"if not {self.function(sub)}(d): return False")
+        if "anyOf" in schema:
+            calls = " or ".join(f"{self.function(sub)}(d)" for sub in schema["anyOf"])
+            lines.append(f"if not ({calls}): return False")
+        if "oneOf" in schema:
+            calls = ", ".join(f"{self.function(sub)}" for sub in schema["oneOf"])
+            lines.append(f"if sum(1 for f in ({calls},) if f(d)) != 1: return False")
+        if "not" in schema:
+            lines.append(f"if {self.function(schema['not'])}(d): return False")
+        if "if" in schema and ("then" in schema or "else" in schema):
+            cond = self.function(schema["if"])
+            then = self.function(schema.get("then", True))
+            other = self.function(schema.get("else", True))
+            lines.append(f"if not ({then}(d) if {cond}(d) else {other}(d)): return False")
+        return lines
+
+    def object_checks(self, schema: Dict[str, Any]) -> List[str]:
+        obj = []
+        if schema.get("required"):
+            obj.append(f"if not {self.const(repr(frozenset(schema['required'])))}.issubset(d): return False")
+        props = schema.get("properties", {})
+        for key, sub in props.items():
+            if sub is True or sub == {}:
+                continue
+            obj.append(f"v = d.get({key!r}, _MISSING)")
+            obj.append(f"if v is not _MISSING and not {self.function(sub)}(v): return False")
+        patterns = [(self.const(f"re.compile({pat!r})"), self.function(sub))
+                    for pat, sub in schema.get("patternProperties", {}).items()]
+        for regex, func in patterns:
+            obj.append("for k, v in d.items():")
+            obj.append(f"    if {regex}.search(k) and not {func}(v): return False")
+        additional = schema.get("additionalProperties", True)
+        if additional is not True and additional != {}:
+            known = self.const(repr(frozenset(props)))
+            extra = f"k not in {known}" + "".join(f" and not {regex}.search(k)" for regex, _ in patterns)
+            obj.append("for k, v in d.items():")
+            if additional is False:
+                obj.append(f"    if {extra}: return False")
+            else:
+                obj.append(f"    if {extra} and not {self.function(additional)}(v): return False")
+        if not obj:
+            return []
+        return ["if isinstance(d, dict):"] + [f"    {line}" for line in obj]
+
+
+def compile_schema(schema: Dict[str, Any]) -> str:
+    """Python source of a module exposing `is_valid(data) -> bool` for `schema`."""
+    compiler = _Compiler(schema)
+    entry = compiler.function(schema)
+    return "\n\n".join([PRELUDE, "\n".join(compiler.constants)] + compiler.functions
+                       + [f"is_valid = {entry}\n"])
+
+
+def _schema_key(schema_text: bytes) -> str:
+    return hashlib.sha256(schema_text + f"\0{COMPILER_VERSION}".encode()).hexdigest()[:16]
+
+
+def load_compiled(schema_path: Path, cache_dir: Path = CACHE_DIR) -> Optional[Callable[[Any], bool]]:
+    """
+    `is_valid` for the schema at `schema_path`, generating and caching the module when the
+    schema changed. Returns None when the schema uses keywords outside the compiled subset.
+    """
+    schema_text = Path(schema_path).read_bytes()
+    module_path = cache_dir / f"{Path(schema_path).name.split('.')[0]}_{_schema_key(schema_text)}.py"
+    if not module_path.exists():
+        try:
+            source = compile_schema(json.loads(schema_text))
+        except UnsupportedSchema:
+            return None
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            stem = module_path.stem.rsplit("_", 1)[0]
+            for stale in cache_dir.glob(f"{stem}_*.py"):
+                if re.fullmatch(rf"{re.escape(stem)}_[0-9a-f]{{16}}", stale.stem):
+                    stale.unlink()
+            tmp_path = module_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(source, encoding="utf-8")
+            os.replace(tmp_path, module_path)
+        except OSError:
+            # Read-only checkout: compile in memory for this run
+            namespace: Dict[str, Any] = {}
+            exec(compile(source, str(module_path), "exec"), namespace)
+            return namespace["is_valid"]
+    spec = importlib.util.spec_from_file_location(f"_compiled_{module_path.stem}", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.is_valid
@@ -7,13 +7,23 @@ Markdown link validator for exercAIse.
 - Exits with code 1 if any broken links are found; prints a summary.
 
 Usage:
-  python3 scripts/validate_links.py
+  python3 scripts/validate_links.py [--no-cache] [--jobs N]
+
+Targets are checked against a single snapshot of the repository file set (one directory
+walk) with memoized resolution; Markdown files are scanned in parallel.
+Results are cached per file content hash plus the existence of every link target
+(scripts/check_cache.py), so unchanged files are not re-scanned.
 """
 from __future__ import annotations
+import argparse
+import os
 import re
 import sys
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from check_cache import CheckCache, rules_digest
+from log_ingest import parallel_map
 
 LINK_PATTERN = re.compile(r"!?(?P<all>\[(?P<text>[^\]]+)\]\((?P<href>[^)]+)\))")
 
@@ -39,47 +49,175 @@ def find_markdown_files(root: Path) -> List[Path]:
     return files
 
 
-def validate_file(file_path: Path, repo_root: Path) -> List[Tuple[int, str, str]]:
+# Directories not snapshotted (VCS internals, installed packages); targets inside them are
+# checked with a direct filesystem call instead
+SNAPSHOT_PRUNE = {".git", "node_modules"}
+
+
+class RepoSnapshot:
     """
-    Returns list of (line_number, href, error_message) for broken links in a file.
+    One os.walk of the repository: the set of repo-relative file and directory paths.
+
+    Link targets are answered from the snapshot; `resolve()` memoizes each (directory, href)
+    pair, so a target referenced from hundreds of files is normalized once.
     """
-    problems: List[Tuple[int, str, str]] = []
-    try:
-        text = file_path.read_text(encoding="utf-8")
-    except Exception as e:
-        problems.append((0, str(file_path), f"cannot read file: {e}"))
-        return problems
 
+    def __init__(self, repo_root: Path) -> None:
+        self.repo_root = repo_root.resolve()
+        self.paths: Set[str] = {"."}
+        self.has_symlinks = False
+        self._resolved: Dict[Tuple[str, str], Tuple[Optional[str], bool]] = {}
+        root = str(self.repo_root)
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root)
+            if rel_dir == ".":
+                dirnames[:] = [d for d in dirnames if d not in SNAPSHOT_PRUNE]
+            for name in dirnames + filenames:
+                rel = name if rel_dir == "." else f"{rel_dir}{os.sep}{name}"
+                self.paths.add(rel)
+                if not self.has_symlinks and os.path.islink(os.path.join(dirpath, name)):
+                    self.has_symlinks = True
+
+    def exists(self, rel: str) -> bool:
+        first = rel.split(os.sep, 1)[0]
+        if first in SNAPSHOT_PRUNE:
+            return os.path.exists(self.repo_root / rel)
+        return rel in self.paths
+
+    def refresh(self, rels: Iterable[str]) -> None:
+        """Re-stat the given repo-relative paths (created or deleted since the walk)."""
+        for rel in rels:
+            if os.path.lexists(self.repo_root / rel):
+                while rel and rel not in self.paths:
+                    self.paths.add(rel)
+                    rel = os.path.dirname(rel)
+            else:
+                self.paths.discard(rel)
+        self._resolved.clear()
+
+    def resolve(self, base_dir: str, href: str) -> Tuple[Optional[str], bool]:
+        """(repo-relative target or None when it leaves the repo, exists) for `href` seen in `base_dir`."""
+        key = (base_dir, href)
+        hit = self._resolved.get(key)
+        if hit is not None:
+            return hit
+        if self.has_symlinks:
+            # Symlinks make lexical normalization unreliable; let the OS resolve them
+            target = str((self.repo_root / base_dir / href).resolve())
+        else:
+            target = os.path.normpath(os.path.join(str(self.repo_root), base_dir, href))
+        rel = os.path.relpath(target, self.repo_root)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            result: Tuple[Optional[str], bool] = (None, False)
+        else:
+            result = (rel, self.exists(rel))
+        self._resolved[key] = result
+        return result
+
+
+# Snapshots built for validate_file() callers that pass none, one per repository root
+_DEFAULT_SNAPSHOTS: Dict[Path, RepoSnapshot] = {}
+
+
+def default_snapshot(repo_root: Path) -> RepoSnapshot:
+    """
+    Shared snapshot of `repo_root`, walked on first use. It is not refreshed afterwards: callers
+    that create or delete files between calls should keep their own and call `refresh()`.
+    """
+    root = Path(repo_root).resolve()
+    snapshot = _DEFAULT_SNAPSHOTS.get(root)
+    if snapshot is None:
+        snapshot = _DEFAULT_SNAPSHOTS[root] = RepoSnapshot(root)
+    return snapshot
+
+
+def links_in_text(text: str) -> List[Tuple[int, str]]:
+    """[(line_number, href), ...] for the non-external links in Markdown `text`."""
+    links: List[Tuple[int, str]] = []
     for i, line in enumerate(text.splitlines(), start=1):
+        if "](" not in line:
+            continue
         for m in LINK_PATTERN.finditer(line):
             href = m.group("href").strip()
-            if is_external(href):
-                continue
-            # Resolve relative to the file's directory
-            target = (file_path.parent / href).resolve()
-            # Ensure target stays within repo
-            try:
-                in_repo = str(target).startswith(str(repo_root.resolve()))
-            except Exception:
-                in_repo = False
-            if not in_repo:
-                problems.append((i, href, "link resolves outside repository"))
-                continue
-            if not target.exists():
-                problems.append((i, href, "target does not exist"))
+            if not is_external(href):
+                links.append((i, href))
+    return links
+
+
+def extract_links(file_path: Path) -> Tuple[Optional[str], List[Tuple[int, str]]]:
+    """(read error, [(line_number, href), ...]) for the non-external links in one file."""
+    try:
+        text = file_path.read_text(encoding="utf-8")
+    except Exception as e:
+        return f"cannot read file: {e}", []
+    return None, links_in_text(text)
+
+
+def validate_file(file_path: Path, repo_root: Path, deps: Optional[Set[str]] = None,
+                  snapshot: Optional[RepoSnapshot] = None,
+                  links: Optional[Tuple[Optional[str], List[Tuple[int, str]]]] = None) -> List[Tuple[int, str, str]]:
+    """
+    Returns list of (line_number, href, error_message) for broken links in a file.
+    In-repo link targets whose existence was checked are added to `deps`. Without `snapshot`,
+    the shared default_snapshot(repo_root) is used, so looping over files walks the repo once.
+    """
+    snapshot = snapshot or default_snapshot(repo_root)
+    read_error, found = links if links is not None else extract_links(file_path)
+    if read_error is not None:
+        return [(0, str(file_path), read_error)]
+
+    problems: List[Tuple[int, str, str]] = []
+    # Resolve relative to the file's directory
+    base_dir = os.path.relpath(file_path.resolve().parent, snapshot.repo_root)
+    for i, href in found:
+        rel, exists = snapshot.resolve(base_dir, href)
+        # Ensure target stays within repo
+        if rel is None:
+            problems.append((i, href, "link resolves outside repository"))
+            continue
+        if deps is not None:
+            deps.add(rel)
+        if not exists:
+            problems.append((i, href, "target does not exist"))
     return problems
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate relative Markdown links.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every file (ignore .cache/check_links.json)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for scanning (default: CPU count)")
+    args = parser.parse_args()
+
     script_path = Path(__file__).resolve()
     repo_root = script_path.parents[1]
     md_files = find_markdown_files(repo_root)
     all_problems: List[Tuple[Path, List[Tuple[int, str, str]]]] = []
 
+    # One directory walk answers every existence question below
+    snapshot = RepoSnapshot(repo_root)
+
+    # Reuse results for unchanged files whose link targets neither appeared nor vanished
+    cache = CheckCache("links", repo_root, enabled=not args.no_cache, exists=snapshot.exists)
+    rules = rules_digest(script_path)
+    results: Dict[Path, List[Tuple[int, str, str]]] = {}
+    stale: List[Path] = []
+    for md in sorted(md_files):
+        cached = cache.lookup(md, rules)
+        if cached is None:
+            stale.append(md)
+        else:
+            results[md] = [tuple(p) for p in cached]
+
+    # Reading and regex-scanning files runs in parallel; resolution stays on the shared snapshot
+    for md, links in zip(stale, parallel_map(extract_links, stale, args.jobs) if stale else []):
+        deps: Set[str] = set()
+        results[md] = validate_file(md, repo_root, deps, snapshot, links)
+        cache.store(md, rules, results[md], deps)
+    cache.save()
+
     for md in sorted(md_files):
-        probs = validate_file(md, repo_root)
-        if probs:
-            all_problems.append((md, probs))
+        if results[md]:
+            all_problems.append((md, results[md]))
 
     if not all_problems:
         print("Markdown link check: OK (no broken links found)")
@@ -3,113 +3,193 @@
 Validate performance exports and JSON workout sessions against JSON Schemas.
 
 Usage:
-  python3 scripts/validate_schemas.py
+  python3 scripts/validate_schemas.py [--jobs N] [--no-cache] [--generic]
 
 Behavior:
-        - Validates all JSON files under performed/ against schemas/performance.schema.json (nested structure)
+        - Validates perf-1/perf-2 JSON files under performed/ against schemas/performance.schema.json (nested structure)
     - Validates any JSON files under workouts/ against schemas/session.schema.json
     - If a Markdown workout contains a trailing fenced JSON block (```json or ```json session-structure), validate that block against the session schema
+  - Files are split into work units and validated across a process pool; each worker compiles
+    its validators once and errors are reported in a stable (category, path) order.
+  - Schemas are compiled into specialized Python checks (scripts/schema_compiler.py, cached under
+    .cache/compiled_schemas/ and rebuilt when a schema changes); jsonschema only runs to report the
+    errors of invalid documents. --generic validates with jsonschema alone.
+  - Results are cached by file content hash + governing schema hash (scripts/check_cache.py), so
+    only changed files are re-validated; --no-cache forces a full run.
   - Exits non-zero on validation errors; prints a concise summary.
   - If jsonschema is not installed, prints a helpful message and exits 2.
 """
 
+import argparse
+import importlib.util
 import json
 import os
+import re
 import sys
 from glob import glob
+from pathlib import Path
+
+from check_cache import CheckCache, rules_digest
+from log_ingest import parallel_map
+from schema_compiler import load_compiled
 
 SCHEMA_DIR = os.path.join(os.path.dirname(__file__), '..', 'schemas')
 PERFORMANCE_SCHEMA_PATH = os.path.abspath(os.path.join(SCHEMA_DIR, 'performance.schema.json'))
 SESSION_SCHEMA_PATH = os.path.abspath(os.path.join(SCHEMA_DIR, 'session.schema.json'))
 EXERCISE_SCHEMA_PATH = os.path.abspath(os.path.join(SCHEMA_DIR, 'exercise.schema.json'))
 
+# Fenced JSON block in a Markdown workout: ```json\n...\n```  OR  ```json session-structure\n...\n```
+MD_JSON_BLOCK = re.compile(r"```json(?:[^\n]*)\n([\s\S]*?)\n```")
+
+SCHEMA_PATHS = {
+    'performance': PERFORMANCE_SCHEMA_PATH,
+    'session': SESSION_SCHEMA_PATH,
+    'exercise': EXERCISE_SCHEMA_PATH,
+}
+# Performed-log versions checked against the performance schema (older exports are skipped)
+VALIDATED_PERF_VERSIONS = {'perf-1', 'perf-2'}
+
+# Per-process validators, built once by init_worker() (in every pool worker, or in-process)
+_VALIDATORS = {}
+# Compiled fast-path checks (scripts/schema_compiler.py); kinds missing here use jsonschema only
+_COMPILED = {}
+
 
 def load_json(path):
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
-def main():
+def init_worker(use_compiled=True):
+    from jsonschema import Draft7Validator
+
+    for kind, schema_path in SCHEMA_PATHS.items():
+        # Schemas only use internal refs
+        _VALIDATORS[kind] = Draft7Validator(load_json(schema_path))
+        compiled = load_compiled(Path(schema_path)) if use_compiled else None
+        if compiled is not None:
+            _COMPILED[kind] = compiled
+        else:
+            _COMPILED.pop(kind, None)
+
+
+def schema_errors(kind, data):
+    """Messages for `data` against the `kind` schema; the compiled check short-circuits valid docs."""
+    compiled = _COMPILED.get(kind)
+    if compiled is not None and compiled(data):
+        return []
+    return [err.message for err in _VALIDATORS[kind].iter_errors(data)]
+
+
+def last_json_block(text):
+    """Body of the last fenced ```json block, or None."""
+    # Jump to the last opening fence instead of scanning the whole file; fall back to a full
+    # scan when that fence is never closed so an earlier complete block still counts.
+    start = text.rfind('```json')
+    if start < 0:
+        return None
+    m = MD_JSON_BLOCK.match(text, start)
+    if m:
+        return m.group(1)
+    blocks = MD_JSON_BLOCK.findall(text, 0, start + len('```json'))
+    return blocks[-1] if blocks else None
+
+
+def document_errors(kind, data):
+    """Schema messages for an already-parsed `kind` document (legacy performed logs are skipped)."""
+    # Skip legacy performed logs that predate the versioned formats (allow gradual migration)
+    if kind == 'performance' and (not isinstance(data, dict) or data.get('version') not in VALIDATED_PERF_VERSIONS):
+        return []
+    return schema_errors(kind, data)
+
+
+def markdown_errors(text):
+    """Messages for the trailing fenced JSON block of a Markdown workout (none when it has no block)."""
+    json_text = last_json_block(text)
+    if json_text is None:
+        return []
     try:
-        from jsonschema import Draft7Validator
-    except Exception:
-        print("Schema validation requires the 'jsonschema' package.\nInstall with: pip install jsonschema", file=sys.stderr)
-        sys.exit(2)
-
-    performance_schema = load_json(PERFORMANCE_SCHEMA_PATH)
-    session_schema = load_json(SESSION_SCHEMA_PATH)
-    exercise_schema = load_json(EXERCISE_SCHEMA_PATH)
+        data = json.loads(json_text)
+    except Exception as e:
+        return [f'Embedded JSON block invalid JSON: {e}']
+    return [f'Embedded JSON block: {msg}' for msg in schema_errors('session', data)]
 
-    # Prepare validators (schemas only use internal refs)
-    performance_validator = Draft7Validator(performance_schema)
-    session_validator = Draft7Validator(session_schema)
-    exercise_validator = Draft7Validator(exercise_schema)
 
-    errors = []
-
-    # Validate performance exports (perf-1)
-    perf_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'performed'))
-    perf_files = sorted(glob(os.path.join(perf_dir, '*.json')))
-    for path in perf_files:
-        try:
-            data = load_json(path)
-        except Exception as e:
-            errors.append((path, f'Invalid JSON: {e}'))
-            continue
-        # Skip legacy performed logs that are not perf-1 yet (allow gradual migration)
-        if data.get('version') != 'perf-1':
-            continue
-        for err in performance_validator.iter_errors(data):
-            errors.append((path, err.message))
-
-    # Validate JSON workouts (if any)
-    workouts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'workouts'))
-    workout_json_files = sorted(glob(os.path.join(workouts_dir, '*.json')))
-    for path in workout_json_files:
-        try:
-            data = load_json(path)
-        except Exception as e:
-            errors.append((path, f'Invalid JSON: {e}'))
-            continue
-        for err in session_validator.iter_errors(data):
-            errors.append((path, err.message))
-
-    # Validate embedded JSON blocks in Markdown workouts (if present)
-    # Validate exercises JSON
-    ex_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'exercises'))
-    ex_json = sorted(glob(os.path.join(ex_dir, '*.json')))
-    for path in ex_json:
-        try:
-            data = load_json(path)
-        except Exception as e:
-            errors.append((path, f'Invalid JSON: {e}'))
-            continue
-        for err in exercise_validator.iter_errors(data):
-            errors.append((path, err.message))
-    workout_md_files = sorted(glob(os.path.join(workouts_dir, '*.md')))
-    for path in workout_md_files:
+def validate_unit(unit):
+    """Validate one (kind, path) work unit; returns [(path, message), ...]."""
+    kind, path = unit
+    if kind == 'markdown':
         try:
-            text = ''
             with open(path, 'r', encoding='utf-8') as f:
                 text = f.read()
         except Exception as e:
-            errors.append((path, f'Cannot read: {e}'))
-            continue
-        # Find last fenced code block labeled json (optionally with a label)
-        # Patterns: ```json\n...\n```  OR  ```json session-structure\n...\n```
-        import re
-        blocks = list(re.finditer(r"```json(?:[^\n]*)\n([\s\S]*?)\n```", text))
-        if not blocks:
-            continue
-        block = blocks[-1]
-        json_text = block.group(1)
-        try:
-            data = json.loads(json_text)
-        except Exception as e:
-            errors.append((path, f'Embedded JSON block invalid JSON: {e}'))
-            continue
-        for err in session_validator.iter_errors(data):
-            errors.append((path, f'Embedded JSON block: {err.message}'))
+            return [(path, f'Cannot read: {e}')]
+        return [(path, msg) for msg in markdown_errors(text)]
+
+    try:
+        data = load_json(path)
+    except Exception as e:
+        return [(path, f'Invalid JSON: {e}')]
+    return [(path, msg) for msg in document_errors(kind, data)]
+
+
+def work_units(root):
+    """All (kind, path) units in reporting order: performed, workouts, exercises, markdown."""
+    def files(sub, pattern):
+        return sorted(glob(os.path.join(root, sub, pattern)))
+
+    return ([('performance', p) for p in files('performed', '*.json')]
+            + [('session', p) for p in files('workouts', '*.json')]
+            + [('exercise', p) for p in files('exercises', '*.json')]
+            + [('markdown', p) for p in files('workouts', '*.md')])
+
+
+def unit_rules():
+    """Rule-set hash per work-unit kind: the governing schema plus this script's own logic."""
+    script = Path(__file__)
+    return {
+        'performance': rules_digest(Path(PERFORMANCE_SCHEMA_PATH), script),
+        'session': rules_digest(Path(SESSION_SCHEMA_PATH), script),
+        'exercise': rules_digest(Path(EXERCISE_SCHEMA_PATH), script),
+        'markdown': rules_digest(Path(SESSION_SCHEMA_PATH), script),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate repo JSON against the JSON Schemas.')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count, 1 = serial)')
+    parser.add_argument('--no-cache', action='store_true', help='re-validate every file (ignore .cache/check_schemas.json)')
+    parser.add_argument('--generic', action='store_true',
+                        help='validate with jsonschema only (skip the compiled fast-path validators)')
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('jsonschema') is None:
+        print("Schema validation requires the 'jsonschema' package.\nInstall with: pip install jsonschema", file=sys.stderr)
+        sys.exit(2)
+
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    units = work_units(root)
+
+    # Unchanged files whose governing schema is unchanged reuse their cached result
+    cache = CheckCache('schemas', root, enabled=not args.no_cache)
+    rules = unit_rules()
+    results = {unit: cache.lookup(unit[1], rules[unit[0]]) for unit in units}
+    stale = [unit for unit, cached in results.items() if cached is None]
+
+    # Workers build their validators once; results come back in unit order, so errors are stable
+    checked = []
+    if stale:
+        if not args.generic:
+            # Generate/refresh the compiled modules once, before any worker starts
+            for schema_path in SCHEMA_PATHS.values():
+                load_compiled(Path(schema_path))
+        checked = parallel_map(validate_unit, stale, args.jobs, initializer=init_worker,
+                               initargs=(not args.generic,))
+    for unit, unit_errors in zip(stale, checked):
+        results[unit] = [msg for _, msg in unit_errors]
+        cache.store(unit[1], rules[unit[0]], results[unit])
+    cache.save()
+    errors = [(unit[1], msg) for unit in units for msg in results[unit]]
 
     if errors:
         print('Schema validation FAILED:')
@@ -118,7 +198,7 @@ def main():
         sys.exit(1)
     else:
         print('Schema validation OK (no issues found).')
-        if not perf_files and not workout_json_files:
+        if not any(kind in ('performance', 'session') for kind, _ in units):
             print('(No JSON files found under performed/ or workouts/ to validate.)')
 
 
@@ -0,0 +1,21 @@
+"""Small builders for performed-log fixtures."""
+
+
+def perf2_log(*items, title='Main Work'):
+    """Minimal perf-2 log with one section holding `items`."""
+    return {
+        'version': 'perf-2',
+        'workoutFile': 'workouts/1-1_Test.json',
+        'timestamp': '2025-01-01T12:00:00Z',
+        'sections': [{'type': 'Main Work', 'title': title, 'items': list(items)}],
+    }
+
+
+def exercise(name, *sets):
+    """perf-2 standalone exercise item; each set is a (weight, reps, rpe) tuple or a dict."""
+    return {
+        'kind': 'exercise',
+        'name': name,
+        'sets': [s if isinstance(s, dict) else {'set': i + 1, 'weight': s[0], 'reps': s[1], 'rpe': s[2]}
+                 for i, s in enumerate(sets)],
+    }
@@ -0,0 +1,32 @@
+"""
+Shared fixtures for the Python tooling tests (scripts/*.py).
+
+The scripts import each other as top-level modules (they are run as `python3 scripts/x.py`),
+so scripts/ is put on sys.path here. `repo` is an empty repository layout in a temp directory;
+`write_json` drops a JSON file into it; log builders live in builders.py.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for sub in ('performed', 'workouts', 'exercises'):
+        (tmp_path / sub).mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def write_json():
+    def write(path, data):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+        return path
+    return write
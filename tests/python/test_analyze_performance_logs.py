@@ -0,0 +1,226 @@
+import copy
+import json
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from analyze_performance_logs import RollupStore, index_is_complete, load_manifest, parse_log_name, session_summaries
+from builders import exercise, perf2_log
+from exercise_index import build_exercise_index
+
+ROOT = Path(__file__).resolve().parents[2]
+SCRIPT = ROOT / 'scripts' / 'analyze_performance_logs.py'
+
+
+def without_index(log):
+    return {k: v for k, v in log.items() if k != 'exerciseIndex'}
+
+
+@pytest.fixture
+def log():
+    superset = {
+        'kind': 'superset', 'name': 'A',
+        'rounds': [
+            {'round': 1, 'exercises': [{'key': 'renegade-row', 'name': 'Renegade Row', 'weight': 30, 'reps': 8, 'rpe': 7},
+                                       {'key': 'push-up', 'name': 'Push-Up', 'reps': 12, 'rpe': 8}]},
+            {'round': 2, 'exercises': [{'key': 'renegade-row', 'name': 'Renegade Row', 'weight': 30, 'reps': 8, 'rpe': 8.5},
+                                       {'key': 'push-up', 'name': 'Push-Up', 'reps': 10}]},
+        ],
+    }
+    data = perf2_log(exercise('Goblet Squat', (40, 10, 7), (45, 10, 7.5), (45, 9, 8)), superset)
+    data['exerciseIndex'] = build_exercise_index(data['sections'])
+    return data
+
+
+def test_complete_index_matches_per_set_totals(log):
+    assert index_is_complete(log, log['exerciseIndex'])
+    assert session_summaries(log) == session_summaries(without_index(log))
+
+
+def test_repeated_exercise_is_not_undercounted(log):
+    # Same key twice: the index keeps only the later item
+    log['sections'][0]['items'].append(exercise('Goblet Squat', (40, 10, 7), (40, 10, 7), (40, 10, 7)))
+    log['exerciseIndex'] = build_exercise_index(log['sections'])
+    assert not index_is_complete(log, log['exerciseIndex'])
+    squat = session_summaries(log)['Goblet Squat']
+    assert squat['sets'] == 6
+    assert squat['volume'] == 40 * 10 + 45 * 10 + 45 * 9 + 3 * 400
+
+
+def test_legacy_rounded_index_is_not_trusted(log):
+    legacy = copy.deepcopy(log['exerciseIndex'])
+    for summ in legacy.values():
+        del summ['angle']
+        summ['avgRPE'] = round(summ['avgRPE'], 1)
+    log['exerciseIndex'] = {key.rsplit('_', 1)[0]: summ for key, summ in legacy.items()}
+    assert not index_is_complete(log, log['exerciseIndex'])
+    assert session_summaries(log)['Goblet Squat']['avg_rpe'] == 7.5
+
+
+def test_renamed_item_makes_index_stale(log):
+    log['sections'][0]['items'][0]['name'] = 'Heels-Elevated Goblet Squat'
+    assert not index_is_complete(log, log['exerciseIndex'])
+    assert 'Heels-Elevated Goblet Squat' in session_summaries(log)
+
+
+def test_per_set_avg_rpe_counts_missing_as_logged_sets():
+    data = perf2_log(exercise('Curl', (20, 10, 7), (20, 10, 8), {'set': 3, 'weight': 20, 'reps': 10}))
+    assert session_summaries(data)['Curl'] == {'sets': 3, 'volume': 600, 'avg_rpe': 5.0}
+
+
+# --- CLI flag combinations ----------------------------------------------------------------
+
+def run_cli(*args):
+    return subprocess.run([sys.executable, str(SCRIPT), *args], capture_output=True, text=True, cwd=ROOT)
+
+
+@pytest.mark.parametrize('flags', [
+    ['--rollup', '--window', '2025-09-01:2025-09-30'],
+    ['--rollup', '4', '--every-block-week'],
+])
+def test_rollup_rejects_window_modes(flags):
+    result = run_cli(*flags)
+    assert result.returncode == 2
+    assert '--rollup cannot be combined' in result.stderr
+    assert 'Traceback' not in result.stderr
+
+
+def test_window_and_every_block_week_combine():
+    result = run_cli('--window', '2025-09-01:2025-09-30', '--every-block-week', '--no-records', '--compact')
+    assert result.returncode == 0, result.stderr
+    windows = json.loads(result.stdout)
+    assert windows[0]['period'] == '2025-09-01 to 2025-09-30'
+    assert all('block_week' in w for w in windows[1:])
+
+
+def test_ndjson_labels_every_window_line():
+    result = run_cli('--window', '2025-09-01:2025-09-07', '--window', '2025-09-08:2025-09-14', '--ndjson', '--no-records')
+    assert result.returncode == 0, result.stderr
+    labels = {json.loads(line)['window'] for line in result.stdout.splitlines()}
+    assert labels == {'2025-09-01 to 2025-09-07', '2025-09-08 to 2025-09-14'}
+
+
+def perf2_at(stamp, *items):
+    data = perf2_log(*items)
+    data['timestamp'] = stamp
+    return data
+
+
+@pytest.fixture
+def rollup_repo(repo, write_json):
+    performed = repo / 'performed'
+    write_json(performed / '2025-01-06T120000_1-1_Legs.json',
+               perf2_at('2025-01-06T12:00:00Z', exercise('Goblet Squat', (40, 10, 7), (40, 10, 8))))
+    write_json(performed / '2025-01-08T120000_1-1_Legs.json',
+               perf2_at('2025-01-08T12:00:00Z', exercise('Goblet Squat', (45, 10, 8))))
+    write_json(performed / '2025-01-13T120000_1-2_Legs.json',
+               perf2_at('2025-01-13T12:00:00Z', exercise('Goblet Squat', (50, 8, 8))))
+    return repo
+
+
+def fresh(repo):
+    return RollupStore(repo, store_path=repo / 'rollups.json', jobs=1)
+
+
+def cached(repo):
+    store = RollupStore(repo, store_path=repo / 'rollups.json', jobs=1).load()
+    return store, store.refresh()
+
+
+def test_rollup_refresh_matches_rebuild_after_edit(rollup_repo, write_json):
+    store = fresh(rollup_repo)
+    store.refresh()
+    store.save()
+
+    write_json(rollup_repo / 'performed' / '2025-01-08T120000_1-1_Legs.json',
+               perf2_at('2025-01-08T12:00:00Z', exercise('Goblet Squat', (45, 10, 8), (45, 10, 9))))
+    store, affected = cached(rollup_repo)
+    rebuilt = fresh(rollup_repo)
+    rebuilt.refresh()
+
+    assert affected == ['1-1']
+    assert store.weeks == rebuilt.weeks
+    assert store.weeks['1-1']['exercises']['Goblet Squat']['sets'] == 4
+
+
+def test_rollup_refresh_drops_deleted_logs(rollup_repo):
+    store = fresh(rollup_repo)
+    store.refresh()
+    store.save()
+
+    (rollup_repo / 'performed' / '2025-01-13T120000_1-2_Legs.json').unlink()
+    store, affected = cached(rollup_repo)
+
+    assert affected == ['1-2']
+    assert '1-2' not in store.weeks
+    assert store.combine()['total_sessions'] == 2
+
+
+def test_rollup_unchanged_logs_are_not_reread(rollup_repo):
+    store = fresh(rollup_repo)
+    store.refresh()
+    store.save()
+
+    store, affected = cached(rollup_repo)
+    assert affected == []
+    assert not store.dirty
+
+
+def test_rollups_include_archive_once(rollup_repo, write_json):
+    archive = rollup_repo / 'performed' / 'archive'
+    # perf-1 original of a migrated top-level log: the top-level copy wins
+    write_json(archive / '2025-01-06T120000_1-1_Legs_perf1.json', {'exercises': {}})
+    # a session that only survives in the archive
+    write_json(archive / '2024-12-30T120000_0-4_Legs.json',
+               perf2_at('2024-12-30T12:00:00Z', exercise('Goblet Squat', (35, 10, 7))))
+
+    store = fresh(rollup_repo)
+    store.refresh()
+
+    assert sorted(store.files) == [
+        '2025-01-06T120000_1-1_Legs.json', '2025-01-08T120000_1-1_Legs.json',
+        '2025-01-13T120000_1-2_Legs.json', 'archive/2024-12-30T120000_0-4_Legs.json',
+    ]
+    assert store.combine()['total_sessions'] == 4
+
+
+LOG_NAMES = [
+    '2025-09-01T13-14-40.971Z_2-4_Upper_Body_Strength_Mobility_perf2.json',
+    '2025-09-23T130123_3-3_Lower_Body_Strength_Calves_perf2.json',
+    '2025-11-22T174032_5-3_Optional_Easy_Run.json',
+    '2025-10-01T08-00-00Z_workouts-12-3_Long_Run.json',
+    '2025-10-02T080000.5Z_Untitled.json',
+    '2025-10-03T080000_4-2.json',
+    '2025-10-04T080000_4-2b_Not_A_Week.json',
+    'notes.json',
+]
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_node_manifest_fields_match_log_name(tmp_path):
+    (tmp_path / 'scripts').mkdir()
+    shutil.copy(ROOT / 'scripts' / 'build_performed_index.js', tmp_path / 'scripts')
+    names = sorted(set(LOG_NAMES) | {p.name for p in (ROOT / 'performed').glob('*.json') if p.name != 'index.json'})
+    (tmp_path / 'performed').mkdir()
+    for name in names:
+        (tmp_path / 'performed' / name).write_text('{}', encoding='utf-8')
+    subprocess.run(['node', str(tmp_path / 'scripts' / 'build_performed_index.js')], check=True,
+                   capture_output=True)
+    files = json.loads((tmp_path / 'performed' / 'index.json').read_text(encoding='utf-8'))['files']
+
+    assert sorted(f['name'] for f in files) == sorted(names)
+    for entry in files:
+        parsed = parse_log_name(entry['name'])
+        if parsed is None:
+            assert 'timestamp' not in entry, entry
+            continue
+        timestamp, block, week = parsed
+        assert datetime.fromisoformat(entry['timestamp']) == timestamp, entry
+        assert (entry.get('block'), entry.get('week')) == (block, week), entry
+    # load_manifest reads those fields instead of re-parsing, and must land on the same entries
+    by_name = {e.name: e[1:] for e in load_manifest(tmp_path / 'performed')}
+    assert by_name == {n: parse_log_name(n) for n in names if parse_log_name(n)}
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import calculate_session_time as cst
+
+
+def workout(sets=3):
+    return {'title': 'Legs', 'sections': [{'type': 'Main Work', 'title': 'Main', 'items': [
+        {'kind': 'exercise', 'name': 'Goblet Squat', 'prescription': {'sets': sets, 'reps': 10, 'restSeconds': 90}}]}]}
+
+
+@pytest.fixture
+def files(repo, write_json, monkeypatch):
+    monkeypatch.setattr(cst, 'CACHE_PATH', repo / '.cache' / 'session_time.json')
+    paths = [write_json(repo / 'workouts' / '1-1_Legs.json', workout()),
+             write_json(repo / 'workouts' / '1-2_Legs.json', workout(sets=4))]
+    cst.estimate_files(paths, jobs=1)
+    return paths
+
+
+def estimate(paths):
+    return cst.estimate_files(paths, jobs=1)
+
+
+def stored():
+    return json.loads(cst.CACHE_PATH.read_text(encoding='utf-8'))['entries']
+
+
+def test_unchanged_files_come_from_the_cache(files, monkeypatch):
+    expected = cst.estimate_files(files, use_cache=False, jobs=1)
+    reread = []
+    monkeypatch.setattr(cst, 'ingest', lambda paths, **k: reread.extend(paths) or [])
+    assert estimate(files) == expected
+    assert reread == []
+
+
+def test_edited_file_is_re_estimated(files, write_json):
+    before = estimate(files)
+    write_json(files[0], workout(sets=5))
+    after = estimate(files)
+    assert after[0]['totalSeconds'] > before[0]['totalSeconds']
+    assert after == cst.estimate_files(files, use_cache=False, jobs=1)
+    # the entry for the old content is dropped
+    assert len(stored()) == 2
+
+
+def test_rule_change_discards_the_cache(files, monkeypatch):
+    before = estimate(files)
+    monkeypatch.setattr(cst, 'DEFAULT_ACTIVE_SECONDS', dict(cst.DEFAULT_ACTIVE_SECONDS, strength=999))
+    after = estimate(files)
+    assert after == cst.estimate_files(files, use_cache=False, jobs=1)
+    assert after != before
@@ -0,0 +1,163 @@
+import itertools
+import shutil
+
+import pytest
+
+import check
+import file_watch
+from check import Checker
+from check_cache import CheckCache
+from file_watch import Watcher
+from validate_links import RepoSnapshot
+
+
+def session(*links):
+    return {'title': 'Test', 'sections': [{'type': 'Main', 'title': 'Main', 'items': [
+        {'kind': 'exercise', 'name': link, 'link': f'exercises/{link}.json', 'logType': 'strength'}
+        for link in links]}]}
+
+
+@pytest.fixture
+def tree(repo, write_json):
+    write_json(repo / 'exercises' / 'goblet_squat.json', {'name': 'Goblet Squat'})
+    write_json(repo / 'workouts' / '1-1_Legs.json', session('goblet_squat'))
+    write_json(repo / 'workouts' / '1-2_Legs.json', session('goblet_squat', 'curl'))
+    write_json(repo / 'workouts' / '1-3_Arms.json', session('curl'))
+    (repo / 'README.md').write_text('[squat](exercises/goblet_squat.json)\n', encoding='utf-8')
+    return repo
+
+
+def checker_for(repo):
+    snapshot = RepoSnapshot(repo)
+    cache = CheckCache('all', repo, exists=snapshot.exists)
+    checker = Checker(['lint', 'links'], snapshot, cache, use_compiled=False)
+    checker.run(checker.units, jobs=1)
+    return checker
+
+
+def errors(checker, rel):
+    return [msg for _, msg in checker.results[rel]]
+
+
+def test_first_run_reports_missing_exercise(tree):
+    checker = checker_for(tree)
+    assert errors(checker, 'workouts/1-1_Legs.json') == []
+    assert errors(checker, 'workouts/1-3_Arms.json') == [
+        "workouts/1-3_Arms.json: Exercise JSON not found for 'curl': exercises/curl.json"]
+    assert errors(checker, 'README.md') == []
+
+
+def test_content_edit_rechecks_only_that_file(tree, write_json):
+    checker = checker_for(tree)
+    write_json(tree / 'workouts' / '1-1_Legs.json', dict(session('goblet_squat'), title='Edited'))
+    write_json(tree / 'exercises' / 'goblet_squat.json', {'name': 'Goblet Squat', 'edited': True})
+    # Only the lint/link units for the saved files; the exercise's content is read by no rule
+    assert checker.update({'workouts/1-1_Legs.json', 'exercises/goblet_squat.json'}) == ['workouts/1-1_Legs.json']
+
+
+def test_created_file_rechecks_its_dependents(tree, write_json):
+    checker = checker_for(tree)
+    write_json(tree / 'exercises' / 'curl.json', {'name': 'Curl'})
+    assert checker.update({'exercises/curl.json'}) == ['workouts/1-2_Legs.json', 'workouts/1-3_Arms.json']
+    assert errors(checker, 'workouts/1-3_Arms.json') == []
+
+
+def test_deleted_file_rechecks_its_dependents(tree):
+    checker = checker_for(tree)
+    (tree / 'exercises' / 'goblet_squat.json').unlink()
+    assert checker.update({'exercises/goblet_squat.json'}) == [
+        'README.md', 'workouts/1-1_Legs.json', 'workouts/1-2_Legs.json']
+    assert errors(checker, 'README.md') == [
+        'README.md L1: exercises/goblet_squat.json -> target does not exist']
+    assert errors(checker, 'workouts/1-1_Legs.json') == [
+        "workouts/1-1_Legs.json: Exercise JSON not found for 'goblet_squat': exercises/goblet_squat.json"]
+
+
+def test_new_session_file_is_checked(tree, write_json):
+    checker = checker_for(tree)
+    write_json(tree / 'workouts' / '1-4_Legs.json', session('lunge'))
+    assert checker.update({'workouts/1-4_Legs.json'}) == ['workouts/1-4_Legs.json']
+    assert [rel for rel, _ in checker.units if rel == 'workouts/1-4_Legs.json']
+
+
+@pytest.fixture
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(file_watch, 'POLL_INTERVAL', 0.01)
+
+
+def edit_tree(tree, write_json):
+    write_json(tree / 'exercises' / 'curl.json', {'name': 'Curl'})                       # create
+    write_json(tree / 'workouts' / '1-1_Legs.json', session('goblet_squat', 'curl'))     # modify
+    (tree / 'workouts' / '1-3_Arms.json').unlink()                                      # delete
+    (tree / 'README.md').write_text('edited\n', encoding='utf-8')                       # top-level file
+    (tree / 'notes.txt').write_text('not watched\n', encoding='utf-8')
+
+
+EXPECTED = {'exercises/curl.json', 'workouts/1-1_Legs.json', 'workouts/1-3_Arms.json', 'README.md'}
+
+
+def test_polling_watcher_batches_create_modify_delete(tree, write_json, fast_poll):
+    watcher = Watcher(tree, ['workouts', 'exercises'], ['README.md'], force_poll=True)
+    assert watcher.backend == 'polling'
+    batches = iter(watcher)
+    edit_tree(tree, write_json)
+    assert next(batches) == EXPECTED
+
+    (tree / 'exercises' / 'curl.json').unlink()
+    assert next(batches) == {'exercises/curl.json'}
+
+
+def test_inotify_watcher_batches_create_modify_delete(tree, write_json):
+    watcher = Watcher(tree, ['workouts', 'exercises'], ['README.md'])
+    if watcher.backend != 'inotify':
+        pytest.skip('inotify unavailable')
+    batches = iter(watcher)
+    edit_tree(tree, write_json)
+    seen = set()
+    for batch in itertools.islice(batches, 4):
+        seen |= batch
+        if seen >= EXPECTED:
+            break
+    assert seen == EXPECTED
+
+
+@pytest.fixture
+def checked_units(monkeypatch):
+    """Records the files each Checker.run actually checks (cache misses)."""
+    seen = []
+    real = check.check_unit
+    monkeypatch.setattr(check, 'check_unit', lambda unit: seen.append(unit[0]) or real(unit))
+    return seen
+
+
+def test_cached_clean_file_is_not_rechecked(tree, checked_units):
+    checker_for(tree)
+    assert 'workouts/1-1_Legs.json' in checked_units
+    checked_units.clear()
+    checker = checker_for(tree)
+    assert checked_units == []
+    assert errors(checker, 'workouts/1-1_Legs.json') == []
+    assert checker.deps['workouts/1-1_Legs.json'] == {'exercises/goblet_squat.json'}
+
+
+def test_rule_change_invalidates_cached_results(tree, checked_units, monkeypatch, tmp_path):
+    checker_for(tree)
+    checked_units.clear()
+    scripts = tmp_path / 'scripts'
+    shutil.copytree(check.SCRIPTS_DIR, scripts, ignore=shutil.ignore_patterns('__pycache__'))
+    with open(scripts / 'lint_sessions.py', 'a', encoding='utf-8') as f:
+        f.write('\n# rule tweak\n')
+    monkeypatch.setattr(check, 'SCRIPTS_DIR', scripts)
+    checker_for(tree)
+    # lint units re-run; README.md only has the links rule, whose code did not change
+    assert checked_units == ['workouts/1-1_Legs.json', 'workouts/1-2_Legs.json', 'workouts/1-3_Arms.json']
+
+
+def test_removed_dependency_invalidates_cached_results(tree, checked_units):
+    checker_for(tree)
+    checked_units.clear()
+    (tree / 'exercises' / 'goblet_squat.json').unlink()
+    checker = checker_for(tree)
+    assert checked_units == ['README.md', 'workouts/1-1_Legs.json', 'workouts/1-2_Legs.json']
+    assert errors(checker, 'workouts/1-1_Legs.json') == [
+        "workouts/1-1_Legs.json: Exercise JSON not found for 'goblet_squat': exercises/goblet_squat.json"]
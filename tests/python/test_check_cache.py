@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+from check_cache import CheckCache, rules_digest
+
+
+@pytest.fixture
+def checked(repo, write_json):
+    schema = write_json(repo / 'schemas' / 'x.schema.json', {'type': 'object'})
+    doc = write_json(repo / 'workouts' / 'a.json', {'title': 'A'})
+    rules = rules_digest(schema)
+    cache = CheckCache('test', repo)
+    cache.store(doc, rules, ['bad title'], deps=['exercises/goblet_squat.json'])
+    cache.save()
+    return repo, schema, doc, rules
+
+
+def reopened(repo):
+    return CheckCache('test', repo)
+
+
+def test_unchanged_file_is_a_hit(checked):
+    repo, _, doc, rules = checked
+    cache = reopened(repo)
+    assert cache.lookup(doc, rules) == ['bad title']
+    assert cache.hits == 1
+
+
+def test_edited_file_is_rechecked(checked, write_json):
+    repo, _, doc, rules = checked
+    write_json(doc, {'title': 'B'})
+    assert reopened(repo).lookup(doc, rules) is None
+
+
+def test_touched_file_with_same_content_is_a_hit(checked):
+    repo, _, doc, rules = checked
+    stat = doc.stat()
+    os.utime(doc, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    cache = reopened(repo)
+    assert cache.lookup(doc, rules) == ['bad title']
+    # the new stat is remembered so the next run skips hashing
+    assert cache.dirty
+    assert cache.entries['workouts/a.json']['mtimeNs'] == doc.stat().st_mtime_ns
+
+
+def test_rule_change_invalidates(checked, write_json):
+    repo, schema, doc, rules = checked
+    write_json(schema, {'type': 'object', 'required': ['title']})
+    new_rules = rules_digest(schema)
+    assert new_rules != rules
+    assert reopened(repo).lookup(doc, new_rules) is None
+
+
+def test_dependency_appearing_invalidates(checked, write_json):
+    repo, _, doc, rules = checked
+    write_json(repo / 'exercises' / 'goblet_squat.json', {'name': 'Goblet Squat'})
+    assert reopened(repo).lookup(doc, rules) is None
+
+
+def test_deleted_file_is_pruned_on_save(checked):
+    repo, _, doc, rules = checked
+    doc.unlink()
+    cache = reopened(repo)
+    assert cache.lookup(doc, rules) is None
+    cache.save()
+    stored = json.loads((repo / '.cache' / 'check_test.json').read_text(encoding='utf-8'))
+    assert stored['entries'] == {}
+
+
+def test_disabled_cache_never_hits(checked):
+    repo, _, doc, rules = checked
+    assert CheckCache('test', repo, enabled=False).lookup(doc, rules) is None
+
+
+def test_edit_during_check_is_not_cached_as_checked(checked, write_json):
+    repo, _, doc, rules = checked
+    write_json(doc, {'title': 'B'})
+    cache = reopened(repo)
+    assert cache.lookup(doc, rules) is None
+    # the file changes again while it is being checked
+    write_json(doc, {'title': 'C, longer'})
+    cache.store(doc, rules, [])
+    cache.save()
+    assert reopened(repo).lookup(doc, rules) is None
+
+
+def test_store_uses_fingerprint_taken_before_the_check(checked, write_json):
+    repo, _, doc, rules = checked
+    cache = reopened(repo)
+    before = cache.fingerprint(doc)
+    write_json(doc, {'title': 'C, longer'})
+    cache.store(doc, rules, [], fingerprint=before)
+    assert cache.entries['workouts/a.json']['hash'] == before['hash']
+    assert cache.lookup(doc, rules) is None
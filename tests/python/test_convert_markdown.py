@@ -0,0 +1,114 @@
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import convert_markdown
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURES = Path(__file__).resolve().parent / 'fixtures' / 'markdown'
+MARKDOWN = sorted(str(p.relative_to(FIXTURES)) for p in FIXTURES.glob('*/*.md'))
+
+
+def git_show(rev_path):
+    result = subprocess.run(['git', 'show', rev_path], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout if result.returncode == 0 else None
+
+
+@pytest.fixture
+def md_repo(repo, monkeypatch):
+    for rel in MARKDOWN:
+        shutil.copy(FIXTURES / rel, repo / rel)
+    monkeypatch.setattr(convert_markdown, 'REPO_ROOT', repo)
+    monkeypatch.setattr(convert_markdown, 'RECORD_PATH', repo / '.cache' / 'md_convert.json')
+    return repo
+
+
+def run(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, 'argv', ['convert_markdown.py', '--jobs', '1', *args])
+    code = convert_markdown.main()
+    return code, capsys.readouterr().out
+
+
+def outputs(repo):
+    return {rel: (repo / convert_markdown.json_path_for(rel)).read_bytes() for rel in MARKDOWN}
+
+
+@pytest.fixture
+def legacy_outputs(tmp_path):
+    """The fixtures converted by the single-file converters as they were before convert_markdown.py."""
+    rev = subprocess.run(['git', 'log', '--format=%H', '-1', '--grep=^\\[user-023\\] Add'],
+                         cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    sources = {name: git_show(f'{rev}^:scripts/{name}') if rev else None
+               for name in ('md_to_session_json.py', 'md_to_exercise_json.py')}
+    if not all(sources.values()):
+        pytest.skip('pre-converter scripts not in git history')
+    legacy = tmp_path / 'legacy'
+    (legacy / 'scripts').mkdir(parents=True)
+    for name, source in sources.items():
+        (legacy / 'scripts' / name).write_text(source, encoding='utf-8')
+    for rel in MARKDOWN:
+        (legacy / rel).parent.mkdir(exist_ok=True)
+        shutil.copy(FIXTURES / rel, legacy / rel)
+    sessions = [str(legacy / rel) for rel in MARKDOWN if rel.startswith('workouts/')]
+    subprocess.run([sys.executable, str(legacy / 'scripts' / 'md_to_session_json.py'), *sessions],
+                   check=True, capture_output=True)
+    subprocess.run([sys.executable, str(legacy / 'scripts' / 'md_to_exercise_json.py')],
+                   check=True, capture_output=True, cwd=legacy)
+    return outputs(legacy)
+
+
+def test_output_is_byte_identical_to_legacy_converters(md_repo, legacy_outputs, monkeypatch, capsys):
+    code, _ = run(monkeypatch, capsys)
+    assert code == 0
+    assert outputs(md_repo) == legacy_outputs
+
+
+def test_unchanged_markdown_is_skipped(md_repo, monkeypatch, capsys):
+    run(monkeypatch, capsys)
+    before = {rel: (md_repo / convert_markdown.json_path_for(rel)).stat().st_mtime_ns for rel in MARKDOWN}
+    monkeypatch.setattr(convert_markdown, 'convert_unit', lambda unit: pytest.fail(f'reconverted {unit}'))
+    code, out = run(monkeypatch, capsys)
+    assert code == 0
+    assert f'0 written, 0 already current, {len(MARKDOWN)} unchanged' in out
+    assert before == {rel: (md_repo / convert_markdown.json_path_for(rel)).stat().st_mtime_ns for rel in MARKDOWN}
+
+
+def test_edited_markdown_is_reconverted(md_repo, monkeypatch, capsys):
+    run(monkeypatch, capsys)
+    md = md_repo / 'exercises' / 'goblet_squat.md'
+    md.write_text(md.read_text(encoding='utf-8').replace('# Goblet Squat', '# Goblet Squat (Heels Up)'),
+                  encoding='utf-8')
+    _, out = run(monkeypatch, capsys)
+    assert 'Wrote exercises/goblet_squat.json' in out and '1 written' in out
+    assert json.loads((md_repo / 'exercises' / 'goblet_squat.json').read_text())['name'] == 'Goblet Squat (Heels Up)'
+
+
+def test_hand_curated_exercise_json_is_left_alone(md_repo, monkeypatch, capsys, write_json):
+    curated = write_json(md_repo / 'exercises' / 'goblet_squat.json', {'name': 'Goblet Squat', 'curated': True})
+    before = curated.read_bytes()
+    _, out = run(monkeypatch, capsys)
+    assert '1 hand-curated skipped' in out
+    assert curated.read_bytes() == before
+
+    _, out = run(monkeypatch, capsys, '--force')
+    assert 'Wrote exercises/goblet_squat.json' in out
+    assert 'curated' not in json.loads(curated.read_text())
+
+
+def test_check_writes_nothing(md_repo, monkeypatch, capsys):
+    code, out = run(monkeypatch, capsys, '--check')
+    assert code == 1 and out.count('DRIFT') == len(MARKDOWN)
+    assert not (md_repo / '.cache' / 'md_convert.json').exists()
+    assert not list(md_repo.glob('*/*.json'))
+
+    run(monkeypatch, capsys)
+    records = (md_repo / '.cache' / 'md_convert.json').read_bytes()
+    (md_repo / 'workouts' / '5-3_Upper_Superset.md').unlink()
+    code, out = run(monkeypatch, capsys, '--check')
+    assert code == 0 and 'DRIFT' not in out
+    # the record for the deleted Markdown is only dropped by a converting run
+    assert (md_repo / '.cache' / 'md_convert.json').read_bytes() == records
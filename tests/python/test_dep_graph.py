@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from builders import exercise, perf2_log
+from dep_graph import GRAPH_VERSION, DepGraph
+from exercise_index import build_exercise_index
+
+LOG = 'performed/2025-01-06T120000_1-1_Legs.json'
+WORKOUT = 'workouts/1-1_Legs.json'
+
+
+def session(*links):
+    return {'title': 'Legs', 'sections': [{'type': 'Main', 'title': 'Main', 'items': [
+        {'kind': 'exercise', 'name': link, 'link': f'exercises/{link}.json'} for link in links]}]}
+
+
+@pytest.fixture
+def graph_repo(repo, write_json):
+    write_json(repo / WORKOUT, session('goblet_squat'))
+    log = perf2_log(exercise('Goblet Squat', (40, 10, 7)))
+    log['workoutFile'] = WORKOUT
+    log['exerciseIndex'] = build_exercise_index(log['sections'])
+    write_json(repo / LOG, log)
+    graph = DepGraph(repo, jobs=1)
+    graph.refresh()
+    graph.save()
+    return repo
+
+
+def reloaded(repo):
+    graph = DepGraph(repo, jobs=1).load()
+    return graph, graph.refresh()
+
+
+def fresh(repo):
+    graph = DepGraph(repo, graph_path=repo / 'fresh.json', jobs=1)
+    graph.refresh()
+    return graph
+
+
+def test_dependents(graph_repo):
+    graph, updated = reloaded(graph_repo)
+    assert updated == []
+    assert graph.dependents('exercises/goblet_squat.json') == [LOG, WORKOUT]
+    assert graph.dependents(WORKOUT) == [LOG]
+
+
+def test_edited_workout_moves_its_edges(graph_repo, write_json):
+    write_json(graph_repo / WORKOUT, session('goblet_squat', 'lateral_lunges'))
+    graph, updated = reloaded(graph_repo)
+    assert updated == [WORKOUT]
+    assert graph.dependents('exercises/lateral_lunges.json') == [WORKOUT]
+    assert graph.files == fresh(graph_repo).files
+
+
+def test_deleted_log_drops_its_edges(graph_repo):
+    (graph_repo / LOG).unlink()
+    graph, updated = reloaded(graph_repo)
+    assert updated == [LOG]
+    assert graph.dependents(WORKOUT) == []
+    assert graph.dependents('exercises/goblet_squat.json') == [WORKOUT]
+
+
+def test_graph_from_older_version_is_rebuilt(graph_repo):
+    path = graph_repo / '.cache' / 'dep_graph.json'
+    payload = json.loads(path.read_text(encoding='utf-8'))
+    payload['version'] = GRAPH_VERSION - 1
+    path.write_text(json.dumps(payload), encoding='utf-8')
+    graph, updated = reloaded(graph_repo)
+    assert updated == [LOG, WORKOUT]
+    assert graph.files == fresh(graph_repo).files
@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from analyze_performance_logs import session_summaries
+from builders import exercise, perf2_log
+from dep_graph import file_dependencies
+from exercise_index import build_exercise_index, default_paths, refresh_file
+
+ROOT = Path(__file__).resolve().parents[2]
+PERFORMED = ROOT / 'performed'
+
+# Logs exported by the app (assets/form-builder.ts buildExerciseIndex) and left untouched since
+APP_EXPORTS = [
+    '2025-11-18T133121_5-3_Back_Biceps_Maintenance.json',
+    '2025-11-20T132751_5-3_Glutes_Calves_Core.json',
+    '2025-11-21T133542_5-3_Chest_Shoulders_Volume.json',
+    '2025-11-22T174032_5-3_Optional_Easy_Run.json',
+]
+
+
+def load(name):
+    return json.loads((PERFORMED / name).read_text(encoding='utf-8'))
+
+
+def legacy(index):
+    """The same index the way the old migrator wrote it: unsuffixed keys, no angle, 1 decimal."""
+    return {key.rsplit('_', 1)[0]: {**{k: v for k, v in entry.items() if k != 'angle'},
+                                    'avgRPE': round(entry['avgRPE'], 1),
+                                    'totalVolume': round(entry['totalVolume'], 1)}
+            for key, entry in index.items()}
+
+
+@pytest.mark.parametrize('name', APP_EXPORTS)
+def test_matches_app_written_index(name):
+    data = load(name)
+    built = build_exercise_index(data['sections'])
+    assert built == data['exerciseIndex']
+    assert list(built) == list(data['exerciseIndex'])
+
+
+def test_matches_app_index_except_hand_renamed_item():
+    # "Hollow Hold" was renamed to "Hollow Body Hold" in the log after the app exported it
+    data = load('2025-11-17T133000_5-3_Chest_Triceps_Strength.json')
+    built = build_exercise_index(data['sections'])
+    saved = dict(data['exerciseIndex'])
+    saved['hollow-body-hold_0'] = dict(saved.pop('hollow-hold_0'), name='Hollow Body Hold')
+    assert built == saved
+
+
+def test_form_builder_semantics():
+    superset = {
+        'kind': 'superset', 'name': 'A',
+        'rounds': [
+            {'round': 1, 'exercises': [{'key': 'renegade-row', 'name': 'Renegade Row', 'weight': 30, 'multiplier': 2, 'reps': 8},
+                                       {'name': 'Push-Up', 'reps': 12, 'rpe': 8}]},
+            {'round': 2, 'exercises': [{'key': 'renegade-row', 'name': 'Renegade Row', 'weight': None, 'reps': 8,
+                                        'rpe': 8.5, 'angle': 30}]},
+        ],
+    }
+    data = perf2_log(exercise('Goblet Squat', (40, 10, 7), (45, 10, 7.5), {'set': 3, 'reps': 9}),
+                     superset,
+                     exercise('Goblet Squat', {'set': 1, 'weight': 50, 'reps': 5, 'rpe': 9, 'angle': 15}),
+                     exercise('Goblet Squat', (55, 5, 9.5)))
+    index = build_exercise_index(data['sections'])
+    assert index == {
+        # `weight || 0`, `rpe || 0`: the unweighted third set adds no volume but still divides RPE
+        'goblet-squat_0': {'angle': 0, 'name': 'Goblet Squat', 'sectionPath': 'sections[0].items[3].sets[*]',
+                           'totalSets': 1, 'totalRounds': 0, 'avgRPE': 9.5, 'totalVolume': 275},
+        'goblet-squat_15': {'angle': 15, 'name': 'Goblet Squat', 'sectionPath': 'sections[0].items[2].sets[*]',
+                            'totalSets': 1, 'totalRounds': 0, 'avgRPE': 9, 'totalVolume': 250},
+        # the angle comes from the first round that records one; null weight counts as 0
+        'renegade-row_30': {'angle': 30, 'name': 'Renegade Row',
+                            'sectionPath': 'sections[0].items[1].rounds[*].exercises[0]',
+                            'totalSets': 2, 'totalRounds': 2, 'avgRPE': 4.25, 'totalVolume': 480},
+        # a child missing from a later round adds nothing but the round still counts
+        'push-up_0': {'angle': 0, 'name': 'Push-Up', 'sectionPath': 'sections[0].items[1].rounds[*].exercises[1]',
+                      'totalSets': 2, 'totalRounds': 2, 'avgRPE': 4, 'totalVolume': 0},
+    }
+    # a later item with the same key replaces the earlier one (JS object assignment order)
+    assert list(index) == ['goblet-squat_0', 'renegade-row_30', 'push-up_0', 'goblet-squat_15']
+
+
+def test_unrounded_values_are_kept():
+    data = perf2_log(exercise('Curl', (12.5, 10, 7), (12.5, 9, 7.5), (12.5, 8, 8)))
+    entry = build_exercise_index(data['sections'])['curl_0']
+    assert entry['avgRPE'] == 7.5 and entry['totalVolume'] == 337.5
+    data = perf2_log(exercise('Curl', (10, 10, 7), (10, 10, 7), (10, 10, 8)))
+    assert build_exercise_index(data['sections'])['curl_0']['avgRPE'] == pytest.approx(22 / 3)
+
+
+@pytest.mark.parametrize('name', APP_EXPORTS[:3])
+def test_consumers_read_both_key_formats(name):
+    data = load(name)
+    old = dict(data, exerciseIndex=legacy(data['exerciseIndex']))
+    assert session_summaries(old) == session_summaries(data)
+    assert file_dependencies('performed', old) == file_dependencies('performed', data)
+
+
+def test_unsuffixed_key_ending_in_digits_is_kept_whole():
+    data = {'version': 'perf-2', 'workoutFile': 'workouts/x.json',
+            'exerciseIndex': {'90-90-hip-switch_2': {'name': '90/90 Hip Switch'},
+                              'goblet-squat_15': {'angle': 15}}}
+    assert file_dependencies('performed', data) == [
+        'exercises/90_90_hip_switch_2.json', 'exercises/goblet_squat.json', 'workouts/x.json']
+
+
+def test_refresh_reports_legacy_index_as_stale(tmp_path):
+    data = load(APP_EXPORTS[0])
+    data['exerciseIndex'] = legacy(data['exerciseIndex'])
+    path = tmp_path / 'log.json'
+    path.write_text(json.dumps(data, indent=2) + '\n', encoding='utf-8')
+    _, status, text = refresh_file(str(path))
+    assert status == 'stale'
+    assert json.loads(text) == load(APP_EXPORTS[0])
+
+
+def test_archive_is_opt_in():
+    assert default_paths() and not any('archive' in Path(p).parts for p in default_paths())
+    assert any('archive' in Path(p).parts for p in default_paths(include_archive=True))
@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import generate_progress_report as gpr
+from generate_progress_report import EXERCISE_SECTION_TITLE, build_report
+
+ROOT = Path(__file__).resolve().parents[2]
+SCRIPT = ROOT / 'scripts' / 'generate_progress_report.py'
+
+START, END = date(2025, 1, 6), date(2025, 1, 12)
+
+
+def session(day, volume, sets=3, rpe=7.5):
+    ex = {'sessions': 1, 'sets': sets, 'volume': volume, 'avg_rpe': rpe,
+          'top_set': {'weight': 40, 'reps': 10, 'rpe': 8}}
+    return {'file': f'{day}.json', 'date': day, 'blockWeek': '1-1', 'exercises': {'Goblet Squat': ex}}
+
+
+SESSIONS = [session('2025-01-06', 1200), session('2025-01-08', 1350),
+            {'file': 'run.json', 'date': '2025-01-10', 'blockWeek': '1-1', 'exercises': {}}]
+
+
+def curated(kpis, sections=()):
+    return {
+        'version': '1.0',
+        'metadata': {'title': 'Block 1 Week 1', 'period': {'startDate': '2025-01-06', 'endDate': '2025-01-12'},
+                     'generatedDate': '2025-01-13'},
+        'summary': {'grade': 'A', 'kpis': kpis, 'highlights': ['Hand-written']},
+        'sections': list(sections),
+    }
+
+
+def test_new_report_gets_every_kpi_and_exercise_section():
+    report = build_report(SESSIONS, START, END, grade='A')
+    assert [k['label'] for k in report['summary']['kpis']] == ['Total Sessions', 'Strength Volume', 'Avg Strength RPE']
+    assert report['summary']['kpis'][0]['value'] == '3 (2 strength + 1 other)'
+    assert report['sections'][-1]['title'] == EXERCISE_SECTION_TITLE
+
+
+def test_curated_report_keeps_its_own_kpis_and_sections():
+    existing = curated([{'label': 'Total Sessions', 'value': '3', 'sentiment': 'positive'},
+                        {'label': 'Adherence', 'value': '100%', 'sentiment': 'positive'}],
+                       [{'type': 'text', 'title': 'Notes', 'content': 'x'}])
+    report = build_report(SESSIONS, START, END, existing)
+    # "3" states the leading number of "3 (2 strength + 1 other)" and stays as written
+    assert report['summary']['kpis'] == existing['summary']['kpis']
+    assert report['sections'] == existing['sections']
+
+
+def test_curated_kpi_is_corrected_when_its_numbers_are_wrong():
+    existing = curated([{'label': 'Strength Volume', 'value': '9,999 lb', 'sentiment': 'positive'},
+                        {'label': 'Total Sessions', 'value': '3 (2 strength + 1 run)', 'sentiment': 'positive'}])
+    report = build_report(SESSIONS, START, END, existing)
+    assert [k['value'] for k in report['summary']['kpis']] == ['2,550 lb', '3 (2 strength + 1 run)']
+
+
+def test_existing_exercise_section_is_refreshed():
+    stale = {'type': 'table', 'title': EXERCISE_SECTION_TITLE,
+             'table': {'type': 'exercise-progression', 'columns': [], 'rows': []}}
+    report = build_report(SESSIONS, START, END, curated([], [stale]))
+    assert [r['exercise'] for r in report['sections'][0]['table']['rows']] == ['Goblet Squat']
+
+
+def test_all_check_skips_reports_the_logs_do_not_cover():
+    result = subprocess.run([sys.executable, str(SCRIPT), '--all', '--check'],
+                            capture_output=True, text=True, cwd=ROOT)
+    skipped = [line.split(':')[0] for line in result.stdout.splitlines() if line.startswith('Skipping ')]
+    assert result.returncode == 0, result.stdout + result.stderr
+    # blocks-4-4 counts 19 sessions; only 17 of them were logged
+    assert skipped == ['Skipping 2025-11-03_blocks-4-4.json']
+
+
+def test_all_skips_a_report_with_17_of_its_19_sessions_logged(tmp_path, monkeypatch, capsys):
+    days = [date(2025, 1, 1) + timedelta(days=i) for i in range(17)]
+    files = {f'{d}.json': session(d.isoformat(), 1000) for d in days}
+    monkeypatch.setattr(gpr, 'load_rollups', lambda: SimpleNamespace(files=files))
+    monkeypatch.setattr(gpr, 'REPORTS_DIR', tmp_path)
+    monkeypatch.setattr(gpr, 'INDEX_PATH', tmp_path / 'index.json')
+    report = curated([{'label': 'Total Sessions', 'value': '19', 'sentiment': 'positive'}])
+    report['metadata']['period'] = {'startDate': '2025-01-01', 'endDate': '2025-01-19'}
+    (tmp_path / 'partial.json').write_text(json.dumps(report))
+    entry = {'filename': 'partial.json', 'title': 'Block 1', 'generatedDate': '2025-01-20',
+             'startDate': '2025-01-01', 'endDate': '2025-01-19', 'grade': 'A', 'sessionCount': 19}
+    (tmp_path / 'index.json').write_text(json.dumps({'version': '2.0', 'reports': [entry]}))
+    before = {p.name: p.read_bytes() for p in tmp_path.iterdir()}
+
+    monkeypatch.setattr(sys, 'argv', ['generate_progress_report.py', '--all', '--check'])
+    assert gpr.main() == 0
+    out = capsys.readouterr().out
+    assert 'Skipping partial.json: performed logs cover 17 of its 19 sessions' in out
+    assert '0 checked, 1 skipped' in out
+
+    monkeypatch.setattr(sys, 'argv', ['generate_progress_report.py', '--all'])
+    assert gpr.main() == 0
+    assert {p.name: p.read_bytes() for p in tmp_path.iterdir()} == before
@@ -0,0 +1,63 @@
+import pytest
+
+import log_ingest
+from log_ingest import PARALLEL_THRESHOLD, ingest, parallel_map
+
+CALLS = []
+
+
+def square(x):
+    return x * x
+
+
+def record_init(tag):
+    CALLS.append(tag)
+
+
+class RefusingPool:
+    """Stands in for ProcessPoolExecutor where the sandbox won't let workers start."""
+
+    def __init__(self, error):
+        self.error = error
+        self.started = 0
+
+    def __call__(self, *args, **kwargs):
+        self.started += 1
+        raise self.error
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+@pytest.mark.parametrize('error', [OSError('no processes'), PermissionError('sem_open'), RuntimeError('spawn')])
+def test_parallel_map_falls_back_to_serial_when_the_pool_cannot_start(monkeypatch, error):
+    pool = RefusingPool(error)
+    monkeypatch.setattr(log_ingest, 'ProcessPoolExecutor', pool)
+    items = list(range(PARALLEL_THRESHOLD * 2))
+    assert parallel_map(square, items, jobs=4, initializer=record_init, initargs=('serial',)) == [x * x for x in items]
+    assert pool.started == 1
+    # the serial path still runs the initializer once, in-process
+    assert CALLS == ['serial']
+
+
+def test_small_batches_never_start_a_pool(monkeypatch):
+    pool = RefusingPool(AssertionError('pool started'))
+    monkeypatch.setattr(log_ingest, 'ProcessPoolExecutor', pool)
+    assert parallel_map(square, range(PARALLEL_THRESHOLD - 1), jobs=8) == [x * x for x in range(PARALLEL_THRESHOLD - 1)]
+    assert parallel_map(square, range(PARALLEL_THRESHOLD * 2), jobs=1)[-1] == (PARALLEL_THRESHOLD * 2 - 1) ** 2
+    assert pool.started == 0
+
+
+def test_ingest_falls_back_to_serial_and_keeps_path_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_ingest, 'ProcessPoolExecutor', RefusingPool(OSError('no processes')))
+    paths = []
+    for i in range(PARALLEL_THRESHOLD):
+        path = tmp_path / f'{PARALLEL_THRESHOLD - i:03d}.json'
+        path.write_text('{"n": %d}' % i if i else '{broken', encoding='utf-8')
+        paths.append(path)
+    results = ingest(paths, jobs=4)
+    assert [r.path for r in results] == sorted(str(p) for p in paths)
+    assert results[-1].error is not None
+    assert all(r.error is None for r in results[:-1])
@@ -0,0 +1,124 @@
+import json
+import sys
+
+import pytest
+
+import migrate_perf1_to_perf2 as migrate
+
+WORKOUT = 'workouts/1-1_Legs.json'
+LOGS = ['performed/2025-01-06T120000_1-1_Legs_perf1.json', 'performed/2025-01-08T120000_1-1_Legs_perf1.json']
+
+
+def perf1(weight):
+    return {'version': 'perf-1', 'workoutFile': WORKOUT, 'timestamp': '2025-01-06T12:00:00Z',
+            'exercises': {'goblet-squat': {'sets': [{'set': 1, 'weight': weight, 'reps': 10, 'rpe': 7}]}}}
+
+
+@pytest.fixture
+def tree(repo, write_json, monkeypatch):
+    write_json(repo / WORKOUT, {'title': 'Legs', 'sections': [{'type': 'Main Work', 'title': 'Main', 'items': [
+        {'kind': 'exercise', 'name': 'Goblet Squat', 'link': 'exercises/goblet_squat.json'}]}]})
+    for i, log in enumerate(LOGS):
+        write_json(repo / log, perf1(40 + 5 * i))
+    monkeypatch.chdir(repo)
+    monkeypatch.setattr(migrate, 'REPO_ROOT', repo)
+    monkeypatch.setattr(migrate, 'JOURNAL_PATH', repo / '.cache' / 'migrate.journal')
+    return repo
+
+
+def run(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, 'argv', ['migrate_perf1_to_perf2.py', '--jobs', '1', *args])
+    try:
+        migrate.main()
+        code = 0
+    except SystemExit as e:
+        code = e.code
+    return code, capsys.readouterr().out
+
+
+def journal(repo):
+    return [json.loads(line) for line in (repo / '.cache' / 'migrate.journal').read_text().splitlines()]
+
+
+def output(repo, log):
+    return repo / log.replace('_perf1.json', '_perf2.json')
+
+
+def test_migrates_and_journals(tree, monkeypatch, capsys):
+    code, out = run(monkeypatch, capsys, *LOGS)
+    assert code == 0 and 'Migrated: 2' in out
+    data = json.loads(output(tree, LOGS[0]).read_text())
+    assert data['version'] == 'perf-2'
+    assert data['sections'][0]['items'][0]['sets'] == [{'set': 1, 'weight': 40, 'reps': 10, 'rpe': 7}]
+    assert [e['input'] for e in journal(tree)] == LOGS
+
+
+def test_second_run_skips_journaled_logs(tree, monkeypatch, capsys):
+    run(monkeypatch, capsys, *LOGS)
+    code, out = run(monkeypatch, capsys, *LOGS)
+    assert code == 0
+    assert '2 file(s) already migrated' in out and 'Migrated: 0' in out
+
+
+def test_edited_input_is_migrated_again(tree, monkeypatch, capsys, write_json):
+    run(monkeypatch, capsys, *LOGS)
+    write_json(tree / LOGS[1], perf1(60))
+    _, out = run(monkeypatch, capsys, *LOGS)
+    assert '1 file(s) already migrated' in out and 'Migrated: 1' in out
+    assert json.loads(output(tree, LOGS[1]).read_text())['sections'][0]['items'][0]['sets'][0]['weight'] == 60
+
+
+def test_new_migrator_digest_migrates_again_and_compacts_journal(tree, monkeypatch, capsys):
+    run(monkeypatch, capsys, *LOGS)
+    run(monkeypatch, capsys, '--fresh', *LOGS)
+    assert len(journal(tree)) == 4
+
+    monkeypatch.setattr(migrate, 'migrator_digest', lambda: 'new-rules')
+    _, out = run(monkeypatch, capsys, *LOGS)
+    assert 'already migrated' not in out and 'Migrated: 2' in out
+    # Loading dropped the four superseded lines; only this run's entries remain
+    assert [(e['input'], e['migrator']) for e in journal(tree)] == [(log, 'new-rules') for log in LOGS]
+
+
+def test_load_journal_keeps_latest_entry_and_skips_torn_line(tmp_path):
+    path = tmp_path / 'journal'
+    lines = [{'input': 'a', 'migrator': 'd', 'n': 1}, {'input': 'b', 'migrator': 'old'},
+             {'input': 'a', 'migrator': 'd', 'n': 2}]
+    path.write_text(''.join(json.dumps(e) + '\n' for e in lines) + '{"input": "c", "migr')
+    assert migrate.load_journal(path) == {'a': lines[2], 'b': lines[1]}
+    assert migrate.load_journal(path, 'd') == {'a': lines[2]}
+    assert path.read_text() == json.dumps(lines[2]) + '\n'
+    # Already compact: left as it is
+    before = path.stat().st_mtime_ns
+    migrate.load_journal(path, 'd')
+    assert path.stat().st_mtime_ns == before
+
+
+def test_failed_write_leaves_target_untouched(tree, monkeypatch, capsys):
+    run(monkeypatch, capsys, LOGS[0])
+    target = output(tree, LOGS[0])
+    before = target.read_text()
+
+    def broken_dump(data, f, **kwargs):
+        f.write('{"version": "perf-2", "sec')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(migrate.json, 'dump', broken_dump)
+    code, out = run(monkeypatch, capsys, '--fresh', LOGS[0])
+    assert code == 1 and 'disk full' in out
+    assert target.read_text() == before
+    assert not list(target.parent.glob('.*.tmp'))
+    assert journal(tree)[-1]['status'] == 'error'
+
+
+def test_workout_option_finds_logs_through_dep_graph(tree, monkeypatch, capsys):
+    code, out = run(monkeypatch, capsys, '--workout', WORKOUT)
+    assert code == 0 and 'Migrated: 2' in out
+    assert all(output(tree, log).exists() for log in LOGS)
+
+
+def test_logs_are_grouped_by_session(tmp_path):
+    paths = [tmp_path / name for name in (
+        '2025-01-08T120000_1-1_Legs_perf1.json', '2025-01-07T120000_1-2_Arms_perf1.json',
+        '2025-01-06T120000_1-1_Legs_perf1.json')]
+    assert migrate.group_by_session(paths) == [[str(paths[2]), str(paths[0])], [str(paths[1])]]
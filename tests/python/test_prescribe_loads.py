@@ -0,0 +1,247 @@
+import contextlib
+import io
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import prescribe_loads
+from builders import exercise, perf2_log
+from prescribe_loads import (INDEX_VERSION, HistoryIndex, KeyIndex, QueryServer, SetRow, SetStore, collect, collect_recent, format_weight, handle_query,
+                             load_history, prescribe_sessions, recent_requests)
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def index(repo, write_json):
+    write_json(repo / 'performed' / '2025-01-01T120000_1-1_Test.json',
+               perf2_log(exercise('Goblet Squat', (40, 10, 7), (40, 10, 8))))
+    idx = HistoryIndex(repo)
+    idx.refresh()
+    return idx
+
+
+def test_lookup_returns_history(index):
+    reply = handle_query(index, {'op': 'lookup', 'exercise': 'Goblet Squat', 'n': 1})
+    assert reply['ok']
+    assert [h['key'] for h in reply['history']] == ['goblet-squat_0']
+    assert len(reply['history'][0]['entries'][0]['sets']) == 2
+
+
+@pytest.mark.parametrize('n', [True, False, 0, -1, 1.5, '3'])
+def test_rejects_non_positive_int_count(index, n):
+    reply = handle_query(index, {'op': 'last', 'key': 'goblet-squat_0', 'n': n})
+    assert reply == {'ok': False, 'error': 'n must be a positive integer'}
+
+
+def test_rejects_bool_angle_bounds(index):
+    reply = handle_query(index, {'op': 'lookup', 'exercise': 'Goblet Squat', 'angleMin': True})
+    assert not reply['ok']
+
+
+@pytest.mark.parametrize('query, error', [
+    ({'op': 'last', 'key': 'goblet-squat_0', 'n': True}, 'n must be a positive integer'),
+    ({'op': 'lookup', 'exercise': 'Goblet Squat', 'n': False}, 'n must be a positive integer'),
+    ({'op': 'lookup', 'exercise': 'Goblet Squat', 'angleMin': True}, 'angleMin/angleMax must be integers'),
+    ({'op': 'lookup', 'exercise': 'Goblet Squat', 'angleMin': 0, 'angleMax': False},
+     'angleMin/angleMax must be integers'),
+])
+def test_query_server_rejects_bools(index, query, error):
+    server = QueryServer(index.repo_root)
+    reply = json.loads(server.answer(json.dumps(dict(query, id=7))))
+    assert reply == {'ok': False, 'error': error, 'id': 7}
+    # the same query with real integers is answered
+    fixed = {k: (1 if k == 'n' else 0) if isinstance(v, bool) else v for k, v in query.items()}
+    assert json.loads(server.answer(json.dumps(fixed)))['ok']
+
+
+@pytest.mark.parametrize('weight, multiplier, text', [
+    (None, None, ''), (40, None, '40'), (22.5, 2, '22.5 x2'), ('bodyweight', None, 'bodyweight'),
+])
+def test_format_weight(weight, multiplier, text):
+    assert format_weight(weight, multiplier) == text
+
+
+def test_non_numeric_weight_survives_the_index(repo, write_json):
+    write_json(repo / 'performed' / '2025-01-01T120000_1-1_Test.json',
+               perf2_log(exercise('Push-Up', {'set': 1, 'weight': 'bodyweight', 'reps': 12})))
+    load_history(repo)
+    idx, _ = reloaded(repo)
+    [(_, [row])] = idx.data()['push-up_0'].sessions()
+    assert prescribe_loads.format_row(row) == 'weight=bodyweight, reps=12, set=1'
+    reply = handle_query(idx, {'op': 'last', 'key': 'push-up_0', 'n': 1})
+    assert reply['history'][0]['entries'][0]['sets'][0]['weight'] == 'bodyweight'
+
+
+def test_set_store_round_trips_every_column():
+    sessions = {
+        'b.json': [SetRow(40, None, 10, 7.5, 1), SetRow(42.5, 2, 8, None, 2, angle=15)],
+        'a.json': [SetRow(None, None, 12, None, None, weight_text='bodyweight')],
+        'c.json': [SetRow(0, 1, 0, 10, 3, angle=0)],
+    }
+    store = SetStore()
+    for fname, rows in sessions.items():
+        store.insert_session(fname, rows)
+    store.insert_session('b.json', sessions['b.json'])  # re-inserting replaces, not duplicates
+    assert store.sessions() == sorted(sessions.items())
+
+    loaded = SetStore.from_json(json.loads(json.dumps(store.to_json())))
+    assert loaded.sessions() == store.sessions()
+    assert loaded.sessions(last_n=1) == [('c.json', sessions['c.json'])]
+
+    assert loaded.remove_session('b.json') and not loaded.remove_session('b.json')
+    assert loaded.sessions() == [('a.json', sessions['a.json']), ('c.json', sessions['c.json'])]
+    assert list(loaded.offsets) == [0, 1, 2]
+
+
+KEYS = ['incline-press_0', 'incline-press_15', 'incline-press_30', 'incline-press_45', 'incline-press_-15',
+        'incline-press-machine_30', 'incline-row_30', 'legacy', 'press_30']
+
+
+@pytest.mark.parametrize('angle_min, angle_max', [(None, None), (15, 30), (16, 44), (30, None), (None, 0),
+                                                  (-15, -15), (50, 60), (45, 15)])
+def test_key_index_angle_range_matches_a_scan(angle_min, angle_max):
+    def in_range(key):
+        slug, angle = prescribe_loads.split_angle_key(key)
+        return (slug == 'incline-press' and angle is not None
+                and (angle_min is None or angle >= angle_min) and (angle_max is None or angle <= angle_max))
+    assert KeyIndex(KEYS).variants('incline-press', angle_min, angle_max) == sorted(filter(in_range, KEYS))
+
+
+def test_key_index_bare_keys_only_match_without_bounds():
+    index = KeyIndex(KEYS)
+    assert index.variants('legacy') == ['legacy']
+    assert index.variants('legacy', 0, 90) == []
+    assert index.variants('missing') == []
+
+
+def test_key_index_prefix_range():
+    index = KeyIndex(reversed(KEYS))
+    assert index.with_prefix('incline-press') == sorted(k for k in KEYS if k.startswith('incline-press'))
+    assert index.with_prefix('incline-') == sorted(k for k in KEYS if k.startswith('incline-'))
+    assert index.with_prefix('zzz') == []
+    assert index.with_prefix('') == sorted(KEYS)
+
+
+# --- --recent vs full scan ----------------------------------------------------------------
+
+def _printed(data, session_path, n):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        prescribe_sessions(data, [str(session_path)], n)
+    return out.getvalue()
+
+
+@pytest.fixture
+def history_repo(repo, write_json):
+    logs = [
+        # Oldest: the only log with Lateral Lunges, and the dumbbell-named bench key
+        perf2_log(exercise('Lateral Lunges', (20, 8, 7)),
+                  exercise('Neutral-Grip Flat Bench Press (Dumbbells)', (35, 10, 7))),
+        perf2_log(exercise('Goblet Squat', (40, 10, 7)), exercise('Neutral-Grip Flat Bench Press', (40, 8, 8))),
+        perf2_log(exercise('Goblet Squat', (45, 10, 7)), exercise('Neutral-Grip Flat Bench Press', (40, 9, 8))),
+        perf2_log(exercise('Goblet Squat', (50, 8, 8), {'set': 2, 'weight': 30, 'reps': 10, 'angle': 15})),
+    ]
+    for day, log in enumerate(logs, start=1):
+        write_json(repo / 'performed' / f'2025-01-{day:02d}T120000_1-1_Test.json', log)
+    session = {
+        'title': 'Test',
+        'sections': [{'type': 'Main', 'title': 'Main', 'items': [
+            {'kind': 'exercise', 'name': 'Goblet Squat'},
+            {'kind': 'exercise', 'name': 'Lateral Lunges'},
+            {'kind': 'exercise', 'name': 'Neutral-Grip Flat Bench Press (Dumbbells)',
+             'link': 'exercises/neutral_grip_flat_bench_press.json'},
+            {'kind': 'exercise', 'name': 'Never Logged'},
+        ]}],
+    }
+    return repo, write_json(repo / 'workouts' / '1-1_Test.json', session)
+
+
+@pytest.mark.parametrize('n', [1, 2, 3])
+def test_recent_matches_full_scan(history_repo, n):
+    repo, session = history_repo
+    full = load_history(repo, use_index=False)
+    recent = collect_recent(repo, recent_requests(None, [str(session)]), n)
+    assert _printed(recent, session, n) == _printed(full, session, n)
+
+
+def test_recent_keeps_walking_for_exercises_not_seen_yet(history_repo):
+    repo, session = history_repo
+    recent = collect_recent(repo, recent_requests(None, [str(session)]), 1)
+    assert 'lateral-lunges_0' in recent
+    assert 'neutral-grip-flat-bench-press-dumbbells_0' in recent
+
+
+def test_recent_stops_once_every_exercise_is_satisfied(history_repo, monkeypatch):
+    repo, _ = history_repo
+    read = []
+    real = prescribe_loads.entries_from_log
+    monkeypatch.setattr(prescribe_loads, 'entries_from_log', lambda p, d: read.append(p) or real(p, d))
+    recent = collect_recent(repo, [['goblet-squat']], 1)
+    assert len(read) == 1
+    assert list(recent) == ['goblet-squat_15']
+
+
+@pytest.mark.parametrize('workout', sorted((ROOT / 'workouts').glob('*_Basketball_*.json')), ids=lambda p: p.name)
+def test_recent_matches_full_scan_on_repo_logs(workout):
+    full = load_history(ROOT, use_index=False)
+    recent = collect_recent(ROOT, recent_requests(None, [str(workout)]), 3)
+    assert _printed(recent, workout, 3) == _printed(full, workout, 3)
+
+
+def as_json(history):
+    return {key: store.to_json() for key, store in history.items()}
+
+
+def reloaded(repo):
+    idx = HistoryIndex(repo).load()
+    return idx, idx.refresh()
+
+
+def test_index_refresh_picks_up_edited_log(history_repo, write_json):
+    repo, _ = history_repo
+    load_history(repo)
+    log = repo / 'performed' / '2025-01-02T120000_1-1_Test.json'
+    text = log.read_text(encoding='utf-8')
+    # Same size, new content: the mtime alone has to give the edit away
+    log.write_text(text.replace('"weight": 40', '"weight": 45', 1), encoding='utf-8')
+    stat = log.stat()
+    os.utime(log, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    idx, changed = reloaded(repo)
+    assert changed
+    assert as_json(idx.data()) == as_json(collect(repo))
+    assert 45 in idx.data()['goblet-squat_0'].to_json()['weight']
+
+
+def test_index_refresh_drops_deleted_log(history_repo):
+    repo, _ = history_repo
+    load_history(repo)
+    (repo / 'performed' / '2025-01-01T120000_1-1_Test.json').unlink()
+
+    idx, changed = reloaded(repo)
+    assert changed
+    assert 'lateral-lunges_0' not in idx.data()
+    assert as_json(idx.data()) == as_json(collect(repo))
+
+
+def test_index_refresh_skips_unchanged_logs(history_repo):
+    repo, _ = history_repo
+    load_history(repo)
+    idx, changed = reloaded(repo)
+    assert not changed and not idx.dirty
+
+
+def test_index_from_older_format_is_rebuilt(history_repo):
+    repo, _ = history_repo
+    load_history(repo)
+    path = repo / '.cache' / 'prescribe_loads_index.json'
+    payload = json.loads(path.read_text(encoding='utf-8'))
+    payload['version'] = INDEX_VERSION - 1
+    path.write_text(json.dumps(payload), encoding='utf-8')
+
+    idx, changed = reloaded(repo)
+    assert changed
+    assert as_json(idx.data()) == as_json(collect(repo))
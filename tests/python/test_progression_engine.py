@@ -0,0 +1,57 @@
+import pytest
+
+import progression_engine
+from prescribe_loads import SetRow, SetStore
+from progression_engine import AVAILABLE_LOADS, round_down, snap_down, suggest
+
+
+def history(key, *sessions, multiplier=None):
+    """{key: SetStore} with one session per list of (weight, reps, rpe) sets."""
+    store = SetStore()
+    for i, sets in enumerate(sessions):
+        store.insert_session(f"2025-01-{i + 1:02d}T120000_1-1_Test.json",
+                             [SetRow(w, multiplier, r, rpe, n + 1) for n, (w, r, rpe) in enumerate(sets)])
+    return {key: store}
+
+
+def test_round_down_and_snap_down():
+    assert round_down(138.4) == 137.5
+    assert round_down(1.0) == 0.0
+    assert snap_down(80) == 70.0
+    assert snap_down(33) == 30.0
+
+
+def test_barbell_keys_are_not_capped_by_the_dumbbell_ladder():
+    data = history('back-squat_0', [(185, 5, 7)], [(190, 5, 7)])
+    sug = suggest(data)['back-squat_0']
+    assert sug.suggested_load > max(AVAILABLE_LOADS)
+    assert sug.suggested_load == round_down(sug.target_load)
+
+
+def test_light_non_dumbbell_loads_are_not_rounded_up_to_the_ladder():
+    data = history('weighted-plank_0', [(2.5, 10, 6)], [(2.5, 10, 6)])
+    assert suggest(data)['weighted-plank_0'].suggested_load < min(AVAILABLE_LOADS)
+
+
+@pytest.mark.parametrize('key, kwargs', [
+    ('flat-dumbbell-bench-press_0', {}),
+    ('bench-press_0', {'multiplier': 2}),           # logged per hand
+])
+def test_dumbbell_keys_snap_to_the_ladder(key, kwargs):
+    data = history(key, [(40, 10, 7)], [(42, 10, 7)], **kwargs)
+    assert suggest(data)[key].suggested_load in AVAILABLE_LOADS
+
+
+def test_dumbbell_slugs_come_from_equipment():
+    data = history('goblet-squat_0', [(40, 10, 6)], [(45, 10, 6)])
+    plain = suggest(data)['goblet-squat_0']
+    laddered = suggest(data, dumbbell_slugs={'goblet-squat'})['goblet-squat_0']
+    assert plain.suggested_load == round_down(plain.target_load)
+    assert laddered.suggested_load == snap_down(laddered.target_load)
+
+
+@pytest.mark.skipif(progression_engine.np is None, reason='numpy not installed')
+def test_numpy_and_python_paths_agree():
+    data = history('goblet-squat_0', [(40, 10, 7), (45, 8, None)], [(0, 0, None)], [(50, 6, 9)])
+    data.update(history('renegade-row_0', [(30, 8, 8)]))
+    assert suggest(data, use_numpy=True) == suggest(data, use_numpy=False)
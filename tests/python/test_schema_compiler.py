@@ -0,0 +1,103 @@
+import copy
+import json
+import random
+from pathlib import Path
+
+import pytest
+from jsonschema import Draft7Validator
+
+from schema_compiler import load_compiled
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Schema -> the repo documents it governs (as validate_schemas.work_units pairs them)
+CORPORA = {
+    'performance.schema.json': sorted((ROOT / 'performed').glob('*.json')),
+    'session.schema.json': sorted((ROOT / 'workouts').glob('*.json')),
+    'exercise.schema.json': sorted((ROOT / 'exercises').glob('*.json')),
+}
+REPLACEMENTS = [None, True, 0, -1, 2.5, '', 'x', [], {}, [1], {'x': 1}]
+
+
+def load_docs(paths):
+    docs = []
+    for path in paths:
+        if path.name == 'index.json':
+            continue
+        docs.append(json.loads(path.read_text(encoding='utf-8')))
+    return docs
+
+
+def mutate(doc, rng):
+    """Copy of `doc` with one node deleted, retyped or an array emptied."""
+    doc = copy.deepcopy(doc)
+    parents = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for k, v in node.items():
+                parents.append((node, k))
+                walk(v)
+        elif isinstance(node, list):
+            for i, v in enumerate(node):
+                parents.append((node, i))
+                walk(v)
+    walk(doc)
+    if not parents:
+        return doc
+    parent, key = rng.choice(parents)
+    roll = rng.random()
+    if roll < 0.25 and isinstance(parent, dict):
+        del parent[key]
+    elif roll < 0.35 and isinstance(parent[key], list):
+        parent[key] = []
+    else:
+        parent[key] = copy.deepcopy(rng.choice(REPLACEMENTS))
+    return doc
+
+
+@pytest.fixture(params=sorted(CORPORA))
+def compiled(request, tmp_path):
+    schema_path = ROOT / 'schemas' / request.param
+    is_valid = load_compiled(schema_path, cache_dir=tmp_path)
+    assert is_valid is not None, f'{request.param} falls back to jsonschema'
+    validator = Draft7Validator(json.loads(schema_path.read_text(encoding='utf-8')))
+    return is_valid, validator, load_docs(CORPORA[request.param])
+
+
+def test_compiled_matches_draft7_on_repo_documents(compiled):
+    is_valid, validator, docs = compiled
+    assert docs
+    for doc in docs:
+        assert is_valid(doc) == validator.is_valid(doc)
+
+
+def test_compiled_matches_draft7_on_mutated_documents(compiled):
+    is_valid, validator, docs = compiled
+    rng = random.Random(1234)
+    verdicts = set()
+    for _ in range(600):
+        doc = mutate(rng.choice(docs), rng)
+        expected = validator.is_valid(doc)
+        assert is_valid(doc) == expected, json.dumps(doc)[:300]
+        verdicts.add(expected)
+    assert verdicts == {True, False}
+
+
+def test_schema_change_recompiles(tmp_path):
+    schema_path = tmp_path / 'thing.schema.json'
+    schema_path.write_text(json.dumps({'type': 'object', 'properties': {'n': {'type': 'integer'}}}))
+    assert load_compiled(schema_path, cache_dir=tmp_path / 'cache')({'n': 1.5}) is False
+
+    schema_path.write_text(json.dumps({'type': 'object', 'properties': {'n': {'type': 'number'}}}))
+    assert load_compiled(schema_path, cache_dir=tmp_path / 'cache')({'n': 1.5}) is True
+    assert len(list((tmp_path / 'cache').glob('thing_*.py'))) == 1
+
+
+def test_perf2_log_may_have_no_sections(tmp_path):
+    schema_path = ROOT / 'schemas' / 'performance.schema.json'
+    is_valid = load_compiled(schema_path, cache_dir=tmp_path)
+    doc = json.loads((ROOT / 'performed' / '2025-09-25T120534_3-3_Easy_Run_Progression_perf2.json').read_text())
+    assert doc['sections'] == []
+    assert is_valid(doc)
+    assert Draft7Validator(json.loads(schema_path.read_text())).is_valid(doc)
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import validate_links
+from validate_links import RepoSnapshot, validate_file
+
+
+@pytest.fixture
+def tree(repo, write_json):
+    write_json(repo / 'exercises' / 'goblet_squat.json', {'name': 'Goblet Squat'})
+    (repo / 'workouts' / 'notes').mkdir()
+    (repo / 'workouts' / 'notes' / 'plan.md').write_text(
+        '[squat](../../exercises/goblet_squat.json)\n'
+        '[gone](../../exercises/missing.json) [out](../../../elsewhere.md)\n'
+        '[site](https://example.com) [top](#top)\n', encoding='utf-8')
+    for pruned in ('.git', 'node_modules'):
+        (repo / pruned / 'pkg').mkdir(parents=True)
+        (repo / pruned / 'pkg' / 'README.md').write_text('x', encoding='utf-8')
+    return repo
+
+
+def test_snapshot_skips_git_and_node_modules(tree):
+    snapshot = RepoSnapshot(tree)
+    assert 'exercises/goblet_squat.json'.replace('/', os.sep) in snapshot.paths
+    assert not [p for p in snapshot.paths if p.split(os.sep)[0] in ('.git', 'node_modules')]
+    # ... but existence inside them is still answered, straight from the filesystem
+    assert snapshot.exists(os.path.join('node_modules', 'pkg', 'README.md'))
+    assert not snapshot.exists(os.path.join('.git', 'pkg', 'missing'))
+
+
+def test_resolve(tree):
+    snapshot = RepoSnapshot(tree)
+    base = os.path.join('workouts', 'notes')
+    assert snapshot.resolve(base, '../../exercises/goblet_squat.json') == (
+        os.path.join('exercises', 'goblet_squat.json'), True)
+    assert snapshot.resolve(base, '../../exercises/missing.json') == (os.path.join('exercises', 'missing.json'), False)
+    assert snapshot.resolve(base, '../../../elsewhere.md') == (None, False)
+    assert snapshot.resolve('.', 'node_modules/pkg/README.md') == (os.path.join('node_modules', 'pkg', 'README.md'), True)
+
+
+def test_resolve_is_memoized_until_refresh(tree, write_json):
+    snapshot = RepoSnapshot(tree)
+    assert snapshot.resolve('.', 'exercises/curl.json') == (os.path.join('exercises', 'curl.json'), False)
+    write_json(tree / 'exercises' / 'curl.json', {'name': 'Curl'})
+    assert snapshot.resolve('.', 'exercises/curl.json')[1] is False
+    snapshot.refresh([os.path.join('exercises', 'curl.json')])
+    assert snapshot.resolve('.', 'exercises/curl.json')[1] is True
+
+
+def test_validate_file(tree):
+    deps = set()
+    problems = validate_file(tree / 'workouts' / 'notes' / 'plan.md', tree, deps, RepoSnapshot(tree))
+    assert problems == [(2, '../../exercises/missing.json', 'target does not exist'),
+                        (2, '../../../elsewhere.md', 'link resolves outside repository')]
+    assert deps == {os.path.join('exercises', 'goblet_squat.json'), os.path.join('exercises', 'missing.json')}
+
+
+def test_validate_file_without_snapshot_walks_once(tree, monkeypatch):
+    monkeypatch.setattr(validate_links, '_DEFAULT_SNAPSHOTS', {})
+    walks = []
+    real_init = RepoSnapshot.__init__
+    monkeypatch.setattr(RepoSnapshot, '__init__', lambda self, root: walks.append(root) or real_init(self, root))
+    plan = tree / 'workouts' / 'notes' / 'plan.md'
+    for _ in range(3):
+        assert len(validate_file(plan, tree)) == 2
+    assert len(walks) == 1
@@ -0,0 +1,47 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import log_ingest
+from log_ingest import PARALLEL_THRESHOLD, parallel_map
+from validate_schemas import init_worker, validate_unit, work_units
+
+pytest.importorskip('jsonschema')
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def units(repo, write_json):
+    """The repo's own files plus one invalid document of every kind."""
+    write_json(repo / 'performed' / 'bad.json', {'version': 'perf-2', 'sections': 'nope'})
+    write_json(repo / 'workouts' / 'bad.json', {'title': 7})
+    write_json(repo / 'exercises' / 'bad.json', {'name': ['x']})
+    (repo / 'workouts' / 'broken.json').write_text('{"title": ', encoding='utf-8')
+    (repo / 'workouts' / 'bad.md').write_text('# Bad\n\n```json session-structure\n{"sections": 1}\n```\n',
+                                              encoding='utf-8')
+    all_units = work_units(str(ROOT)) + work_units(str(repo))
+    assert len(all_units) >= PARALLEL_THRESHOLD
+    return all_units
+
+
+@pytest.mark.parametrize('use_compiled', [True, False], ids=['compiled', 'generic'])
+def test_pool_results_match_a_serial_run(repo, units, monkeypatch, use_compiled):
+    pools = []
+
+    class CountingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(kwargs.get('max_workers'))
+            super().__init__(*args, **kwargs)
+
+    serial = parallel_map(validate_unit, units, 1, initializer=init_worker, initargs=(use_compiled,))
+    monkeypatch.setattr(log_ingest, 'ProcessPoolExecutor', CountingPool)
+    pooled = parallel_map(validate_unit, units, 3, initializer=init_worker, initargs=(use_compiled,))
+
+    assert pools == [3]
+    assert pooled == serial
+    failing = {Path(errors[0][0]).relative_to(repo).as_posix() for errors in serial
+               if errors and Path(errors[0][0]).is_relative_to(repo)}
+    assert failing == {'performed/bad.json', 'workouts/bad.json', 'exercises/bad.json',
+                       'workouts/broken.json', 'workouts/bad.md'}